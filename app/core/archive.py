@@ -0,0 +1,314 @@
+"""Compact binary plan format
+
+Layout (little-endian), every section starting on an 8-byte boundary:
+
+    header      magic "HPLN", version u16, reserved u16, node count u32,
+                string count u32, then u64 offsets of the sections below
+    strings     u32 offsets (string count + 1) into a UTF-8 blob; ids and
+                descriptions are stored once and referenced by index
+    nodes       per node, in pre-order: parent i32, subtree end u32,
+                id string u32, description string u32
+    weights     f64 per node
+    meta        u32 length + UTF-8 JSON of request and metadata
+
+Pre-order plus the subtree end index means the subtree of node i is exactly
+nodes i..end-1, so PlanArchive can read one subtree from a memory-mapped file
+without touching the rest.
+"""
+
+import io
+import json
+import mmap
+import struct
+from typing import Dict, Any, Iterator, Optional, Union, IO
+import numpy as np
+from .models import Plan
+from .tree import NO_NODE, PlanTree
+
+MAGIC = b"HPLN"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHII5Q")
+_NODE_DTYPE = np.dtype(
+    [("parent", "<i4"), ("end", "<u4"), ("id", "<u4"), ("description", "<u4")]
+)
+
+
+def _padding(position: int) -> bytes:
+    return b"\0" * (-position % 8)
+
+
+def dump_plan(plan: Plan, fp: IO[bytes]) -> int:
+    """Write a plan in the binary format to a binary file object; returns bytes written"""
+    tree = plan.tree
+    order = list(tree.iter_dfs())
+    count = len(order)
+    position_of = {index: position for position, index in enumerate(order)}
+
+    strings: Dict[str, int] = {}
+    parents, ids, descriptions = [], [], []
+    node_ids = tree.ids()
+    for index in order:
+        parent = tree.parent(index)
+        parents.append(NO_NODE if parent == NO_NODE else position_of[parent])
+        ids.append(strings.setdefault(node_ids[index], len(strings)))
+        descriptions.append(strings.setdefault(tree.description(index), len(strings)))
+
+    nodes = np.zeros(count, dtype=_NODE_DTYPE)
+    nodes["parent"] = parents
+    nodes["id"] = ids
+    nodes["description"] = descriptions
+    weights = np.asarray(tree.weights[order], dtype="<f8")
+
+    # Subtree sizes accumulate from the last node in pre-order back to the root
+    sizes = [1] * count
+    for position in range(count - 1, 0, -1):
+        sizes[parents[position]] += sizes[position]
+    nodes["end"] = np.arange(count) + np.asarray(sizes)
+
+    blob = "".join(strings).encode("utf-8")
+    offsets = np.zeros(len(strings) + 1, dtype="<u4")
+    np.cumsum([len(text.encode("utf-8")) for text in strings], out=offsets[1:])
+    meta = json.dumps(
+        {"request": plan.request, "metadata": plan.export_metadata()},
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+    string_offset = _HEADER.size
+    string_end = string_offset + offsets.nbytes + len(blob)
+    node_offset = string_end + len(_padding(string_end))
+    weight_offset = node_offset + nodes.nbytes
+    meta_offset = weight_offset + weights.nbytes
+    end = meta_offset + 4 + len(meta)
+
+    fp.write(
+        _HEADER.pack(
+            MAGIC,
+            VERSION,
+            0,
+            count,
+            len(strings),
+            string_offset,
+            node_offset,
+            weight_offset,
+            meta_offset,
+            end,
+        )
+    )
+    fp.write(offsets.tobytes())
+    fp.write(blob)
+    fp.write(_padding(string_end))
+    fp.write(nodes.tobytes())
+    fp.write(weights.tobytes())
+    fp.write(struct.pack("<I", len(meta)))
+    fp.write(meta)
+    return end
+
+
+def dumps_plan(plan: Plan) -> bytes:
+    """Serialize a plan to bytes in the binary format"""
+    buffer = io.BytesIO()
+    dump_plan(plan, buffer)
+    return buffer.getvalue()
+
+
+class PlanArchive:
+    """Lazy reader over a binary plan held in bytes or a memory map
+
+    Node arrays are zero-copy NumPy views of the buffer and strings are only
+    decoded when accessed. Nodes are addressed by their pre-order position.
+    """
+
+    def __init__(self, buffer: Union[bytes, bytearray, memoryview, mmap.mmap]):
+        """Initialize archive reader"""
+        if len(buffer) < _HEADER.size:
+            raise ValueError("Not a binary plan: file too short")
+        (
+            magic,
+            version,
+            _,
+            self.node_count,
+            string_count,
+            string_offset,
+            node_offset,
+            weight_offset,
+            meta_offset,
+            end,
+        ) = _HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a binary plan: bad magic number")
+        if version != VERSION:
+            raise ValueError(f"Unsupported binary plan version: {version}")
+        if end > len(buffer):
+            raise ValueError("Binary plan is truncated")
+        # Sections must follow each other in the order written by dump_plan
+        if not (
+            _HEADER.size <= string_offset
+            and string_offset + 4 * (string_count + 1) <= node_offset
+            and node_offset + _NODE_DTYPE.itemsize * self.node_count <= weight_offset
+            and weight_offset + 8 * self.node_count <= meta_offset
+            and meta_offset + 4 <= end
+        ):
+            raise ValueError("Binary plan header is corrupt")
+        # Checked with struct: NumPy views would keep a memory map from closing
+        (blob_length,) = struct.unpack_from(
+            "<I", buffer, string_offset + 4 * string_count
+        )
+        (meta_length,) = struct.unpack_from("<I", buffer, meta_offset)
+        if (
+            string_offset + 4 * (string_count + 1) + blob_length > node_offset
+            or meta_offset + 4 + meta_length > end
+        ):
+            raise ValueError("Binary plan header is corrupt")
+
+        self._buffer = buffer
+        self._mmap: Optional[mmap.mmap] = None
+        self._file: Optional[IO[bytes]] = None
+        self._string_offsets = np.frombuffer(
+            buffer, dtype="<u4", count=string_count + 1, offset=string_offset
+        )
+        self._string_data = string_offset + self._string_offsets.nbytes
+        self._nodes = np.frombuffer(
+            buffer, dtype=_NODE_DTYPE, count=self.node_count, offset=node_offset
+        )
+        self.weights = np.frombuffer(
+            buffer, dtype="<f8", count=self.node_count, offset=weight_offset
+        )
+        self._meta_offset = meta_offset
+        self._meta: Optional[Dict[str, Any]] = None
+        # Raw id bytes -> position, built by the first find()
+        self._positions: Optional[Dict[bytes, int]] = None
+
+    @classmethod
+    def open(cls, path: str) -> "PlanArchive":
+        """Memory-map a binary plan file"""
+        f = open(path, "rb")
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            f.close()
+            raise
+        try:
+            archive = cls(mapped)
+        except Exception:
+            mapped.close()
+            f.close()
+            raise
+        archive._mmap, archive._file = mapped, f
+        return archive
+
+    def close(self):
+        """Release the memory map, if any"""
+        # Views into the map must go before it can be closed
+        self._string_offsets = self._nodes = self.weights = None
+        self._buffer = self._positions = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+            self._mmap = self._file = None
+
+    def __enter__(self) -> "PlanArchive":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self) -> int:
+        return self.node_count
+
+    def _string(self, number: int) -> str:
+        start = self._string_data + int(self._string_offsets[number])
+        stop = self._string_data + int(self._string_offsets[number + 1])
+        return bytes(self._buffer[start:stop]).decode("utf-8")
+
+    def _load_meta(self) -> Dict[str, Any]:
+        if self._meta is None:
+            (length,) = struct.unpack_from("<I", self._buffer, self._meta_offset)
+            start = self._meta_offset + 4
+            self._meta = json.loads(bytes(self._buffer[start : start + length]))
+        return self._meta
+
+    @property
+    def request(self) -> str:
+        return self._load_meta()["request"]
+
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        return self._load_meta()["metadata"]
+
+    def id(self, position: int) -> str:
+        return self._string(int(self._nodes["id"][position]))
+
+    def description(self, position: int) -> str:
+        return self._string(int(self._nodes["description"][position]))
+
+    def weight(self, position: int) -> float:
+        return float(self.weights[position])
+
+    def parent(self, position: int) -> int:
+        return int(self._nodes["parent"][position])
+
+    def subtree_end(self, position: int) -> int:
+        """Position just past the last descendant of a node"""
+        return int(self._nodes["end"][position])
+
+    def children(self, position: int) -> Iterator[int]:
+        """Positions of the children of a node, skipping over their subtrees"""
+        end = self.subtree_end(position)
+        child = position + 1
+        while child < end:
+            yield child
+            child = self.subtree_end(child)
+
+    def find(self, node_id: str) -> int:
+        """Position of the node with the given id
+
+        The first call indexes every raw id in one pass; later lookups are
+        dictionary hits. Ids are compared as UTF-8 bytes, never decoded.
+        """
+        if self._positions is None:
+            data, offsets = self._string_data, self._string_offsets
+            positions: Dict[bytes, int] = {}
+            for position, number in enumerate(self._nodes["id"].tolist()):
+                start = data + int(offsets[number])
+                stop = data + int(offsets[number + 1])
+                positions.setdefault(bytes(self._buffer[start:stop]), position)
+            self._positions = positions
+        try:
+            return self._positions[node_id.encode("utf-8")]
+        except KeyError:
+            raise KeyError(node_id) from None
+
+    def subtree(self, node: Union[int, str] = 0) -> PlanTree:
+        """Decode only the subtree rooted at a node (position or id)"""
+        root = self.find(node) if isinstance(node, str) else node
+        if not 0 <= root < self.node_count:
+            raise IndexError(f"Node position out of range: {root}")
+        end = self.subtree_end(root)
+
+        tree = PlanTree()
+        indices = {}
+        for position in range(root, end):
+            parent = NO_NODE if position == root else indices[self.parent(position)]
+            indices[position] = tree.add_node(
+                self.id(position),
+                self.description(position),
+                self.weight(position),
+                parent,
+            )
+        return tree
+
+    def to_plan(self, node: Union[int, str] = 0) -> Plan:
+        """Decode the whole plan, or the part below one node"""
+        return Plan(
+            request=self.request,
+            tree=self.subtree(node),
+            metadata=dict(self.metadata),
+        )
+
+
+def load_plan(source: Union[bytes, bytearray, memoryview, IO[bytes]]) -> Plan:
+    """Read a whole plan from bytes or a binary file object"""
+    if hasattr(source, "read"):
+        source = source.read()
+    return PlanArchive(source).to_plan()
@@ -1,5 +1,12 @@
+import copy
+import json
 from dataclasses import dataclass
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Union, IO, Callable, Tuple, TYPE_CHECKING
+from .usage import UsageTracker
+from .tree import PlanTree, PlanNodeView
+
+if TYPE_CHECKING:
+    from .stats import PlanStats
 
 @dataclass
 class PlanNode:
@@ -19,25 +26,155 @@ class PlanNode:
         self.children.append(child)
         child.parent_id = self.id
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert node to dictionary"""
+    def _node_dict(self) -> Dict[str, Any]:
         return {
             'id': self.id,
             'description': self.description,
             'weight': self.weight,
             'parent_id': self.parent_id,
-            'children': [child.to_dict() for child in self.children] if self.children else []
+            'children': []
         }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert node to dictionary"""
+        result = self._node_dict()
+        stack = [(self, result)]
+        while stack:
+            node, node_dict = stack.pop()
+            for child in node.children:
+                child_dict = child._node_dict()
+                node_dict['children'].append(child_dict)
+                stack.append((child, child_dict))
+        return result
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PlanNode':
+        """Create a node hierarchy from the dictionary produced by to_dict"""
+        root = cls(id=data['id'], description=data['description'], weight=data.get('weight', 0.0))
+        stack = [(root, data)]
+        while stack:
+            node, node_dict = stack.pop()
+            for child_dict in node_dict.get('children') or []:
+                child = cls(id=child_dict['id'], description=child_dict['description'],
+                            weight=child_dict.get('weight', 0.0))
+                node.add_child(child)
+                stack.append((child, child_dict))
+        return root
 
-@dataclass
 class Plan:
-    """Plan class representing the complete hierarchical plan"""
-    request: str
-    root_node: PlanNode
+    """Plan class representing the complete hierarchical plan
+
+    Nodes are stored in a compact PlanTree; root_node is a PlanNode-compatible
+    view of its root. A plan can be built from a PlanNode hierarchy or a tree.
+    """
+    
+    def __init__(self, request: str, root_node: Optional[PlanNode] = None,
+                 metadata: Optional[Dict[str, Any]] = None,
+                 usage: Optional[UsageTracker] = None,
+                 tree: Optional[PlanTree] = None):
+        if tree is None:
+            if root_node is None:
+                raise ValueError("Plan needs a root node or a plan tree")
+            if isinstance(root_node, PlanNodeView) and root_node.index == 0:
+                tree = root_node.tree
+            else:
+                tree = PlanTree.from_node(root_node)
+        self.request = request
+        self.tree = tree
+        self.metadata = metadata if metadata is not None else {}
+        self.usage = usage
+        self._artifacts: Dict[str, Any] = {}
+        self._artifacts_state: Optional[Tuple[Any, ...]] = None
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Plan':
+        """Create a plan from the dictionary produced by to_dict"""
+        return cls(request=data['request'], tree=PlanTree.from_dict(data['plan']),
+                   metadata=dict(data.get('metadata') or {}))
+    
+    @classmethod
+    def from_json(cls, source: Union[str, bytes, IO]) -> 'Plan':
+        """Create a plan from a JSON document (string or file object) as exported"""
+        data = json.load(source) if hasattr(source, 'read') else json.loads(source)
+        return cls.from_dict(data)
+    
+    @property
+    def version(self) -> int:
+        """Counter bumped whenever a node is added or changed"""
+        return self.tree.version
+    
+    def _artifact_state(self) -> Tuple[Any, ...]:
+        usage = self.usage
+        usage_state = None if usage is None else (usage, len(usage.records), usage.token_budget)
+        return (self.tree.version, self.request, self.metadata, usage_state)
+    
+    def cached(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Derived artifact (export, stats, hash...) memoized until the plan changes
+
+        The plan changes when a node is added or edited, when its request is
+        reassigned, when its metadata changes (compared by value, so in-place
+        edits count) or when its usage records a call or is replaced, since
+        exports include all of them.
+        """
+        state = self._artifact_state()
+        if state != self._artifacts_state:
+            version, request, metadata, usage_state = state
+            self._artifacts = {}
+            self._artifacts_state = (version, request, copy.deepcopy(metadata), usage_state)
+        if key not in self._artifacts:
+            self._artifacts[key] = compute()
+        return self._artifacts[key]
+    
+    @property
+    def root_node(self) -> PlanNodeView:
+        """View of the root node"""
+        return self.tree.root
+    
+    def get_node(self, node_id: str) -> Optional[PlanNodeView]:
+        """Look up a node by id"""
+        return self.tree.get(node_id)
+    
+    def bfs(self) -> Iterator[PlanNodeView]:
+        """Iterate over all nodes breadth first, starting at the root"""
+        return (self.tree.node(index) for index in self.tree.iter_bfs())
+    
+    def dfs(self) -> Iterator[PlanNodeView]:
+        """Iterate over all nodes depth first (pre-order), starting at the root"""
+        return (self.tree.node(index) for index in self.tree.iter_dfs())
+    
+    def levels(self) -> Iterator[List[PlanNodeView]]:
+        """Iterate over the nodes one depth level at a time"""
+        for level in self.tree.iter_levels():
+            yield [self.tree.node(index) for index in level]
+    
+    def leaves(self) -> Iterator[PlanNodeView]:
+        """Iterate over the leaf nodes in depth-first order"""
+        return (self.tree.node(index) for index in self.tree.iter_leaves())
+    
+    def __len__(self) -> int:
+        return len(self.tree)
+    
+    def __repr__(self) -> str:
+        return f"Plan(request={self.request!r}, nodes={len(self.tree)}, metadata={self.metadata!r})"
+    
+    def stats(self) -> 'PlanStats':
+        """Node count, depth, weight and difficulty statistics of the plan"""
+        # Imported here: statistics need NumPy, which plain plan handling doesn't
+        from .stats import PlanStats
+        
+        return self.cached('stats', lambda: PlanStats.of_tree(self.tree))
+    
+    def export_metadata(self) -> Dict[str, Any]:
+        """Metadata as exported, including the usage summary"""
+        metadata = dict(self.metadata)
+        if self.usage is not None:
+            metadata['usage'] = self.usage.summary()
+        return metadata
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert plan to dictionary"""
         return {
             'request': self.request,
-            'plan': self.root_node.to_dict()
+            'plan': self.tree.to_dict(),
+            'metadata': self.export_metadata()
         }
\ No newline at end of file
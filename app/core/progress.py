@@ -0,0 +1,111 @@
+import time
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional, Iterator
+
+
+@dataclass
+class PhaseRecord:
+    """Progress of one phase of plan generation"""
+
+    name: str
+    total: Optional[int] = None
+    completed: int = 0
+    started_at: float = 0.0
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.time()) - self.started_at
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert record to dictionary"""
+        return {**asdict(self), "done": self.done, "elapsed": self.elapsed}
+
+
+class PlanProgress:
+    """Phase-by-phase progress of one plan, safe to poll from another thread"""
+
+    def __init__(self):
+        self.phases: List[PhaseRecord] = []
+        self._lock = threading.Lock()
+
+    def start_phase(self, name: str, total: Optional[int] = None) -> PhaseRecord:
+        """Begin a new phase; total is the number of work items, if known"""
+        record = PhaseRecord(name=name, total=total, started_at=time.time())
+        with self._lock:
+            self.phases.append(record)
+        return record
+
+    def advance(self, record: PhaseRecord, count: int = 1):
+        """Mark work items of a phase as completed"""
+        with self._lock:
+            record.completed += count
+
+    def finish_phase(self, record: PhaseRecord):
+        """Mark a phase as finished"""
+        with self._lock:
+            record.finished_at = time.time()
+
+    @property
+    def current(self) -> Optional[PhaseRecord]:
+        """The most recently started phase"""
+        with self._lock:
+            return self.phases[-1] if self.phases else None
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Copy of all phases, for display"""
+        with self._lock:
+            return [record.to_dict() for record in self.phases]
+
+
+_current_progress: ContextVar[Optional[PlanProgress]] = ContextVar(
+    "plan_progress", default=None
+)
+
+
+def current_progress() -> Optional[PlanProgress]:
+    """Return the progress collecting phases in the current context, if any"""
+    return _current_progress.get()
+
+
+@contextmanager
+def track_progress(progress: PlanProgress) -> Iterator[PlanProgress]:
+    """Route phases reported inside this block to the given progress"""
+    token = _current_progress.set(progress)
+    try:
+        yield progress
+    finally:
+        _current_progress.reset(token)
+
+
+class _Phase:
+    """Handle for advancing a phase; a no-op when no progress is tracked"""
+
+    def __init__(self, progress: Optional[PlanProgress], record: Optional[PhaseRecord]):
+        self._progress = progress
+        self._record = record
+
+    def advance(self, count: int = 1):
+        if self._progress is not None:
+            self._progress.advance(self._record, count)
+
+
+@contextmanager
+def phase(name: str, total: Optional[int] = None) -> Iterator[_Phase]:
+    """Report a phase of plan generation to the current progress, if any"""
+    progress = _current_progress.get()
+    if progress is None:
+        yield _Phase(None, None)
+        return
+    record = progress.start_phase(name, total)
+    try:
+        yield _Phase(progress, record)
+    finally:
+        progress.finish_phase(record)
@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+from typing import Dict, Any, Iterable, Union
+import numpy as np
+from .tree import PlanTree
+
+# Difficulty bands used across the app: easy, moderate, challenging, intense
+DIFFICULTY_BINS = (0, 30, 60, 80, 100)
+DIFFICULTY_LABELS = ("easy", "moderate", "challenging", "intense")
+
+
+@dataclass
+class PlanStats:
+    """Summary statistics of one or more plans, computed with NumPy
+
+    All figures include the root node. Per-depth arrays are indexed by depth
+    (0 is the root) and histogram counts follow DIFFICULTY_BINS, each band
+    including its upper bound (the first also includes 0).
+    """
+
+    plan_count: int
+    node_count: int
+    max_depth: int
+    total_weight: float
+    mean_weight: float
+    max_weight: float
+    histogram: np.ndarray
+    nodes_by_depth: np.ndarray
+    weight_by_depth: np.ndarray
+    max_weight_by_depth: np.ndarray
+
+    @classmethod
+    def from_arrays(
+        cls, weights: np.ndarray, depths: np.ndarray, plan_count: int = 1
+    ) -> "PlanStats":
+        """Compute statistics from parallel weight and depth arrays"""
+        weights = np.asarray(weights, dtype=np.float64)
+        depths = np.asarray(depths, dtype=np.intp)
+        node_count = len(weights)
+        if node_count == 0:
+            empty = np.zeros(0)
+            return cls(
+                plan_count, 0, 0, 0.0, 0.0, 0.0, np.zeros(4, int), empty, empty, empty
+            )
+
+        levels = int(depths.max()) + 1
+        bands = np.searchsorted(DIFFICULTY_BINS[1:-1], weights, side="left")
+        max_by_depth = np.full(levels, -np.inf)
+        np.maximum.at(max_by_depth, depths, weights)
+        total = float(weights.sum())
+        return cls(
+            plan_count=plan_count,
+            node_count=node_count,
+            max_depth=levels - 1,
+            total_weight=total,
+            mean_weight=total / node_count,
+            max_weight=float(weights.max()),
+            histogram=np.bincount(bands, minlength=len(DIFFICULTY_LABELS)),
+            nodes_by_depth=np.bincount(depths, minlength=levels),
+            weight_by_depth=np.bincount(depths, weights=weights, minlength=levels),
+            max_weight_by_depth=max_by_depth,
+        )
+
+    @classmethod
+    def of_tree(cls, tree: PlanTree) -> "PlanStats":
+        """Statistics of one plan tree, read straight from its arrays"""
+        return cls.from_arrays(tree.weights, tree.depths)
+
+    @classmethod
+    def aggregate(cls, plans: Iterable[Union["Plan", PlanTree]]) -> "PlanStats":
+        """Statistics over all nodes of many plans at once"""
+        trees = [getattr(plan, "tree", plan) for plan in plans]
+        if not trees:
+            return cls.from_arrays(np.zeros(0), np.zeros(0, int), plan_count=0)
+        return cls.from_arrays(
+            np.concatenate([tree.weights for tree in trees]),
+            np.concatenate([tree.depths for tree in trees]),
+            plan_count=len(trees),
+        )
+
+    @property
+    def mean_weight_by_depth(self) -> np.ndarray:
+        return self.weight_by_depth / np.maximum(self.nodes_by_depth, 1)
+
+    def fraction_above(self, weight: float) -> float:
+        """Share of nodes heavier than one of the DIFFICULTY_BINS boundaries"""
+        if self.node_count == 0:
+            return 0.0
+        band = DIFFICULTY_BINS.index(weight)
+        return float(self.histogram[band:].sum()) / self.node_count
+
+    def summary(self) -> Dict[str, Any]:
+        """Plain-Python summary, e.g. for logging or JSON"""
+        return {
+            "plans": self.plan_count,
+            "nodes": self.node_count,
+            "max_depth": self.max_depth,
+            "total_weight": self.total_weight,
+            "mean_weight": self.mean_weight,
+            "max_weight": self.max_weight,
+            "histogram": dict(zip(DIFFICULTY_LABELS, self.histogram.tolist())),
+            "by_depth": [
+                {
+                    "depth": depth,
+                    "nodes": int(count),
+                    "mean_weight": float(mean),
+                    "max_weight": float(maximum),
+                }
+                for depth, (count, mean, maximum) in enumerate(
+                    zip(
+                        self.nodes_by_depth,
+                        self.mean_weight_by_depth,
+                        self.max_weight_by_depth,
+                    )
+                )
+            ],
+        }
@@ -0,0 +1,251 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import List, Dict, Any, Optional, Iterable, NamedTuple
+from .models import Plan
+from .tree import NO_NODE, PlanTree
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS plans (
+    id INTEGER PRIMARY KEY,
+    request TEXT NOT NULL,
+    request_hash TEXT NOT NULL,
+    settings TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    node_count INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS nodes (
+    plan_id INTEGER NOT NULL REFERENCES plans(id) ON DELETE CASCADE,
+    idx INTEGER NOT NULL,
+    parent_idx INTEGER,
+    node_id TEXT NOT NULL,
+    depth INTEGER NOT NULL,
+    weight REAL NOT NULL,
+    description TEXT NOT NULL,
+    PRIMARY KEY (plan_id, idx)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS plans_request_hash ON plans(request_hash, settings);
+CREATE INDEX IF NOT EXISTS nodes_weight ON nodes(weight);
+CREATE INDEX IF NOT EXISTS nodes_depth_weight ON nodes(depth, weight);
+CREATE INDEX IF NOT EXISTS nodes_parent ON nodes(plan_id, parent_idx);
+"""
+
+
+def request_hash(request: str) -> str:
+    """Stable hash of a planning request, used for exact lookups"""
+    return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+
+class StoredNode(NamedTuple):
+    """Lightweight row view of a stored plan node"""
+
+    plan_id: int
+    index: int
+    parent_index: Optional[int]
+    node_id: str
+    depth: int
+    weight: float
+    description: str
+
+
+class PlanStore:
+    """SQLite persistence for plans with a normalized, indexed node table
+
+    Nodes are stored in pre-order, one row each, keyed by plan and position.
+    Plans can be saved with the settings they were generated with so the
+    store can also serve cached plans for repeated requests.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """Initialize plan store"""
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "PlanStore":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def _node_rows(plan_id: int, plan: Plan) -> Iterable[tuple]:
+        tree = plan.tree
+        positions = {}
+        ids = tree.ids()
+        for position, index in enumerate(tree.iter_dfs()):
+            positions[index] = position
+            parent = tree.parent(index)
+            yield (
+                plan_id,
+                position,
+                None if parent == NO_NODE else positions[parent],
+                ids[index],
+                tree.depth(index),
+                tree.weight(index),
+                tree.description(index),
+            )
+
+    def _insert(self, plan: Plan, settings: Optional[Dict[str, Any]]) -> int:
+        cursor = self._conn.execute(
+            "INSERT INTO plans (request, request_hash, settings, metadata, node_count, created_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                plan.request,
+                request_hash(plan.request),
+                json.dumps(settings or {}, sort_keys=True),
+                json.dumps(plan.export_metadata(), ensure_ascii=False),
+                len(plan.tree),
+                time.time(),
+            ),
+        )
+        plan_id = cursor.lastrowid
+        self._conn.executemany(
+            "INSERT INTO nodes VALUES (?, ?, ?, ?, ?, ?, ?)",
+            self._node_rows(plan_id, plan),
+        )
+        return plan_id
+
+    def save(self, plan: Plan, settings: Optional[Dict[str, Any]] = None) -> int:
+        """Persist a plan in one transaction and return its id"""
+        return self.save_many([plan], settings)[0]
+
+    def save_many(
+        self, plans: Iterable[Plan], settings: Optional[Dict[str, Any]] = None
+    ) -> List[int]:
+        """Persist several plans in a single transaction"""
+        with self._lock, self._conn:
+            return [self._insert(plan, settings) for plan in plans]
+
+    def load(self, plan_id: int) -> Plan:
+        """Load a whole plan by id (KeyError if missing)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT request, metadata FROM plans WHERE id = ?", (plan_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(plan_id)
+            nodes = self._conn.execute(
+                "SELECT parent_idx, node_id, description, weight FROM nodes"
+                " WHERE plan_id = ? ORDER BY idx",
+                (plan_id,),
+            ).fetchall()
+
+        tree = PlanTree()
+        for parent, node_id, description, weight in nodes:
+            # Stored positions match tree indices since rows are added in order
+            tree.add_node(
+                node_id, description, weight, NO_NODE if parent is None else parent
+            )
+        return Plan(request=row[0], tree=tree, metadata=json.loads(row[1]))
+
+    def delete(self, plan_id: int):
+        """Remove a plan and its nodes"""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM plans WHERE id = ?", (plan_id,))
+
+    def find_plans(
+        self,
+        request: Optional[str] = None,
+        request_like: Optional[str] = None,
+        settings: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        """Ids of plans, newest first
+
+        request matches exactly through the request hash index; request_like
+        is an SQL LIKE pattern (e.g. "%marketing%").
+        """
+        clauses, params = [], []
+        if request is not None:
+            clauses.append("request_hash = ?")
+            params.append(request_hash(request))
+        if settings is not None:
+            clauses.append("settings = ?")
+            params.append(json.dumps(settings, sort_keys=True))
+        if request_like is not None:
+            clauses.append("request LIKE ?")
+            params.append(request_like)
+        sql = "SELECT id FROM plans"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params)]
+
+    def latest(
+        self, request: str, settings: Optional[Dict[str, Any]] = None
+    ) -> Optional[Plan]:
+        """Most recently saved plan for exactly this request and settings"""
+        plan_ids = self.find_plans(request=request, settings=settings or {}, limit=1)
+        return self.load(plan_ids[0]) if plan_ids else None
+
+    def query_nodes(
+        self,
+        min_weight: Optional[float] = None,
+        max_weight: Optional[float] = None,
+        depth: Optional[int] = None,
+        plan_id: Optional[int] = None,
+        request_like: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[StoredNode]:
+        """Nodes matching all given filters, e.g. weight above 80 at depth 2"""
+        clauses, params = [], []
+        if min_weight is not None:
+            clauses.append("n.weight > ?")
+            params.append(min_weight)
+        if max_weight is not None:
+            clauses.append("n.weight <= ?")
+            params.append(max_weight)
+        if depth is not None:
+            clauses.append("n.depth = ?")
+            params.append(depth)
+        if plan_id is not None:
+            clauses.append("n.plan_id = ?")
+            params.append(plan_id)
+        sql = (
+            "SELECT n.plan_id, n.idx, n.parent_idx, n.node_id, n.depth, n.weight,"
+            " n.description FROM nodes n"
+        )
+        if request_like is not None:
+            sql += " JOIN plans p ON p.id = n.plan_id"
+            clauses.append("p.request LIKE ?")
+            params.append(request_like)
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY n.plan_id, n.idx"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [StoredNode(*row) for row in self._conn.execute(sql, params)]
+
+    def children(self, plan_id: int, index: int) -> List[StoredNode]:
+        """Direct children of a stored node"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT plan_id, idx, parent_idx, node_id, depth, weight, description"
+                " FROM nodes WHERE plan_id = ? AND parent_idx = ? ORDER BY idx",
+                (plan_id, index),
+            ).fetchall()
+        return [StoredNode(*row) for row in rows]
+
+    def count(self) -> int:
+        """Number of stored plans"""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
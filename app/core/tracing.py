@@ -0,0 +1,257 @@
+import os
+import json
+import time
+import threading
+import functools
+from abc import ABC, abstractmethod
+from contextvars import ContextVar
+from typing import List, Dict, Any, Optional, Callable, IO, Union
+
+
+class Span:
+    """A timed section of the planning pipeline"""
+
+    __slots__ = (
+        "name",
+        "category",
+        "attributes",
+        "parent",
+        "start_ns",
+        "end_ns",
+        "wall_start_ns",
+        "thread_id",
+        "sink_data",
+        "_token",
+        "_sinks",
+    )
+
+    def __init__(
+        self, name: str, category: str, attributes: Dict[str, Any], sinks: List
+    ):
+        self.name = name
+        self.category = category
+        self.attributes = attributes
+        self.parent: Optional["Span"] = None
+        self.start_ns = 0
+        self.end_ns = 0
+        self.wall_start_ns = 0
+        self.thread_id = 0
+        # Per-sink state, e.g. the OpenTelemetry span mirroring this one
+        self.sink_data: Dict[int, Any] = {}
+        self._token = None
+        self._sinks = sinks
+
+    @property
+    def duration(self) -> float:
+        """Duration in seconds"""
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def set_attribute(self, key: str, value: Any):
+        """Attach an attribute to the span"""
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.parent = _current_span.get()
+        self._token = _current_span.set(self)
+        self.thread_id = threading.get_ident()
+        self.wall_start_ns = time.time_ns()
+        self.start_ns = time.perf_counter_ns()
+        for sink in self._sinks:
+            sink.on_start(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        _current_span.reset(self._token)
+        for sink in self._sinks:
+            sink.on_end(self)
+        return False
+
+
+class _NoopSpan:
+    """Shared span returned while tracing is disabled"""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class SpanSink(ABC):
+    """Receives spans as they start and finish"""
+
+    def on_start(self, span: Span):
+        """Called when a span starts"""
+        pass
+
+    @abstractmethod
+    def on_end(self, span: Span):
+        """Called when a span finishes"""
+        pass
+
+
+class ChromeTraceSink(SpanSink):
+    """Collects spans as Chrome trace events (chrome://tracing, Perfetto)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: List[Dict[str, Any]] = []
+        self._origin_ns = time.perf_counter_ns()
+
+    def on_end(self, span: Span):
+        event = {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": (span.start_ns - self._origin_ns) / 1000,
+            "dur": (span.end_ns - span.start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": span.thread_id,
+            "args": {key: _json_safe(value) for key, value in span.attributes.items()},
+        }
+        with self._lock:
+            self._events.append(event)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the collected events in Chrome trace-event format"""
+        with self._lock:
+            events = list(self._events)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export(self, target: Union[str, IO[str]]):
+        """Write the trace as JSON to a path or file-like object"""
+        if isinstance(target, str):
+            with open(target, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f)
+        else:
+            json.dump(self.to_dict(), target)
+
+    def clear(self):
+        """Drop collected events"""
+        with self._lock:
+            self._events.clear()
+
+
+class OpenTelemetrySink(SpanSink):
+    """Mirrors spans into an OpenTelemetry tracer
+
+    Requires the opentelemetry-api package; exporters and processors are
+    configured on the OpenTelemetry side as usual.
+    """
+
+    def __init__(self, tracer_provider=None, instrumentation_name: str = "hieraplan"):
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError(
+                "OpenTelemetrySink requires the 'opentelemetry-api' package"
+            ) from e
+
+        self._trace = trace
+        self._tracer = trace.get_tracer(
+            instrumentation_name, tracer_provider=tracer_provider
+        )
+
+    def on_start(self, span: Span):
+        context = None
+        parent = span.parent
+        if parent is not None and id(self) in parent.sink_data:
+            context = self._trace.set_span_in_context(parent.sink_data[id(self)])
+        span.sink_data[id(self)] = self._tracer.start_span(
+            span.name, context=context, start_time=span.wall_start_ns
+        )
+
+    def on_end(self, span: Span):
+        otel_span = span.sink_data.pop(id(self), None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            otel_span.set_attribute(key, _otel_safe(value))
+        otel_span.end(end_time=span.wall_start_ns + (span.end_ns - span.start_ns))
+
+
+class Tracer:
+    """Creates spans and forwards them to the registered sinks"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Replaced, never mutated, so spans can iterate it without locking
+        self.sinks: List[SpanSink] = []
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sinks)
+
+    def add_sink(self, sink: SpanSink):
+        """Register a sink; tracing is enabled while at least one is registered"""
+        with self._lock:
+            self.sinks = self.sinks + [sink]
+
+    def remove_sink(self, sink: SpanSink):
+        """Unregister a sink"""
+        with self._lock:
+            self.sinks = [s for s in self.sinks if s is not sink]
+
+    def span(self, name: str, category: str = "hieraplan", **attributes):
+        """Return a context manager timing the enclosed block"""
+        sinks = self.sinks
+        if not sinks:
+            return _NOOP_SPAN
+        return Span(name, category, attributes, sinks)
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer"""
+    return _tracer
+
+
+def span(name: str, category: str = "hieraplan", **attributes):
+    """Time the enclosed block as a span on the process-wide tracer"""
+    sinks = _tracer.sinks
+    if not sinks:
+        return _NOOP_SPAN
+    return Span(name, category, attributes, sinks)
+
+
+def traced(name: Optional[str] = None, category: str = "hieraplan") -> Callable:
+    """Decorator recording each call of the function as a span"""
+
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            sinks = _tracer.sinks
+            if not sinks:
+                return func(*args, **kwargs)
+            with Span(span_name, category, {}, sinks):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _json_safe(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def _otel_safe(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
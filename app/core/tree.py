@@ -0,0 +1,479 @@
+import sys
+from array import array
+from collections import deque
+from typing import (
+    List,
+    Dict,
+    Any,
+    Optional,
+    Iterable,
+    Iterator,
+    Tuple,
+    Union,
+    TYPE_CHECKING,
+)
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Index value meaning "no node" in the structure arrays
+NO_NODE = -1
+
+
+class PlanTree:
+    """Compact array-backed storage for a hierarchical plan
+
+    Nodes are addressed by integer index, the root being 0. The structure is
+    kept in parent / first-child / next-sibling index arrays, weights in a
+    float array and descriptions are interned, so a node costs a few array
+    slots instead of a Python object with its own dict and list. NumPy is
+    only imported by the vectorized accessors (weights, depths, parents).
+
+    Ids following the planner's scheme ("step_<n>" below the root,
+    "<parent id>_sub_<n>" deeper, n being the position among siblings) are
+    derived from the structure instead of stored. Path-style ids grow with
+    depth, so storing them would cost more than the rest of the node. Only
+    ids that don't follow the scheme (the root's, imported ones) are kept
+    in a dict. Deriving an id takes O(depth); traversals build ids top-down
+    with child_id or all at once with ids(). The id -> index map used for
+    lookups by id is built on the first lookup and kept up to date after
+    that, so plans that are never searched by id don't pay for it.
+    """
+
+    def __init__(self):
+        """Initialize an empty tree"""
+        self._parent = array("i")
+        self._first_child = array("i")
+        self._last_child = array("i")
+        self._next_sibling = array("i")
+        self._depth = array("i")
+        self._weights = array("d")
+        # Position of every node among its siblings
+        self._position = array("i")
+        # Ids that are not derived from the structure, both ways
+        self._explicit_ids: Dict[int, str] = {}
+        self._index: Dict[str, int] = {}
+        # Every id -> index, built by the first lookup by id (see _find)
+        self._id_index: Optional[Dict[str, int]] = None
+        self._descriptions: List[str] = []
+        # Bumped on every mutation, so derived data can tell when it is stale
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._parent)
+
+    def add_node(
+        self, id: str, description: str, weight: float = 0.0, parent: int = NO_NODE
+    ) -> int:
+        """Append a node as the last child of parent and return its index
+
+        The first node added without a parent becomes the root.
+        """
+        if parent == NO_NODE and len(self):
+            raise ValueError("Plan tree already has a root node")
+        last = NO_NODE if parent == NO_NODE else self._last_child[parent]
+        position = 0 if last == NO_NODE else self._position[last] + 1
+
+        # A derived id can only clash with an explicit one; an explicit id
+        # may clash with either
+        derived = parent != NO_NODE and id == self._derived_id(parent, position)
+        if self._id_index is not None:
+            duplicate = id in self._id_index
+        else:
+            duplicate = id in self._index or (
+                not derived and self._find_derived(id) is not None
+            )
+        if duplicate:
+            raise ValueError(f"Duplicate node id: {id}")
+
+        index = len(self)
+        self._weights.append(weight)
+        self.version += 1
+
+        if not derived:
+            self._explicit_ids[index] = id
+            self._index[id] = index
+        if self._id_index is not None:
+            # Adding a node never changes existing ids, so the map stays valid
+            self._id_index[id] = index
+        self._position.append(position)
+        self._descriptions.append(sys.intern(description))
+        self._parent.append(parent)
+        self._first_child.append(NO_NODE)
+        self._last_child.append(NO_NODE)
+        self._next_sibling.append(NO_NODE)
+
+        if parent == NO_NODE:
+            self._depth.append(0)
+        else:
+            self._depth.append(self._depth[parent] + 1)
+            if last == NO_NODE:
+                self._first_child[parent] = index
+            else:
+                self._next_sibling[last] = index
+            self._last_child[parent] = index
+
+        return index
+
+    def add_subtree(self, node: Any, parent: int = NO_NODE) -> int:
+        """Copy a PlanNode (or any node with id/description/weight/children) and its descendants"""
+        root_index = self.add_node(node.id, node.description, node.weight, parent)
+        stack = [(child, root_index) for child in reversed(node.children)]
+        while stack:
+            child, parent_index = stack.pop()
+            index = self.add_node(
+                child.id, child.description, child.weight, parent_index
+            )
+            stack.extend((grandchild, index) for grandchild in reversed(child.children))
+        return root_index
+
+    @classmethod
+    def from_dict(cls, node_dict: Dict[str, Any]) -> "PlanTree":
+        """Build a tree from the nested PlanNode dictionary layout"""
+        tree = cls()
+        stack = [(node_dict, NO_NODE)]
+        while stack:
+            data, parent = stack.pop()
+            index = tree.add_node(
+                data["id"], data["description"], data.get("weight", 0.0), parent
+            )
+            children = data.get("children") or []
+            stack.extend((child, index) for child in reversed(children))
+        return tree
+
+    @classmethod
+    def from_node(cls, root: Any) -> "PlanTree":
+        """Build a tree from a PlanNode hierarchy"""
+        tree = cls()
+        tree.add_subtree(root)
+        return tree
+
+    def _derived_id(self, parent: int, position: int) -> str:
+        if self._parent[parent] == NO_NODE:
+            return f"step_{position}"
+        return f"{self.id(parent)}_sub_{position}"
+
+    def id(self, index: int) -> str:
+        suffix = []
+        while True:
+            explicit = self._explicit_ids.get(index)
+            if explicit is not None:
+                base = explicit
+                break
+            parent = self._parent[index]
+            if self._parent[parent] == NO_NODE:
+                base = f"step_{self._position[index]}"
+                break
+            suffix.append(self._position[index])
+            index = parent
+        return base + "".join(f"_sub_{position}" for position in reversed(suffix))
+
+    def child_id(self, index: int, parent_id: str) -> str:
+        """Id of a node given its parent's id, in constant time
+
+        For traversals that go from parents to children and so already
+        know the parent's id.
+        """
+        explicit = self._explicit_ids.get(index)
+        if explicit is not None:
+            return explicit
+        if self._parent[self._parent[index]] == NO_NODE:
+            return f"step_{self._position[index]}"
+        return f"{parent_id}_sub_{self._position[index]}"
+
+    def ids(self) -> List[str]:
+        """Ids of all nodes, indexed by node index, built in one pass"""
+        # Parents are always added before their children
+        ids: List[str] = []
+        for index in range(len(self)):
+            parent = self._parent[index]
+            ids.append(
+                self._explicit_ids[index]
+                if parent == NO_NODE
+                else self.child_id(index, ids[parent])
+            )
+        return ids
+
+    def iter_ids(
+        self, indices: Iterable[int]
+    ) -> Iterator[Tuple[int, str, Optional[str]]]:
+        """(index, id, parent id) of nodes given parents first, e.g. in pre-order
+
+        Each id is built from its parent's, so only the first node of a
+        subtree pays for deriving its id from the root.
+        """
+        ids: Dict[int, str] = {}
+        for index in indices:
+            parent = self._parent[index]
+            parent_id = ids.get(parent)
+            if parent_id is None:
+                ids[index] = self.id(index)
+                parent_id = None if parent == NO_NODE else self.id(parent)
+            else:
+                ids[index] = self.child_id(index, parent_id)
+            yield index, ids[index], parent_id
+
+    def _child_at(self, index: int, position: int) -> int:
+        child = self._first_child[index]
+        while child != NO_NODE and position:
+            child = self._next_sibling[child]
+            position -= 1
+        return child
+
+    def _find_derived(self, id: str) -> Optional[int]:
+        """Index of the node whose derived id this is, or None"""
+        if not len(self):
+            return None
+        parts = id.split("_sub_")
+        # The id starts with an explicit ancestor's id (which may itself
+        # contain "_sub_") or with "step_<n>"; try the longest start first
+        for start in range(len(parts), 0, -1):
+            head, tail = "_sub_".join(parts[:start]), parts[start:]
+            if head in self._index:
+                index = self._index[head]
+            elif start == 1 and head.startswith("step_") and head[5:].isdigit():
+                index = self._child_at(0, int(head[5:]))
+            else:
+                continue
+            for part in tail:
+                if index == NO_NODE or not part.isdigit():
+                    break
+                index = self._child_at(index, int(part))
+            else:
+                if (
+                    index != NO_NODE
+                    and index not in self._explicit_ids
+                    and self.id(index) == id
+                ):
+                    return index
+        return None
+
+    def _find(self, id: str) -> Optional[int]:
+        if self._id_index is None:
+            self._id_index = {id: index for index, id in enumerate(self.ids())}
+        return self._id_index.get(id)
+
+    def description(self, index: int) -> str:
+        return self._descriptions[index]
+
+    def set_description(self, index: int, description: str):
+        self._descriptions[index] = sys.intern(description)
+        self.version += 1
+
+    def weight(self, index: int) -> float:
+        return self._weights[index]
+
+    def set_weight(self, index: int, weight: float):
+        self._weights[index] = weight
+        self.version += 1
+
+    def parent(self, index: int) -> int:
+        return self._parent[index]
+
+    def depth(self, index: int) -> int:
+        return self._depth[index]
+
+    def children(self, index: int) -> Iterator[int]:
+        """Indices of the children of a node, in insertion order"""
+        child = self._first_child[index]
+        while child != NO_NODE:
+            yield child
+            child = self._next_sibling[child]
+
+    def has_children(self, index: int) -> bool:
+        return self._first_child[index] != NO_NODE
+
+    def iter_dfs(self, index: int = 0) -> Iterator[int]:
+        """Indices of a subtree in depth-first pre-order"""
+        stack = [index]
+        while stack:
+            index = stack.pop()
+            yield index
+            children = list(self.children(index))
+            children.reverse()
+            stack.extend(children)
+
+    def iter_bfs(self, index: int = 0) -> Iterator[int]:
+        """Indices of a subtree in breadth-first order"""
+        queue = deque([index])
+        while queue:
+            index = queue.popleft()
+            yield index
+            queue.extend(self.children(index))
+
+    def iter_levels(self, index: int = 0) -> Iterator[List[int]]:
+        """Indices of a subtree grouped by depth, one list per level"""
+        level = [index]
+        while level:
+            yield level
+            level = [child for parent in level for child in self.children(parent)]
+
+    def iter_leaves(self, index: int = 0) -> Iterator[int]:
+        """Indices of the leaves of a subtree in depth-first order"""
+        for node in self.iter_dfs(index):
+            if self._first_child[node] == NO_NODE:
+                yield node
+
+    def index_of(self, id: str) -> int:
+        """Index of the node with the given id (KeyError if missing)"""
+        index = self._find(id)
+        if index is None:
+            raise KeyError(id)
+        return index
+
+    def node(self, key: Union[int, str]) -> "PlanNodeView":
+        """View of a node by index or id"""
+        index = self.index_of(key) if isinstance(key, str) else key
+        if not 0 <= index < len(self):
+            raise IndexError(f"Node index out of range: {index}")
+        return PlanNodeView(self, index)
+
+    def get(self, id: str) -> Optional["PlanNodeView"]:
+        """View of the node with the given id, or None"""
+        index = self._find(id)
+        return None if index is None else PlanNodeView(self, index)
+
+    @property
+    def root(self) -> "PlanNodeView":
+        return self.node(0)
+
+    @property
+    def weights(self) -> "np.ndarray":
+        """Weights of all nodes, indexed by node index (a copy)"""
+        import numpy as np
+
+        return np.array(self._weights, dtype=np.float64)
+
+    @property
+    def depths(self) -> "np.ndarray":
+        """Depth of every node, indexed by node index"""
+        import numpy as np
+
+        return np.array(self._depth, dtype=np.int32)
+
+    @property
+    def parents(self) -> "np.ndarray":
+        """Parent index of every node (NO_NODE for the root)"""
+        import numpy as np
+
+        return np.array(self._parent, dtype=np.int32)
+
+    def _node_dict(
+        self, index: int, id: str, parent_id: Optional[str]
+    ) -> Dict[str, Any]:
+        return {
+            "id": id,
+            "description": self._descriptions[index],
+            "weight": self._weights[index],
+            "parent_id": parent_id,
+            "children": [],
+        }
+
+    def to_dict(self, index: int = 0) -> Dict[str, Any]:
+        """Convert a node and its descendants to the PlanNode dictionary layout"""
+        parent = self._parent[index]
+        result = self._node_dict(
+            index, self.id(index), None if parent == NO_NODE else self.id(parent)
+        )
+        stack = [(index, result)]
+        while stack:
+            index, node_dict = stack.pop()
+            for child in self.children(index):
+                child_dict = self._node_dict(
+                    child, self.child_id(child, node_dict["id"]), node_dict["id"]
+                )
+                node_dict["children"].append(child_dict)
+                stack.append((child, child_dict))
+        return result
+
+    def to_node(self, index: int = 0):
+        """Materialize a node and its descendants as standalone PlanNode objects"""
+        from .models import PlanNode
+
+        root = PlanNode(
+            id=self.id(index),
+            description=self.description(index),
+            weight=self.weight(index),
+        )
+        stack = [(root, index)]
+        while stack:
+            node, node_index = stack.pop()
+            for child_index in self.children(node_index):
+                child = PlanNode(
+                    id=self.child_id(child_index, node.id),
+                    description=self.description(child_index),
+                    weight=self.weight(child_index),
+                )
+                node.add_child(child)
+                stack.append((child, child_index))
+        return root
+
+
+class PlanNodeView:
+    """PlanNode-compatible view of one node stored in a PlanTree"""
+
+    __slots__ = ("tree", "index")
+
+    def __init__(self, tree: PlanTree, index: int):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def id(self) -> str:
+        return self.tree.id(self.index)
+
+    @property
+    def description(self) -> str:
+        return self.tree.description(self.index)
+
+    @description.setter
+    def description(self, description: str):
+        self.tree.set_description(self.index, description)
+
+    @property
+    def weight(self) -> float:
+        return self.tree.weight(self.index)
+
+    @weight.setter
+    def weight(self, weight: float):
+        self.tree.set_weight(self.index, weight)
+
+    @property
+    def parent_id(self) -> Optional[str]:
+        parent = self.tree.parent(self.index)
+        return None if parent == NO_NODE else self.tree.id(parent)
+
+    @property
+    def depth(self) -> int:
+        return self.tree.depth(self.index)
+
+    @property
+    def children(self) -> List["PlanNodeView"]:
+        return [
+            PlanNodeView(self.tree, child) for child in self.tree.children(self.index)
+        ]
+
+    def add_child(self, child: Any) -> "PlanNodeView":
+        """Copy a PlanNode (and its descendants) into the tree as the last child
+
+        Unlike PlanNode.add_child this stores a copy: later changes to child
+        are not seen by the plan. Make them through the returned view instead.
+        """
+        return PlanNodeView(self.tree, self.tree.add_subtree(child, self.index))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert node to dictionary"""
+        return self.tree.to_dict(self.index)
+
+    def __eq__(self, other: Any) -> bool:
+        return (
+            isinstance(other, PlanNodeView)
+            and other.tree is self.tree
+            and other.index == self.index
+        )
+
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.index))
+
+    def __repr__(self) -> str:
+        return f"PlanNodeView(id={self.id!r}, description={self.description!r}, weight={self.weight})"
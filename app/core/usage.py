@@ -0,0 +1,146 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Any, Optional, Iterator
+
+# USD per 1M tokens (prompt, completion, cached prompt)
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60, 0.075),
+    "gpt-4o": (2.50, 10.00, 1.25),
+    "gpt-4.1-mini": (0.40, 1.60, 0.10),
+    "gpt-4.1": (2.00, 8.00, 0.50),
+}
+
+
+class TokenBudgetExceeded(Exception):
+    """Raised when a plan uses more tokens than its budget allows"""
+
+    def __init__(self, used: int, budget: int):
+        super().__init__(
+            f"Token budget exceeded: {used} tokens used, budget is {budget}"
+        )
+        self.used = used
+        self.budget = budget
+
+
+@dataclass
+class LLMCallRecord:
+    """Accounting record for a single LLM call"""
+
+    operation: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+    # Answered from a cache: a cassette replay, or a provider prompt-cache hit
+    cache_hit: bool = False
+    cached_prompt_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def cost(self) -> Optional[float]:
+        """Estimated cost in USD, or None for models without known pricing"""
+        pricing = MODEL_PRICING.get(self.model)
+        if pricing is None:
+            # Dated snapshots such as "gpt-4o-mini-2024-07-18"
+            matches = [name for name in MODEL_PRICING if self.model.startswith(name)]
+            if not matches:
+                return None
+            pricing = MODEL_PRICING[max(matches, key=len)]
+        prompt_price, completion_price, cached_price = pricing
+        return (
+            (self.prompt_tokens - self.cached_prompt_tokens) * prompt_price
+            + self.cached_prompt_tokens * cached_price
+            + self.completion_tokens * completion_price
+        ) / 1_000_000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert record to dictionary"""
+        return asdict(self)
+
+
+class UsageTracker:
+    """Collects LLM call records for one plan and enforces an optional token budget"""
+
+    def __init__(self, token_budget: Optional[int] = None):
+        self.token_budget = token_budget
+        self.records: List[LLMCallRecord] = []
+        self._lock = threading.Lock()
+
+    def record(self, record: LLMCallRecord):
+        """Add a call record"""
+        with self._lock:
+            self.records.append(record)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(r.total_tokens for r in self.records)
+
+    @property
+    def exceeded(self) -> bool:
+        """Whether the token budget has been used up"""
+        return self.token_budget is not None and self.total_tokens >= self.token_budget
+
+    def check_budget(self):
+        """Raise TokenBudgetExceeded if the budget has been used up"""
+        if self.exceeded:
+            raise TokenBudgetExceeded(self.total_tokens, self.token_budget)
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregate records in total and per operation"""
+        with self._lock:
+            records = list(self.records)
+
+        def _aggregate(items: List[LLMCallRecord]) -> Dict[str, Any]:
+            costs = [r.cost for r in items]
+            prompt_tokens = sum(r.prompt_tokens for r in items)
+            cached_prompt_tokens = sum(r.cached_prompt_tokens for r in items)
+            return {
+                "calls": len(items),
+                "prompt_tokens": prompt_tokens,
+                "cached_prompt_tokens": cached_prompt_tokens,
+                "prompt_cache_ratio": (
+                    cached_prompt_tokens / prompt_tokens if prompt_tokens else 0.0
+                ),
+                "completion_tokens": sum(r.completion_tokens for r in items),
+                "total_tokens": sum(r.total_tokens for r in items),
+                "latency": sum(r.latency for r in items),
+                "cache_hits": sum(1 for r in items if r.cache_hit),
+                "cost": None if None in costs else sum(costs),
+            }
+
+        by_operation: Dict[str, List[LLMCallRecord]] = {}
+        for r in records:
+            by_operation.setdefault(r.operation, []).append(r)
+
+        summary = _aggregate(records)
+        summary["models"] = sorted({r.model for r in records})
+        summary["by_operation"] = {
+            operation: _aggregate(items) for operation, items in by_operation.items()
+        }
+        summary["token_budget"] = self.token_budget
+        return summary
+
+
+_current_tracker: ContextVar[Optional[UsageTracker]] = ContextVar(
+    "usage_tracker", default=None
+)
+
+
+def current_tracker() -> Optional[UsageTracker]:
+    """Return the tracker collecting calls in the current context, if any"""
+    return _current_tracker.get()
+
+
+@contextmanager
+def track_usage(tracker: UsageTracker) -> Iterator[UsageTracker]:
+    """Route LLM call records made inside this block to the given tracker"""
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
@@ -0,0 +1,473 @@
+import json
+import time
+import logging
+from abc import abstractmethod
+from dataclasses import dataclass
+from typing import List, Dict, Tuple, Any, Callable
+from app.core.interfaces import LLMClient
+from app.core.usage import LLMCallRecord, current_tracker
+from app.core.tracing import span, traced
+from app.core.metrics import REGISTRY
+from app.prompts.planning import (
+    SYSTEM_PROMPT,
+    INITIAL_PLAN_PROMPT,
+    WEIGHT_ASSIGNMENT_PROMPT,
+    STEP_DECOMPOSITION_PROMPT,
+    MULTIPLE_STEPS_DECOMPOSITION_PROMPT,
+    INITIAL_PLAN_FORMAT,
+    WEIGHT_ASSIGNMENT_FORMAT,
+    STEP_DECOMPOSITION_FORMAT,
+    MULTIPLE_STEPS_DECOMPOSITION_FORMAT,
+)
+
+logger = logging.getLogger(__name__)
+
+LLM_CALLS = REGISTRY.counter(
+    "hieraplan_llm_calls_total", "LLM calls by operation", ["operation"]
+)
+LLM_ERRORS = REGISTRY.counter(
+    "hieraplan_llm_errors_total", "Failed LLM calls by operation", ["operation"]
+)
+LLM_LATENCY = REGISTRY.histogram(
+    "hieraplan_llm_call_duration_seconds", "LLM call latency", ["operation"]
+)
+LLM_TOKENS = REGISTRY.counter(
+    "hieraplan_llm_tokens_total", "LLM tokens by operation", ["operation", "kind"]
+)
+JSON_PARSE_FAILURES = REGISTRY.counter(
+    "hieraplan_json_parse_failures_total",
+    "LLM JSON responses that failed to parse",
+    ["stage"],
+)
+DEFAULT_WEIGHTS = REGISTRY.counter(
+    "hieraplan_default_weights_total",
+    "Steps that received a default weight instead of an LLM-assigned one",
+    ["reason"],
+)
+DECOMPOSE_FALLBACKS = REGISTRY.counter(
+    "hieraplan_decompose_fallbacks_total",
+    "Steps decomposed one by one after a batch decomposition miss",
+    ["reason"],
+)
+STRUCTURED_OUTPUT_INVALID = REGISTRY.counter(
+    "hieraplan_structured_output_invalid_total",
+    "Structured LLM responses and results that failed validation",
+    ["operation", "reason"],
+)
+
+# Re-requests of a structured call while it returns invalid results
+STRUCTURED_RETRIES = 1
+
+# Weight of a step the model gave no valid weight for
+DEFAULT_WEIGHT = 50.0
+
+# Model used by the OpenAI backend unless OPENAI_MODEL says otherwise
+DEFAULT_OPENAI_MODEL = "gpt-4o-mini"
+
+
+def validate_schema(value: Any, schema: Dict[str, Any]) -> bool:
+    """Whether value conforms to a JSON schema
+
+    Covers the keywords the planning response formats use: typed objects
+    with required properties, arrays with minItems, strings and bounded
+    integers.
+    """
+    kind = schema.get("type")
+    if kind == "object":
+        if not isinstance(value, dict):
+            return False
+        properties = schema.get("properties", {})
+        if schema.get("additionalProperties") is False and not set(value) <= set(
+            properties
+        ):
+            return False
+        if any(key not in value for key in schema.get("required", [])):
+            return False
+        return all(
+            validate_schema(value[key], properties[key])
+            for key in value
+            if key in properties
+        )
+    if kind == "array":
+        return (
+            isinstance(value, list)
+            and len(value) >= schema.get("minItems", 0)
+            and all(validate_schema(item, schema.get("items", {})) for item in value)
+        )
+    if kind == "string":
+        return isinstance(value, str)
+    if kind == "integer":
+        return (
+            isinstance(value, int)
+            and not isinstance(value, bool)
+            and schema.get("minimum", value) <= value <= schema.get("maximum", value)
+        )
+    return True
+
+
+def _clean_steps(steps: List[str]) -> List[str]:
+    return [step.strip() for step in steps if step.strip()]
+
+
+def _numbered(steps: List[str]) -> str:
+    return "\n".join(f"{i}. {step}" for i, step in enumerate(steps, 1))
+
+
+@dataclass
+class Completion:
+    """Raw result of a single chat completion"""
+
+    content: str
+    model: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    # Served from a recording instead of the provider (cassette replay)
+    cache_hit: bool = False
+    # Prompt tokens served from the provider's prompt cache
+    cached_prompt_tokens: int = 0
+
+
+class ChatLLMClient(LLMClient):
+    """Prompt-based LLM client
+
+    Builds the planning prompts and parses the responses; subclasses only
+    provide the completion backend through _complete.
+    """
+
+    model: str
+
+    @abstractmethod
+    def _complete(
+        self,
+        operation: str,
+        messages: List[Dict[str, str]],
+        inputs: Dict[str, Any],
+        **params,
+    ) -> Completion:
+        """Run one chat completion
+
+        inputs holds the structured values interpolated into the prompt
+        (request, step or steps), for backends that do not read prompts.
+        Structured calls add attempt, 0 for the first request and counting
+        up on each re-request.
+        """
+        pass
+
+    def _chat(
+        self,
+        operation: str,
+        messages: List[Dict[str, str]],
+        inputs: Dict[str, Any],
+        **params,
+    ) -> str:
+        """Send a chat completion request and record its usage"""
+        with span("llm.completion", operation=operation, model=self.model) as s:
+            LLM_CALLS.inc(operation=operation)
+            start = time.perf_counter()
+            try:
+                completion = self._complete(operation, messages, inputs, **params)
+            except Exception:
+                LLM_ERRORS.inc(operation=operation)
+                raise
+            latency = time.perf_counter() - start
+            LLM_LATENCY.observe(latency, operation=operation)
+            s.set_attribute("prompt_tokens", completion.prompt_tokens)
+            s.set_attribute("completion_tokens", completion.completion_tokens)
+            s.set_attribute("cached_prompt_tokens", completion.cached_prompt_tokens)
+            LLM_TOKENS.inc(completion.prompt_tokens, operation=operation, kind="prompt")
+            LLM_TOKENS.inc(
+                completion.cached_prompt_tokens,
+                operation=operation,
+                kind="cached_prompt",
+            )
+            LLM_TOKENS.inc(
+                completion.completion_tokens, operation=operation, kind="completion"
+            )
+
+        tracker = current_tracker()
+        if tracker is not None:
+            tracker.record(
+                LLMCallRecord(
+                    operation=operation,
+                    model=completion.model,
+                    prompt_tokens=completion.prompt_tokens,
+                    completion_tokens=completion.completion_tokens,
+                    latency=latency,
+                    cache_hit=completion.cache_hit
+                    or completion.cached_prompt_tokens > 0,
+                    cached_prompt_tokens=completion.cached_prompt_tokens,
+                )
+            )
+
+        return completion.content.strip()
+
+    @staticmethod
+    def _messages(prompt: str) -> List[Dict[str, str]]:
+        """Chat messages for a prompt, behind the system prompt shared by all calls"""
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+
+    def _parse_llm_json_response(self, response_text: str) -> dict:
+        """Parse JSON response from LLM, handling various formats and cleanup"""
+        logger.debug(f"Parsing raw response: {response_text}")
+
+        # Remove markdown code blocks
+        if "```" in response_text:
+            parts = response_text.split("```")
+            for part in parts:
+                if "{" in part and "}" in part:
+                    response_text = part
+                    break
+
+        # Remove any leading/trailing non-JSON content
+        start_idx = response_text.find("{")
+        end_idx = response_text.rfind("}") + 1
+        if start_idx != -1 and end_idx != 0:
+            response_text = response_text[start_idx:end_idx]
+
+        # Clean up common formatting issues
+        response_text = response_text.replace("\n", " ")
+        response_text = response_text.replace("    ", " ")
+        response_text = " ".join(response_text.split())
+
+        try:
+            return json.loads(response_text)
+        except json.JSONDecodeError as e:
+            logger.error(f"Initial JSON parse failed: {e}")
+            JSON_PARSE_FAILURES.inc(stage="initial")
+            # Try additional cleanup
+            response_text = response_text.replace("\\", "")
+            response_text = response_text.replace('""', '"')
+            try:
+                return json.loads(response_text)
+            except json.JSONDecodeError:
+                JSON_PARSE_FAILURES.inc(stage="final")
+                raise
+
+    def _parse_structured(
+        self, operation: str, response_text: str, response_format: Dict[str, Any]
+    ) -> List[Any]:
+        """Parse a structured response and return the items of its array field
+
+        Every planning schema is an object with a single array field. Items
+        that fail the item schema are dropped (and counted) rather than
+        failing the response, so batch callers can re-request just those.
+        Raises ValueError if the response is not such an object.
+        """
+        schema = response_format["json_schema"]["schema"]
+        ((field, array_schema),) = schema["properties"].items()
+
+        try:
+            # Structured outputs are plain JSON; the cleanup is for backends
+            # that ignore the response format
+            data = json.loads(response_text)
+        except json.JSONDecodeError:
+            try:
+                data = self._parse_llm_json_response(response_text)
+            except json.JSONDecodeError:
+                STRUCTURED_OUTPUT_INVALID.inc(operation=operation, reason="json")
+                raise
+
+        if not isinstance(data, dict) or not isinstance(data.get(field), list):
+            STRUCTURED_OUTPUT_INVALID.inc(operation=operation, reason="shape")
+            raise ValueError(f"{operation} response has no {field!r} array")
+
+        items = [
+            item for item in data[field] if validate_schema(item, array_schema["items"])
+        ]
+        if len(items) < len(data[field]):
+            STRUCTURED_OUTPUT_INVALID.inc(
+                len(data[field]) - len(items), operation=operation, reason="item"
+            )
+        return items
+
+    def _structured_steps(
+        self,
+        operation: str,
+        prompt: str,
+        inputs: Dict[str, Any],
+        response_format: Dict[str, Any],
+        **params,
+    ) -> List[str]:
+        """Steps of a list-shaped structured call, or [] if no attempt was valid"""
+        for attempt in range(STRUCTURED_RETRIES + 1):
+            response_text = self._chat(
+                operation,
+                self._messages(prompt),
+                {**inputs, "attempt": attempt},
+                response_format=response_format,
+                **params,
+            )
+            try:
+                steps = _clean_steps(
+                    self._parse_structured(operation, response_text, response_format)
+                )
+            except ValueError as e:
+                logger.warning(f"Invalid {operation} response: {e}")
+                continue
+            if steps:
+                return steps
+        return []
+
+    def _structured_indexed(
+        self,
+        operation: str,
+        template: str,
+        steps: List[str],
+        response_format: Dict[str, Any],
+        convert: Callable[[Any], Any],
+        tokens_per_step: int,
+        max_tokens: int,
+        **params,
+    ) -> Dict[int, Any]:
+        """Index-keyed results of a batch call, by position in steps
+
+        Steps are numbered in the prompt and every result names its step by
+        that number. Steps whose result is missing, duplicated, out of range
+        or rejected by convert (which returns None for those) are re-requested
+        on their own, up to STRUCTURED_RETRIES times; steps still without a
+        valid result are left out. The completion budget grows with the
+        batch, tokens_per_step per step but at least max_tokens.
+        """
+        properties = response_format["json_schema"]["schema"]["properties"]
+        ((_, array_schema),) = properties.items()
+        value_field = next(
+            key for key in array_schema["items"]["properties"] if key != "index"
+        )
+
+        results = {}
+        pending = list(range(len(steps)))
+        for attempt in range(STRUCTURED_RETRIES + 1):
+            if not pending:
+                break
+            if attempt:
+                logger.warning(
+                    f"Re-requesting {len(pending)} of {len(steps)} steps for {operation}"
+                )
+
+            batch = [steps[i] for i in pending]
+            response_text = self._chat(
+                operation,
+                self._messages(template.format(steps=_numbered(batch))),
+                {"steps": batch, "attempt": attempt},
+                response_format=response_format,
+                max_tokens=max(max_tokens, tokens_per_step * len(batch)),
+                **params,
+            )
+            try:
+                items = self._parse_structured(
+                    operation, response_text, response_format
+                )
+            except ValueError as e:
+                logger.warning(f"Invalid {operation} response: {e}")
+                continue
+
+            answered = {}
+            for item in items:
+                position = item["index"] - 1
+                if 0 <= position < len(batch) and position not in answered:
+                    value = convert(item[value_field])
+                    if value is not None:
+                        answered[position] = value
+            if len(answered) < len(batch):
+                STRUCTURED_OUTPUT_INVALID.inc(
+                    len(batch) - len(answered), operation=operation, reason="unanswered"
+                )
+
+            for position, value in answered.items():
+                results[pending[position]] = value
+            pending = [
+                i for position, i in enumerate(pending) if position not in answered
+            ]
+
+        return results
+
+    @traced()
+    def generate_initial_plan(self, request: str) -> List[str]:
+        """Generate initial plan with dynamic number of steps (5-10)"""
+        logger.info(f"Generating initial plan for request: {request[:50]}...")
+
+        prompt = INITIAL_PLAN_PROMPT.format(request=request)
+
+        steps = self._structured_steps(
+            "generate_initial_plan",
+            prompt,
+            {"request": request},
+            INITIAL_PLAN_FORMAT,
+            temperature=0.7,
+            max_tokens=500,
+        )
+        if not steps:
+            raise ValueError("The model returned no valid initial plan")
+
+        logger.info(f"Generated {len(steps)} initial plan steps")
+        return steps
+
+    @traced()
+    def assign_weights(self, steps: List[str]) -> List[Tuple[str, float]]:
+        """Assign weights to plan steps based on complexity"""
+        logger.info(f"Assigning weights to {len(steps)} steps")
+        if not steps:
+            return []
+
+        weights = self._structured_indexed(
+            "assign_weights",
+            WEIGHT_ASSIGNMENT_PROMPT,
+            steps,
+            WEIGHT_ASSIGNMENT_FORMAT,
+            float,
+            tokens_per_step=20,
+            temperature=0.3,
+            max_tokens=500,
+        )
+
+        weighted_steps = []
+        for i, step in enumerate(steps):
+            if i not in weights:
+                logger.warning(f"No valid weight for step: {step}")
+                DEFAULT_WEIGHTS.inc(reason="invalid")
+            weighted_steps.append((step, weights.get(i, DEFAULT_WEIGHT)))
+        return weighted_steps
+
+    @traced()
+    def decompose_step(self, step: str) -> List[str]:
+        """Decompose a single step into sub-steps"""
+        logger.info(f"Decomposing step: {step}")
+
+        prompt = STEP_DECOMPOSITION_PROMPT.format(step=step)
+
+        return self._structured_steps(
+            "decompose_step",
+            prompt,
+            {"step": step},
+            STEP_DECOMPOSITION_FORMAT,
+            temperature=0.7,
+            max_tokens=300,
+        )
+
+    @traced()
+    def decompose_multiple_steps(self, steps: List[str]) -> Dict[str, List[str]]:
+        """Decompose multiple steps at once for efficiency"""
+        logger.info(f"Decomposing {len(steps)} steps at once")
+
+        sub_steps = self._structured_indexed(
+            "decompose_multiple_steps",
+            MULTIPLE_STEPS_DECOMPOSITION_PROMPT,
+            steps,
+            MULTIPLE_STEPS_DECOMPOSITION_FORMAT,
+            lambda value: _clean_steps(value) or None,
+            tokens_per_step=100,
+            temperature=0.5,
+            max_tokens=1000,
+        )
+
+        result = {}
+        for i, step in enumerate(steps):
+            if i in sub_steps:
+                result[step] = sub_steps[i]
+            else:
+                DECOMPOSE_FALLBACKS.inc(reason="invalid")
+                result[step] = self.decompose_step(step)
+        return result
@@ -0,0 +1,180 @@
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import deque
+from typing import List, Dict, Any, Deque
+from app.llm.base import ChatLLMClient, Completion
+
+logger = logging.getLogger(__name__)
+
+# One lock for all recorders in the process, so concurrent sessions
+# appending to the same cassette never interleave lines
+_write_lock = threading.Lock()
+
+
+class CassetteMissError(LookupError):
+    """Raised when a replayed request has no recorded response"""
+
+    pass
+
+
+def prompt_hash(operation: str, messages: List[Dict[str, str]]) -> str:
+    """Stable hash identifying a request by operation and prompt messages"""
+    payload = json.dumps(
+        {"operation": operation, "messages": messages},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_cassette(path: str) -> List[Dict[str, Any]]:
+    """Read all interactions from a cassette file (one JSON object per line)"""
+    interactions = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                interactions.append(json.loads(line))
+    return interactions
+
+
+def cassette_requests(path: str) -> List[str]:
+    """Return the planning requests recorded in a cassette, in order"""
+    return [
+        interaction["inputs"]["request"]
+        for interaction in load_cassette(path)
+        if interaction["operation"] == "generate_initial_plan"
+    ]
+
+
+class RecordingLLMClient(ChatLLMClient):
+    """Wraps a backend and appends every request/response pair to a cassette
+
+    Each line holds the operation, prompt hash, inputs, messages, parameters,
+    response content, token usage and the original latency.
+    """
+
+    def __init__(self, inner: ChatLLMClient, path: str, store_messages: bool = True):
+        """Initialize recording client"""
+        self.inner = inner
+        self.path = path
+        self.store_messages = store_messages
+        self.model = inner.model
+        logger.info(f"Recording LLM traffic to cassette: {path}")
+
+    def _complete(
+        self,
+        operation: str,
+        messages: List[Dict[str, str]],
+        inputs: Dict[str, Any],
+        **params,
+    ) -> Completion:
+        """Forward the request to the wrapped backend and record the exchange"""
+        start = time.perf_counter()
+        completion = self.inner._complete(operation, messages, inputs, **params)
+        latency = time.perf_counter() - start
+
+        interaction = {
+            "operation": operation,
+            "prompt_hash": prompt_hash(operation, messages),
+            "inputs": inputs,
+            "messages": messages if self.store_messages else None,
+            "params": params,
+            "content": completion.content,
+            "model": completion.model,
+            "prompt_tokens": completion.prompt_tokens,
+            "completion_tokens": completion.completion_tokens,
+            "cached_prompt_tokens": completion.cached_prompt_tokens,
+            "latency": latency,
+            "recorded_at": time.time(),
+        }
+        line = json.dumps(interaction, ensure_ascii=False) + "\n"
+        with _write_lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+        return completion
+
+
+class ReplayLLMClient(ChatLLMClient):
+    """Serves recorded responses from a cassette instead of calling an LLM
+
+    mode "sequential" replays interactions in recording order regardless of
+    the prompt; mode "hash" looks each request up by prompt hash, serving
+    repeated prompts in the order they were recorded. With
+    reproduce_latency the original latency (times latency_scale) is slept.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: str = "hash",
+        reproduce_latency: bool = False,
+        latency_scale: float = 1.0,
+    ):
+        """Initialize replay client"""
+        if mode not in ("sequential", "hash"):
+            raise ValueError(f"Unsupported replay mode: {mode}")
+
+        self.path = path
+        self.mode = mode
+        self.reproduce_latency = reproduce_latency
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+
+        interactions = load_cassette(path)
+        self.model = interactions[0]["model"] if interactions else "replay"
+        self._sequence: Deque[Dict[str, Any]] = deque(interactions)
+        self._by_hash: Dict[str, Deque[Dict[str, Any]]] = {}
+        for interaction in interactions:
+            self._by_hash.setdefault(interaction["prompt_hash"], deque()).append(
+                interaction
+            )
+        logger.info(f"Loaded {len(interactions)} interactions from cassette: {path}")
+
+    def _next_interaction(
+        self, operation: str, messages: List[Dict[str, str]]
+    ) -> Dict[str, Any]:
+        with self._lock:
+            if self.mode == "sequential":
+                if not self._sequence:
+                    raise CassetteMissError("Cassette exhausted")
+                interaction = self._sequence.popleft()
+                if interaction["operation"] != operation:
+                    logger.warning(
+                        f"Replaying {interaction['operation']} response for {operation} request"
+                    )
+                return interaction
+
+            key = prompt_hash(operation, messages)
+            recorded = self._by_hash.get(key)
+            if not recorded:
+                raise CassetteMissError(
+                    f"No recorded response for {operation} ({key[:12]})"
+                )
+            # Keep the last response around for prompts repeated more often than recorded
+            return recorded.popleft() if len(recorded) > 1 else recorded[0]
+
+    def _complete(
+        self,
+        operation: str,
+        messages: List[Dict[str, str]],
+        inputs: Dict[str, Any],
+        **params,
+    ) -> Completion:
+        """Return the recorded response for this request"""
+        interaction = self._next_interaction(operation, messages)
+        if self.reproduce_latency:
+            time.sleep(interaction["latency"] * self.latency_scale)
+
+        return Completion(
+            content=interaction["content"],
+            model=interaction["model"],
+            prompt_tokens=interaction["prompt_tokens"],
+            completion_tokens=interaction["completion_tokens"],
+            cache_hit=True,
+            cached_prompt_tokens=interaction.get("cached_prompt_tokens", 0),
+        )
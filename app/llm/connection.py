@@ -0,0 +1,191 @@
+import os
+import time
+import hashlib
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Tuple
+import httpx
+from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolConfig:
+    """HTTP connection pool settings shared by pooled OpenAI clients"""
+
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 60.0
+    timeout: float = 120.0
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        """Build pool settings from OPENAI_POOL_* environment variables"""
+        return cls(
+            max_connections=int(
+                os.environ.get("OPENAI_POOL_MAX_CONNECTIONS", cls.max_connections)
+            ),
+            max_keepalive_connections=int(
+                os.environ.get(
+                    "OPENAI_POOL_MAX_KEEPALIVE", cls.max_keepalive_connections
+                )
+            ),
+            keepalive_expiry=float(
+                os.environ.get("OPENAI_POOL_KEEPALIVE_EXPIRY", cls.keepalive_expiry)
+            ),
+            timeout=float(os.environ.get("OPENAI_POOL_TIMEOUT", cls.timeout)),
+        )
+
+
+class ConnectionStats:
+    """Thread-safe request and connection counters for one pooled client"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.failed_connections = 0
+
+    def on_request(self, request: httpx.Request):
+        """httpx request hook: count the request and attach the trace callback"""
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    def _trace(self, event_name: str, info: Dict[str, Any]):
+        """httpcore trace callback used to detect new connections"""
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.new_connections += 1
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+        elif event_name == "connection.connect_tcp.failed":
+            with self._lock:
+                self.failed_connections += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert stats to dictionary"""
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_ratio": reused / self.requests if self.requests else 0.0,
+                "tls_handshakes": self.tls_handshakes,
+                "failed_connections": self.failed_connections,
+            }
+
+
+class OpenAIClientRegistry:
+    """Process-wide registry of pooled OpenAI clients
+
+    Clients are keyed by API key, base URL and pool settings, so every session
+    and worker thread using the same credentials shares one HTTP connection pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clients: Dict[Tuple[str, Optional[str], PoolConfig], OpenAI] = {}
+        self._stats: Dict[Tuple[str, Optional[str], PoolConfig], ConnectionStats] = {}
+
+    @staticmethod
+    def _key(
+        api_key: str, base_url: Optional[str], config: PoolConfig
+    ) -> Tuple[str, Optional[str], PoolConfig]:
+        # Never keep the raw key around as a dictionary key
+        key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        return key_hash, base_url, config
+
+    def get_client(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        config: Optional[PoolConfig] = None,
+    ) -> OpenAI:
+        """Return the shared OpenAI client for these settings, creating it once"""
+        config = config or PoolConfig.from_env()
+        key = self._key(api_key, base_url, config)
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                return client
+
+            stats = ConnectionStats()
+            http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=config.max_connections,
+                    max_keepalive_connections=config.max_keepalive_connections,
+                    keepalive_expiry=config.keepalive_expiry,
+                ),
+                timeout=config.timeout,
+                event_hooks={"request": [stats.on_request]},
+            )
+            client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client)
+
+            self._clients[key] = client
+            self._stats[key] = stats
+            logger.info(
+                f"Created pooled OpenAI client (max connections: {config.max_connections}, "
+                f"keep-alive: {config.max_keepalive_connections}, expiry: {config.keepalive_expiry}s)"
+            )
+            return client
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return connection reuse metrics for every pooled client"""
+        with self._lock:
+            items = list(self._stats.items())
+        return {
+            f"{base_url or 'default'}#{key_hash}": stats.to_dict()
+            for (key_hash, base_url, _), stats in items
+        }
+
+    def health_check(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        config: Optional[PoolConfig] = None,
+        timeout: float = 5.0,
+    ) -> Dict[str, Any]:
+        """Issue a cheap request through the pooled client and report its status"""
+        client = self.get_client(api_key, base_url, config)
+        start = time.perf_counter()
+        try:
+            client.with_options(timeout=timeout, max_retries=0).models.list()
+            return {"ok": True, "latency": time.perf_counter() - start}
+        except Exception as e:
+            logger.warning(f"OpenAI health check failed: {e}")
+            return {
+                "ok": False,
+                "latency": time.perf_counter() - start,
+                "error": str(e),
+            }
+
+    def close_all(self):
+        """Close every pooled client and forget it"""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._stats.clear()
+        for client in clients:
+            client.close()
+
+
+_registry = OpenAIClientRegistry()
+
+
+def get_registry() -> OpenAIClientRegistry:
+    """Return the process-wide OpenAI client registry"""
+    return _registry
+
+
+def get_openai_client(
+    api_key: str, base_url: Optional[str] = None, config: Optional[PoolConfig] = None
+) -> OpenAI:
+    """Return a pooled OpenAI client from the process-wide registry"""
+    return _registry.get_client(api_key, base_url, config)
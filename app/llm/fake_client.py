@@ -0,0 +1,227 @@
+import json
+import math
+import time
+import random
+import logging
+import threading
+from typing import List, Dict, Any, Callable, Tuple, Union
+from app.llm.base import ChatLLMClient, Completion
+
+logger = logging.getLogger(__name__)
+
+LatencyModel = Callable[[random.Random], float]
+
+_VERBS = [
+    "Define",
+    "Research",
+    "Design",
+    "Prototype",
+    "Validate",
+    "Document",
+    "Review",
+    "Plan",
+    "Implement",
+    "Test",
+    "Measure",
+    "Analyze",
+    "Prepare",
+    "Coordinate",
+    "Finalize",
+]
+_OBJECTS = [
+    "requirements",
+    "scope",
+    "budget",
+    "timeline",
+    "stakeholder feedback",
+    "key risks",
+    "success metrics",
+    "resources",
+    "dependencies",
+    "deliverables",
+    "data sources",
+    "acceptance criteria",
+]
+_STOPWORDS = {
+    "a",
+    "an",
+    "the",
+    "and",
+    "or",
+    "for",
+    "of",
+    "to",
+    "in",
+    "on",
+    "with",
+    "my",
+    "our",
+    "i",
+    "we",
+}
+
+
+class FakeLLMError(Exception):
+    """Injected failure raised by the fake LLM backend"""
+
+    pass
+
+
+def fixed_latency(seconds: float) -> LatencyModel:
+    """Latency model returning a constant delay"""
+    return lambda rng: seconds
+
+
+def uniform_latency(low: float, high: float) -> LatencyModel:
+    """Latency model drawing uniformly between low and high seconds"""
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal_latency(median: float, sigma: float = 0.5) -> LatencyModel:
+    """Long-tailed latency model, closest to real API behaviour"""
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return max(1, math.ceil(len(text) / 4))
+
+
+class FakeLLMClient(ChatLLMClient):
+    """Deterministic offline LLM backend for benchmarks and development
+
+    Responses are synthesized from the seed, the prompt and the retry
+    number of the call, so the same request always yields the same plan,
+    whatever else the client was asked before. Output goes through the same
+    parsing path as OpenAILLMClient, and latency, failures and truncation
+    can be injected to mimic a real provider. Those are drawn from one
+    seeded stream per client, so like a provider's they depend on call
+    order, and a retry of a failed call may succeed.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        latency: Union[float, LatencyModel] = 0.0,
+        latency_per_token: float = 0.0,
+        failure_rate: float = 0.0,
+        truncation_rate: float = 0.0,
+        model: str = "fake-llm",
+        steps_range: Tuple[int, int] = (5, 10),
+        sub_steps_range: Tuple[int, int] = (2, 3),
+    ):
+        """Initialize fake LLM client
+
+        steps_range and sub_steps_range bound how many steps an initial plan
+        and a decomposition produce, to simulate smaller or larger plans.
+        """
+        self.seed = seed
+        self.latency = (
+            fixed_latency(latency) if isinstance(latency, (int, float)) else latency
+        )
+        self.latency_per_token = latency_per_token
+        self.failure_rate = failure_rate
+        self.truncation_rate = truncation_rate
+        self.model = model
+        self.steps_range = steps_range
+        self.sub_steps_range = sub_steps_range
+        self._lock = threading.Lock()
+        self._faults = random.Random(seed)
+        logger.info(f"Fake LLM client initialized with seed: {seed}")
+
+    def complete(
+        self,
+        operation: str,
+        messages: List[Dict[str, str]],
+        inputs: Dict[str, Any],
+        **params,
+    ) -> Completion:
+        """One synthesized completion outside the planning calls
+
+        For front ends such as the fake OpenAI server. Unlike the planning
+        methods, it records no usage, metrics or spans.
+        """
+        return self._complete(operation, messages, inputs, **params)
+
+    def _complete(
+        self,
+        operation: str,
+        messages: List[Dict[str, str]],
+        inputs: Dict[str, Any],
+        **params,
+    ) -> Completion:
+        """Synthesize a completion, sleeping for the simulated latency"""
+        rng = random.Random(
+            f"{self.seed}:{inputs.get('attempt', 0)}:{operation}:{messages[-1]['content']}"
+        )
+        content = self.synthesize(operation, inputs, rng)
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+
+        max_tokens = params.get("max_tokens")
+        if max_tokens and estimate_tokens(content) > max_tokens:
+            content = content[: max_tokens * 4]
+        with self._lock:
+            truncated = self._faults.random() < self.truncation_rate
+            cut = self._faults.randint(1, max(1, len(content) - 1))
+            latency = self.latency(self._faults)
+            failed = self._faults.random() < self.failure_rate
+        if truncated:
+            content = content[:cut]
+        completion_tokens = estimate_tokens(content)
+
+        delay = max(0.0, latency) + self.latency_per_token * completion_tokens
+        if delay:
+            time.sleep(delay)
+
+        if failed:
+            raise FakeLLMError(f"Injected failure for {operation}")
+
+        return Completion(
+            content=content,
+            model=self.model,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+
+    def synthesize(
+        self, operation: str, inputs: Dict[str, Any], rng: random.Random
+    ) -> str:
+        """Produce response text in the format the real model is asked for"""
+        if operation == "generate_initial_plan":
+            steps = self._steps(rng, self._topic(inputs["request"]), *self.steps_range)
+            return json.dumps({"steps": steps}, ensure_ascii=False)
+        if operation == "assign_weights":
+            weights = [
+                {"index": i, "weight": rng.randint(10, 95)}
+                for i, _ in enumerate(inputs["steps"], 1)
+            ]
+            return json.dumps({"weights": weights})
+        if operation == "decompose_step":
+            sub_steps = self._sub_steps(rng, inputs["step"])
+            return json.dumps({"sub_steps": sub_steps}, ensure_ascii=False)
+        if operation == "decompose_multiple_steps":
+            decompositions = [
+                {"index": i, "sub_steps": self._sub_steps(rng, step)}
+                for i, step in enumerate(inputs["steps"], 1)
+            ]
+            return json.dumps({"decompositions": decompositions}, ensure_ascii=False)
+        raise ValueError(f"Unsupported operation: {operation}")
+
+    @staticmethod
+    def _topic(text: str, max_words: int = 5) -> str:
+        words = [w.strip(".,:;!?\"'()") for w in text.split()]
+        words = [w for w in words if w and w.lower() not in _STOPWORDS]
+        return " ".join(words[:max_words]) or "the project"
+
+    @staticmethod
+    def _steps(rng: random.Random, topic: str, low: int, high: int) -> List[str]:
+        # Distinct verb/object pairs, so step descriptions never collide
+        pairs = rng.sample(range(len(_VERBS) * len(_OBJECTS)), rng.randint(low, high))
+        return [
+            f"{_VERBS[p // len(_OBJECTS)]} {_OBJECTS[p % len(_OBJECTS)]} for {topic}"
+            for p in pairs
+        ]
+
+    def _sub_steps(self, rng: random.Random, step: str) -> List[str]:
+        return self._steps(rng, self._topic(step, max_words=4), *self.sub_steps_range)
@@ -0,0 +1,230 @@
+import re
+import json
+import time
+import uuid
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional, Tuple
+from app.llm.fake_client import FakeLLMClient, FakeLLMError, lognormal_latency
+from app.prompts.planning import (
+    INITIAL_PLAN_PROMPT,
+    WEIGHT_ASSIGNMENT_PROMPT,
+    STEP_DECOMPOSITION_PROMPT,
+    MULTIPLE_STEPS_DECOMPOSITION_PROMPT,
+)
+
+logger = logging.getLogger(__name__)
+
+# (operation, template, interpolated field)
+_TEMPLATES = [
+    ("generate_initial_plan", INITIAL_PLAN_PROMPT, "request"),
+    ("assign_weights", WEIGHT_ASSIGNMENT_PROMPT, "steps"),
+    ("decompose_step", STEP_DECOMPOSITION_PROMPT, "step"),
+    ("decompose_multiple_steps", MULTIPLE_STEPS_DECOMPOSITION_PROMPT, "steps"),
+]
+
+
+def _template_prefix(template: str, field: str) -> str:
+    """Static text of a template, which ends with its only variable field"""
+    literal = template.replace("{{", "{").replace("}}", "}")
+    prefix, suffix = literal.split("{" + field + "}")
+    if suffix:
+        raise ValueError(f"Prompt template must end with {{{field}}}")
+    return prefix
+
+
+_PREFIXES = [
+    (operation, field, _template_prefix(template, field))
+    for operation, template, field in _TEMPLATES
+]
+_NUMBERED_LINE = re.compile(r"^\s*\d+\.\s+(.*\S)\s*$", re.M)
+
+
+def parse_prompt(prompt: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Recover the operation and its inputs from a rendered planning prompt"""
+    for operation, field, prefix in _PREFIXES:
+        if not prompt.startswith(prefix):
+            continue
+        value = prompt[len(prefix) :]
+        if field == "steps":
+            return operation, {"steps": _NUMBERED_LINE.findall(value)}
+        return operation, {field: value}
+    return None
+
+
+class FakeOpenAIServer:
+    """OpenAI-compatible HTTP stand-in backed by FakeLLMClient
+
+    Serves POST /v1/chat/completions and GET /v1/models, so the real
+    OpenAILLMClient (and its connection pool) can be exercised offline by
+    pointing OPENAI_BASE_URL at it.
+    """
+
+    def __init__(
+        self, fake_client: FakeLLMClient, host: str = "127.0.0.1", port: int = 0
+    ):
+        """Initialize fake OpenAI server"""
+        self.fake_client = fake_client
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        """Serve requests from a daemon thread"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Fake OpenAI server listening on {self.base_url}")
+        return self
+
+    def stop(self):
+        """Stop serving and release the socket"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "FakeOpenAIServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def chat_completion(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """Answer a chat completion request body with (status, response body)"""
+        messages: List[Dict[str, str]] = body.get("messages") or []
+        if not messages:
+            return 400, _error("messages is required", "invalid_request_error")
+
+        parsed = parse_prompt(messages[-1].get("content", ""))
+        if parsed is None:
+            return 400, _error("Unrecognized prompt", "invalid_request_error")
+        operation, inputs = parsed
+
+        params = {}
+        if body.get("max_tokens"):
+            params["max_tokens"] = body["max_tokens"]
+        try:
+            completion = self.fake_client.complete(
+                operation, messages, inputs, **params
+            )
+        except FakeLLMError as e:
+            return 500, _error(str(e), "server_error")
+
+        finish_reason = "stop"
+        if (
+            params.get("max_tokens")
+            and completion.completion_tokens >= params["max_tokens"]
+        ):
+            finish_reason = "length"
+
+        return 200, {
+            "id": f"chatcmpl-fake-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model") or completion.model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": {"role": "assistant", "content": completion.content},
+                    "finish_reason": finish_reason,
+                }
+            ],
+            "usage": {
+                "prompt_tokens": completion.prompt_tokens,
+                "completion_tokens": completion.completion_tokens,
+                "total_tokens": completion.prompt_tokens + completion.completion_tokens,
+                "prompt_tokens_details": {
+                    "cached_tokens": completion.cached_prompt_tokens
+                },
+            },
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/models"):
+                    model = server.fake_client.model
+                    self._send(
+                        200,
+                        {"object": "list", "data": [{"id": model, "object": "model"}]},
+                    )
+                else:
+                    self._send(404, _error("Not found", "invalid_request_error"))
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send(404, _error("Not found", "invalid_request_error"))
+                    return
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send(
+                        400, _error("Invalid JSON body", "invalid_request_error")
+                    )
+                    return
+                self._send(*server.chat_completion(body))
+
+            def _send(self, status: int, payload: Dict[str, Any]):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        return _Handler
+
+
+def _error(message: str, error_type: str) -> Dict[str, Any]:
+    return {"error": {"message": message, "type": error_type}}
+
+
+def main():
+    """Run the fake OpenAI server from the command line"""
+    parser = argparse.ArgumentParser(description="OpenAI-compatible fake LLM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="median latency in seconds"
+    )
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--truncation-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    fake_client = FakeLLMClient(
+        seed=args.seed,
+        latency=lognormal_latency(args.latency) if args.latency > 0 else 0.0,
+        failure_rate=args.failure_rate,
+        truncation_rate=args.truncation_rate,
+    )
+    server = FakeOpenAIServer(fake_client, args.host, args.port)
+    logger.info(f"Serving fake OpenAI API on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
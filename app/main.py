@@ -1,9 +1,13 @@
 import os
+import sys
 import logging
 from dotenv import load_dotenv
-from app.llm.openai_client import OpenAILLMClient  # Changed to absolute import
+from app.llm.cassette import RecordingLLMClient, ReplayLLMClient
 from app.planning.htn import HTNPlanningStrategy  # Changed to absolute import
 from app.planning.system import PlanningSystem  # Changed to absolute import
+from app.core.tracing import ChromeTraceSink, get_tracer
+from app.core.metrics import REGISTRY, start_metrics_server
+from app.core.store import PlanStore
 
 # Load environment variables
 load_dotenv()
@@ -17,16 +21,54 @@ logger = logging.getLogger(__name__)
 
 def main():
     """Main function"""
-    # Create LLM client
-    llm_client = OpenAILLMClient(api_key=os.environ.get("OPENAI_API_KEY"))
+    # Optional Chrome trace of the pipeline (open in chrome://tracing or Perfetto)
+    trace_path = os.environ.get("HIERAPLAN_TRACE")
+    trace_sink = None
+    if trace_path:
+        trace_sink = ChromeTraceSink()
+        get_tracer().add_sink(trace_sink)
+
+    # Optional Prometheus endpoint and/or file dump of planner metrics
+    metrics_port = os.environ.get("HIERAPLAN_METRICS_PORT")
+    if metrics_port:
+        start_metrics_server(int(metrics_port))
+    metrics_file = os.environ.get("HIERAPLAN_METRICS_FILE")
+
+    # Create LLM client (HIERAPLAN_LLM_BACKEND=fake runs offline without an API key)
+    # Backends are imported on use so offline runs never load the OpenAI SDK
+    backend = os.environ.get("HIERAPLAN_LLM_BACKEND", "openai")
+    if backend == "fake":
+        from app.llm.fake_client import FakeLLMClient
+
+        llm_client = FakeLLMClient(seed=int(os.environ.get("HIERAPLAN_FAKE_SEED", 0)))
+    elif backend == "replay":
+        llm_client = ReplayLLMClient(os.environ["HIERAPLAN_CASSETTE"])
+    else:
+        from app.llm.openai_client import OpenAILLMClient
+
+        llm_client = OpenAILLMClient(api_key=os.environ.get("OPENAI_API_KEY"))
+
+    # Optionally capture all LLM traffic for offline replay
+    record_path = os.environ.get("HIERAPLAN_RECORD_CASSETTE")
+    if record_path:
+        llm_client = RecordingLLMClient(llm_client, record_path)
 
     # Create planning strategy
+    token_budget = os.environ.get("PLAN_TOKEN_BUDGET")
     planning_strategy = HTNPlanningStrategy(
-        llm_client=llm_client, weight_threshold=70, max_depth=2
+        llm_client=llm_client,
+        weight_threshold=70,
+        max_depth=2,
+        token_budget=int(token_budget) if token_budget else None,
     )
 
     # Create planning system
-    planning_system = PlanningSystem(planning_strategy=planning_strategy)
+    # Optionally persist plans in SQLite and reuse them for repeated requests
+    store_path = os.environ.get("HIERAPLAN_PLAN_STORE")
+    planning_system = PlanningSystem(
+        planning_strategy=planning_strategy,
+        plan_store=PlanStore(store_path) if store_path else None,
+    )
 
     # Get user input
     prompt = input("Enter your prompt: ")
@@ -37,16 +79,51 @@ def main():
     # Process request
     plan = planning_system.process_request(prompt)
 
+    if plan.usage is not None:
+        usage = plan.usage.summary()
+        logger.info(
+            f"Plan used {usage['total_tokens']} tokens in {usage['calls']} LLM calls"
+            f" (estimated cost: ${usage['cost'] or 0:.4f})"
+        )
+
+    stats = plan.stats()
+    logger.info(
+        f"Plan has {stats.node_count} steps, {stats.max_depth} levels deep"
+        f" (mean difficulty {stats.mean_weight:.1f}, max {stats.max_weight:.0f})"
+    )
+
     # Export plan
-    plan_md = planning_system.export_plan(plan, format="md")
-    print(plan_md)
+    planning_system.write_plan(plan, sys.stdout, format="md")
+
+    # Optionally render a static diagram with Graphviz (e.g. plan.svg)
+    image_path = os.environ.get("HIERAPLAN_PLAN_IMAGE")
+    if image_path:
+        import graphviz
+        from app.visualization.graphviz_viz import GraphvizVisualizer
+
+        try:
+            GraphvizVisualizer().write(plan, image_path)
+            logger.info(f"Plan diagram rendered to {image_path}")
+        except graphviz.ExecutableNotFound:
+            logger.warning("Graphviz is not installed; skipping the plan diagram")
+            image_path = None
 
     # Save plan to file
-    with open("hierarchical_plan.md", "w") as f:
-        f.write(plan_md)
+    with open("hierarchical_plan.md", "w", encoding="utf-8") as f:
+        planning_system.write_plan(plan, f, format="md")
+        if image_path:
+            f.write(f"\n![Plan diagram]({image_path})\n")
 
     logger.info("Plan exported to hierarchical_plan.md")
 
+    if trace_sink is not None:
+        trace_sink.export(trace_path)
+        logger.info(f"Trace exported to {trace_path}")
+
+    if metrics_file:
+        REGISTRY.write(metrics_file)
+        logger.info(f"Metrics written to {metrics_file}")
+
 
 if __name__ == "__main__":
     main()
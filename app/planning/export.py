@@ -0,0 +1,278 @@
+import json
+import math
+from typing import Any, Callable, Dict, Iterable, Iterator, IO, Tuple
+from app.core.models import Plan
+from app.core.tree import NO_NODE, PlanTree
+
+ENTER = "enter"
+EXIT = "exit"
+
+_encode_string = json.encoder.encode_basestring_ascii
+
+
+def walk(tree: PlanTree, index: int = 0) -> Iterator[Tuple[str, int, int, int]]:
+    """Iterative pre/post-order traversal shared by all exporters
+
+    Yields (event, index, depth, position) where event is ENTER before a
+    node's children and EXIT after them, and position is the 1-based index of
+    the node among its siblings.
+    """
+    yield ENTER, index, 0, 1
+    # Frames of [node index, depth, children iterator, children seen]
+    stack = [[index, 0, tree.children(index), 0]]
+    while stack:
+        frame = stack[-1]
+        child = next(frame[2], None)
+        if child is None:
+            stack.pop()
+            position = stack[-1][3] if stack else 1
+            yield EXIT, frame[0], frame[1], position
+            continue
+        frame[3] += 1
+        depth = frame[1] + 1
+        yield ENTER, child, depth, frame[3]
+        stack.append([child, depth, tree.children(child), 0])
+
+
+def complexity_bar(weight: float) -> str:
+    """Generate a visual complexity indicator"""
+    level = int(weight / 10)
+
+    # Determine difficulty level and emoji
+    if level <= 3:
+        return "  (Easy 🌱)"
+    elif level <= 6:
+        return "  (Moderate 🌟)"
+    elif level <= 8:
+        return "  (Challenging 🔥)"
+    else:
+        return "  (Intense 🚀)"
+
+
+def iter_markdown(plan: Plan) -> Iterator[str]:
+    """Markdown checklist of the plan, one chunk per node
+
+    Top-level steps become headings separated by rules; deeper steps become
+    nested checklist items numbered by their path (e.g. 2.1.3).
+    """
+    yield f"# Hierarchical Plan for: {plan.request}\n\n"
+
+    tree = plan.tree
+    numbers = []
+    for event, index, depth, position in walk(tree):
+        # Skip root node
+        if depth == 0:
+            continue
+
+        if event == EXIT:
+            numbers.pop()
+            if depth == 2:
+                yield "\n"
+            continue
+
+        numbers.append(str(position))
+        number = ".".join(numbers)
+        description = tree.description(index)
+        bar = complexity_bar(tree.weight(index))
+
+        if depth == 1:
+            # Horizontal line between top-level tasks
+            rule = "---\n\n" if position > 1 else ""
+            yield f"{rule}### **{number}. {description}** {bar}\n\n"
+        else:
+            indent = "    " * (depth - 2)
+            bar_indent = "  " if depth == 2 else "    " * (depth - 1)
+            yield f"{indent}- [ ] **{number}. {description}**\n{bar_indent}{bar}\n"
+
+
+def iter_text(plan: Plan) -> Iterator[str]:
+    """Indented plain-text outline of the plan, one chunk per node"""
+    yield f"HIERARCHICAL PLAN FOR: {plan.request}\n\n"
+
+    tree = plan.tree
+    for event, index, depth, position in walk(tree):
+        # Skip root node
+        if event == EXIT or depth == 0:
+            continue
+        indent = "  " * depth
+        yield f"{indent}- {tree.description(index)} (Weight: {tree.weight(index):.2f})\n"
+
+
+def _json_float(value: float) -> str:
+    return repr(value) if math.isfinite(value) else json.dumps(value)
+
+
+def iter_json(plan: Plan, indent: int = 2) -> Iterator[str]:
+    """JSON document of Plan.to_dict, produced node by node
+
+    The output is identical to json.dumps(plan.to_dict(), indent=indent)
+    without building the nested dictionaries first.
+    """
+    tree = plan.tree
+    unit = " " * indent
+
+    yield "{\n" + unit + '"request": ' + _encode_string(plan.request) + ",\n"
+    yield unit + '"plan": '
+
+    # Ids of the current node's ancestors, so each id is built from its parent's
+    ids = []
+    for event, index, depth, position in walk(tree):
+        inner = "\n" + unit * (2 + 2 * depth)
+        outer = "\n" + unit * (1 + 2 * depth)
+
+        if event == EXIT:
+            if tree.has_children(index):
+                yield inner + "]" + outer + "}"
+            else:
+                yield outer + "}"
+            continue
+
+        if depth == 0:
+            opening = "{"
+        elif position == 1:
+            opening = outer + "{"
+        else:
+            opening = "," + outer + "{"
+
+        del ids[depth:]
+        ids.append(tree.id(index) if depth == 0 else tree.child_id(index, ids[-1]))
+        yield (
+            opening
+            + inner
+            + '"id": '
+            + _encode_string(ids[-1])
+            + ","
+            + inner
+            + '"description": '
+            + _encode_string(tree.description(index))
+            + ","
+            + inner
+            + '"weight": '
+            + _json_float(tree.weight(index))
+            + ","
+            + inner
+            + '"parent_id": '
+            + ("null" if depth == 0 else _encode_string(ids[-2]))
+            + ","
+            + inner
+            + '"children": '
+            + ("[" if tree.has_children(index) else "[]")
+        )
+
+    metadata_json = json.dumps(plan.export_metadata(), indent=indent).replace(
+        "\n", "\n" + unit
+    )
+    yield ",\n" + unit + '"metadata": ' + metadata_json + "\n}"
+
+
+def iter_node_records(plan: Plan) -> Iterator[Dict[str, Any]]:
+    """Flat node records in pre-order, parents before children
+
+    Each record has id, parent_id, depth, path (1-based sibling positions
+    joined by dots, empty for the root), weight and description. The root
+    record also carries the plan's request and metadata.
+    """
+    tree = plan.tree
+    path, ids = [], []
+    for event, index, depth, position in walk(tree):
+        if event == EXIT:
+            if depth > 0:
+                path.pop()
+            continue
+        if depth > 0:
+            path.append(str(position))
+
+        del ids[depth:]
+        ids.append(tree.id(index) if depth == 0 else tree.child_id(index, ids[-1]))
+        record = {
+            "id": ids[-1],
+            "parent_id": None if depth == 0 else ids[-2],
+            "depth": depth,
+            "path": ".".join(path),
+            "weight": tree.weight(index),
+            "description": tree.description(index),
+        }
+        if depth == 0:
+            record["request"] = plan.request
+            record["metadata"] = plan.export_metadata()
+        yield record
+
+
+def iter_ndjson(plan: Plan) -> Iterator[str]:
+    """One JSON line per node, see iter_node_records"""
+    for record in iter_node_records(plan):
+        yield json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def load_ndjson(lines: Iterable[str]) -> Plan:
+    """Rebuild a plan from NDJSON node records, one line at a time
+
+    Accepts any iterable of lines, such as an open file. Records may come in
+    any order as long as every parent precedes its children; siblings keep
+    the order in which they are read.
+    """
+    tree = PlanTree()
+    request, metadata = None, {}
+    # Looking ids up in the tree walks their path; a map is cheaper while loading
+    indices: Dict[str, int] = {}
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_number}: {e}") from e
+        if not isinstance(record, dict):
+            raise ValueError(
+                f"Invalid plan record on line {line_number}: not an object"
+            )
+        try:
+            parent_id = record["parent_id"]
+            if parent_id is None:
+                parent = NO_NODE
+                request = record.get("request", "")
+                metadata = record.get("metadata", {})
+            else:
+                parent = indices[parent_id]
+            indices[record["id"]] = tree.add_node(
+                record["id"], record["description"], record["weight"], parent
+            )
+        except KeyError as e:
+            raise ValueError(
+                f"Invalid plan record on line {line_number}: unknown or missing {e}"
+            ) from e
+        except (TypeError, ValueError, AttributeError) as e:
+            # Wrong field types, duplicate ids or a second root
+            raise ValueError(f"Invalid plan record on line {line_number}: {e}") from e
+
+    if not len(tree):
+        raise ValueError("No plan records found")
+    return Plan(request=request, tree=tree, metadata=metadata)
+
+
+EXPORTERS: Dict[str, Callable[[Plan], Iterator[str]]] = {
+    "json": iter_json,
+    "md": iter_markdown,
+    "txt": iter_text,
+    "ndjson": iter_ndjson,
+}
+
+
+def iter_export(plan: Plan, format: str = "json") -> Iterator[str]:
+    """Chunks of the plan exported in the given format"""
+    exporter = EXPORTERS.get(format)
+    if exporter is None:
+        raise ValueError(f"Unsupported format: {format}")
+    return exporter(plan)
+
+
+def write_plan(plan: Plan, fp: IO[str], format: str = "json") -> int:
+    """Write the plan in the given format to a text file-like object
+
+    Returns the number of characters written.
+    """
+    written = 0
+    for chunk in iter_export(plan, format):
+        fp.write(chunk)
+        written += len(chunk)
+    return written
@@ -1,45 +1,85 @@
 import logging
-from typing import List
+from typing import List, Optional, Tuple
 from app.core.interfaces import PlanningStrategy, LLMClient
-from app.core.models import Plan, PlanNode
+from app.core.models import Plan
+from app.core.tree import PlanTree, PlanNodeView
+from app.core.usage import UsageTracker, track_usage
+from app.core.tracing import span, traced
+from app.core.progress import phase
+from app.core.metrics import REGISTRY
 
 logger = logging.getLogger(__name__)
 
+PLANS = REGISTRY.counter(
+    "hieraplan_plans_total", "Decomposed plans by outcome", ["outcome"]
+)
+PLAN_NODES = REGISTRY.histogram(
+    "hieraplan_plan_nodes",
+    "Number of nodes in decomposed plans",
+    buckets=(5, 10, 25, 50, 100, 250, 500, 1000, 5000),
+)
+PLAN_DEPTH = REGISTRY.histogram(
+    "hieraplan_plan_depth",
+    "Depth of decomposed plans (root excluded)",
+    buckets=(1, 2, 3, 4, 5, 8),
+)
+
 
 class HTNPlanningStrategy(PlanningStrategy):
     """HTN (Hierarchical Task Network) planning strategy implementation"""
 
     def __init__(
-        self, llm_client: LLMClient, weight_threshold: float = 70, max_depth: int = 3
+        self,
+        llm_client: LLMClient,
+        weight_threshold: float = 70,
+        max_depth: int = 3,
+        token_budget: Optional[int] = None,
+        budget_mode: str = "degrade",
     ):
-        """Initialize HTN planning strategy"""
+        """Initialize HTN planning strategy
+
+        token_budget caps the tokens spent on a single plan. Once it is used up,
+        budget_mode "degrade" stops further decomposition and returns the plan
+        built so far, while "abort" raises TokenBudgetExceeded.
+        """
+        if budget_mode not in ("degrade", "abort"):
+            raise ValueError(f"Unsupported budget mode: {budget_mode}")
+
         self.llm_client = llm_client
         self.weight_threshold = weight_threshold
         self.max_depth = max_depth
+        self.token_budget = token_budget
+        self.budget_mode = budget_mode
         logger.info(
             f"HTN planning strategy initialized (weight threshold: {weight_threshold}, max depth: {max_depth})"
         )
 
+    @traced()
     def create_plan(self, request: str) -> Plan:
         """Create a plan for the given request"""
         logger.info(f"Creating plan for request: {request[:50]}...")
 
-        # Generate initial plan
-        initial_steps = self.llm_client.generate_initial_plan(request)
+        usage = UsageTracker(token_budget=self.token_budget)
+        with track_usage(usage):
+            # Generate initial plan
+            with phase("Creating initial plan"):
+                initial_steps = self.llm_client.generate_initial_plan(request)
 
-        # Assign weights
-        weighted_steps = self.llm_client.assign_weights(initial_steps)
+            # Assign weights
+            with phase("Assigning weights"):
+                weighted_steps = self.llm_client.assign_weights(initial_steps)
 
         # Create root node
-        root_node = PlanNode(id="root", description="Root Plan")
+        tree = PlanTree()
+        root = tree.add_node("root", "Root Plan")
 
         # Create and connect step nodes
         for i, (step, weight) in enumerate(weighted_steps):
-            step_node = PlanNode(id=f"step_{i}", description=step, weight=weight)
-            root_node.add_child(step_node)
+            tree.add_node(f"step_{i}", step, weight, parent=root)
 
-        return Plan(request=request, root_node=root_node)
+        return Plan(request=request, tree=tree, usage=usage)
 
+    @traced()
     def decompose_plan(
         self, plan: Plan, weight_threshold: float = None, max_depth: int = None
     ) -> Plan:
@@ -53,9 +93,57 @@ class HTNPlanningStrategy(PlanningStrategy):
             f"Decomposing plan (weight threshold: {weight_threshold}, max depth: {max_depth})"
         )
 
-        for current_depth in range(max_depth):
-            nodes_to_decompose = self._identify_nodes_at_depth(
-                plan.root_node, weight_threshold, current_depth
+        if plan.usage is None:
+            plan.usage = UsageTracker(token_budget=self.token_budget)
+
+        with track_usage(plan.usage):
+            self._decompose_levels(plan, weight_threshold, max_depth)
+
+        node_count, depth = self._plan_size(plan)
+        PLAN_NODES.observe(node_count)
+        PLAN_DEPTH.observe(depth)
+        PLANS.inc(
+            outcome=(
+                "budget_exceeded"
+                if plan.metadata.get("budget_exceeded")
+                else "complete"
+            )
+        )
+
+        return plan
+
+    @staticmethod
+    def _plan_size(plan: Plan) -> Tuple[int, int]:
+        """Count nodes and the maximum depth below the root"""
+        return len(plan.tree), int(plan.tree.depths.max())
+
+    def _budget_exhausted(self, plan: Plan) -> bool:
+        """Check the plan's token budget, raising or flagging the plan when used up"""
+        if not plan.usage.exceeded:
+            return False
+        if self.budget_mode == "abort":
+            plan.usage.check_budget()
+        if not plan.metadata.get("budget_exceeded"):
+            logger.warning(
+                f"Token budget of {plan.usage.token_budget} used up, stopping decomposition"
+            )
+            plan.metadata["budget_exceeded"] = True
+        return True
+
+    def _decompose_levels(self, plan: Plan, weight_threshold: float, max_depth: int):
+        """Decompose heavy leaf nodes level by level until max depth
+
+        The level iterator yields the frontier for each depth lazily, so nodes
+        created in one round make up the next round's frontier without
+        re-walking the tree from the root.
+        """
+        frontiers = plan.tree.iter_levels()
+        for current_depth, frontier in zip(range(max_depth), frontiers):
+            if self._budget_exhausted(plan):
+                return
+
+            nodes_to_decompose = self._identify_nodes_to_decompose(
+                plan.tree, frontier, weight_threshold
             )
 
             if not nodes_to_decompose:
@@ -67,46 +155,42 @@ class HTNPlanningStrategy(PlanningStrategy):
                 f"Decomposing {len(steps_to_decompose)} nodes at depth {current_depth}"
             )
 
-            decomposed_steps = self.llm_client.decompose_multiple_steps(
-                steps_to_decompose
-            )
-
-            for node in nodes_to_decompose:
-                if node.description in decomposed_steps:
-                    sub_steps = decomposed_steps[node.description]
-                    weighted_sub_steps = self.llm_client.assign_weights(sub_steps)
-
-                    for i, (sub_step, weight) in enumerate(weighted_sub_steps):
-                        sub_node = PlanNode(
-                            id=f"{node.id}_sub_{i}", description=sub_step, weight=weight
-                        )
-                        node.add_child(sub_node)
-
-        return plan
-
-    def _identify_nodes_at_depth(
-        self,
-        node: PlanNode,
-        weight_threshold: float,
-        target_depth: int,
-        current_depth: int = 0,
-    ) -> List[PlanNode]:
-        """특정 깊이에서 분해가 필요한 노드 식별"""
-        if current_depth > target_depth:
-            return []
-
-        nodes_to_decompose = []
-
-        if current_depth == target_depth:
-            if node.weight > weight_threshold and not node.children:
-                nodes_to_decompose.append(node)
-            return nodes_to_decompose
-
-        for child in node.children:
-            nodes_to_decompose.extend(
-                self._identify_nodes_at_depth(
-                    child, weight_threshold, target_depth, current_depth + 1
+            with span(
+                "HTNPlanningStrategy.decompose_depth",
+                depth=current_depth,
+                nodes=len(nodes_to_decompose),
+            ), phase(
+                f"Decomposing depth {current_depth}",
+                total=len(nodes_to_decompose),
+            ) as progress:
+                decomposed_steps = self.llm_client.decompose_multiple_steps(
+                    steps_to_decompose
                 )
-            )
 
-        return nodes_to_decompose
+                for node in nodes_to_decompose:
+                    if self._budget_exhausted(plan):
+                        return
+
+                    if node.description in decomposed_steps:
+                        sub_steps = decomposed_steps[node.description]
+                        weighted_sub_steps = self.llm_client.assign_weights(sub_steps)
+
+                        for i, (sub_step, weight) in enumerate(weighted_sub_steps):
+                            plan.tree.add_node(
+                                f"{node.id}_sub_{i}",
+                                sub_step,
+                                weight,
+                                parent=node.index,
+                            )
+                    progress.advance()
+
+    @staticmethod
+    def _identify_nodes_to_decompose(
+        tree: PlanTree, frontier: List[int], weight_threshold: float
+    ) -> List[PlanNodeView]:
+        """Heavy leaf nodes of a frontier that need decomposition"""
+        return [
+            tree.node(index)
+            for index in frontier
+            if tree.weight(index) > weight_threshold and not tree.has_children(index)
+        ]
@@ -0,0 +1,52 @@
+import time
+from concurrent.futures import Executor, Future
+from typing import Dict, Any, Optional
+from app.core.models import Plan
+from app.core.progress import PlanProgress, track_progress
+from app.planning.system import PlanningSystem
+
+
+class PlanJob:
+    """A plan being generated in the background, with pollable progress"""
+
+    def __init__(
+        self,
+        planning_system: PlanningSystem,
+        request: str,
+        weight_threshold: float = None,
+        max_depth: int = None,
+    ):
+        """Initialize plan job"""
+        self.planning_system = planning_system
+        self.request = request
+        self.weight_threshold = weight_threshold
+        self.max_depth = max_depth
+        self.progress = PlanProgress()
+        self.submitted_at = time.time()
+        self._future: Optional[Future] = None
+
+    def _run(self) -> Plan:
+        with track_progress(self.progress):
+            return self.planning_system.process_request(
+                self.request, self.weight_threshold, self.max_depth
+            )
+
+    def submit(self, executor: Executor) -> "PlanJob":
+        """Start generating the plan on an executor"""
+        self._future = executor.submit(self._run)
+        return self
+
+    def done(self) -> bool:
+        return self._future is not None and self._future.done()
+
+    def result(self, timeout: Optional[float] = None) -> Plan:
+        """The generated plan; re-raises the error if generation failed"""
+        return self._future.result(timeout)
+
+    def status(self) -> Dict[str, Any]:
+        """Snapshot of the job for display"""
+        return {
+            "done": self.done(),
+            "elapsed": time.time() - self.submitted_at,
+            "phases": self.progress.snapshot(),
+        }
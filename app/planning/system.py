@@ -1,24 +1,88 @@
-import json
+import io
+import time
 import logging
+from typing import IO, Any, Dict, Optional
 from app.core.interfaces import PlanningStrategy
-from app.core.models import Plan, PlanNode
+from app.core.models import Plan
+from app.core.store import PlanStore
+from app.core.tracing import span, traced
+from app.core.metrics import REGISTRY
+from app.planning.export import write_plan
+from app.prompts.planning import PROMPT_VERSION
 
 logger = logging.getLogger(__name__)
 
+REQUEST_DURATION = REGISTRY.histogram(
+    "hieraplan_request_duration_seconds", "End-to-end planning request latency"
+)
+PLAN_CACHE = REGISTRY.counter(
+    "hieraplan_plan_store_lookups_total", "Plan store lookups by result", ["result"]
+)
+EXPORT_CACHE = REGISTRY.counter(
+    "hieraplan_export_cache_total",
+    "Memoized plan export lookups by format and result",
+    ["format", "result"],
+)
+EXPORT_DURATION = REGISTRY.histogram(
+    "hieraplan_export_duration_seconds",
+    "Plan export latency by format",
+    ["format"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5),
+)
+
 
 class PlanningSystem:
     """Planning system class"""
 
-    def __init__(self, planning_strategy: PlanningStrategy):
-        """Initialize planning system"""
+    def __init__(
+        self,
+        planning_strategy: PlanningStrategy,
+        plan_store: Optional[PlanStore] = None,
+    ):
+        """Initialize planning system
+
+        With a plan_store, generated plans are saved and a repeated request
+        with the same settings is answered from the store.
+        """
         self.planning_strategy = planning_strategy
+        self.plan_store = plan_store
         logger.info("Planning system initialized")
 
+    def _settings(self, weight_threshold: float, max_depth: int) -> Dict[str, Any]:
+        """Effective decomposition settings and what generated the plan
+
+        Used as part of the plan cache key, so plans from another model,
+        backend or prompt version are not reused.
+        """
+        if weight_threshold is None:
+            weight_threshold = getattr(self.planning_strategy, "weight_threshold", None)
+        if max_depth is None:
+            max_depth = getattr(self.planning_strategy, "max_depth", None)
+        llm_client = getattr(self.planning_strategy, "llm_client", None)
+        return {
+            "weight_threshold": weight_threshold,
+            "max_depth": max_depth,
+            "model": getattr(llm_client, "model", None),
+            "backend": None if llm_client is None else type(llm_client).__name__,
+            "prompt_version": PROMPT_VERSION,
+        }
+
+    @traced()
     def process_request(
         self, request: str, weight_threshold: float = None, max_depth: int = None
     ) -> Plan:
         """Process a request and generate a hierarchical plan"""
         logger.info(f"Processing request: {request[:50]}...")
+        start = time.perf_counter()
+
+        if self.plan_store is not None:
+            settings = self._settings(weight_threshold, max_depth)
+            cached_plan = self.plan_store.latest(request, settings)
+            PLAN_CACHE.inc(result="hit" if cached_plan is not None else "miss")
+            if cached_plan is not None:
+                logger.info("Reusing stored plan for identical request")
+                REQUEST_DURATION.observe(time.perf_counter() - start)
+                return cached_plan
 
         # Create initial plan
         plan = self.planning_strategy.create_plan(request)
@@ -28,99 +92,31 @@ class PlanningSystem:
             plan, weight_threshold, max_depth
         )
 
+        if self.plan_store is not None:
+            self.plan_store.save(decomposed_plan, settings)
+
+        REQUEST_DURATION.observe(time.perf_counter() - start)
         return decomposed_plan
 
     def export_plan(self, plan: Plan, format: str = "json") -> str:
-        """Export plan in the specified format"""
-        if format == "json":
-            return json.dumps(plan.to_dict(), indent=2)
-        elif format == "md":
-            return self._generate_markdown(plan)
-        elif format == "txt":
-            return self._generate_text(plan)
-        else:
-            raise ValueError(f"Unsupported format: {format}")
-
-    def _generate_markdown(self, plan: Plan) -> str:
-        """Generate markdown representation of the plan"""
-        md = f"# Hierarchical Plan for: {plan.request}\n\n"
-
-        def _generate_complexity_bar(weight: float) -> str:
-            """Generate a visual complexity indicator"""
-            level = int(weight / 10)
-
-            # Determine difficulty level and emoji
-            if level <= 3:
-                return "  (Easy 🌱)"
-            elif level <= 6:
-                return "  (Moderate 🌟)"
-            elif level <= 8:
-                return "  (Challenging 🔥)"
-            else:
-                return "  (Intense 🚀)"
-
-        def _add_node_to_md(node: PlanNode, depth: int, parent_num: str = "") -> str:
-            node_md = ""
-
-            if depth == 0:
-                # Skip root node
-                for i, child in enumerate(node.children, 1):
-                    # Top-level nodes use h2 heading
-                    node_md += f"### **{i}. {child.description}** {_generate_complexity_bar(child.weight)}\n\n"
-
-                    # Add children with proper numbering
-                    if child.children:
-                        for j, grandchild in enumerate(child.children, 1):
-                            child_num = f"{i}.{j}"
-                            node_md += (
-                                f"- [ ] **{child_num}. {grandchild.description}**\n"
-                            )
-                            node_md += (
-                                f"  {_generate_complexity_bar(grandchild.weight)}\n"
-                            )
-
-                            # Add third level children if they exist
-                            if grandchild.children:
-                                for k, great_grandchild in enumerate(
-                                    grandchild.children, 1
-                                ):
-                                    grand_child_num = f"{i}.{j}.{k}"
-                                    node_md += f"    - [ ] **{grand_child_num}. {great_grandchild.description}**\n"
-                                    node_md += f"        {_generate_complexity_bar(great_grandchild.weight)}\n"
-
-                            node_md += "\n"
-
-                    # Add horizontal line between top-level tasks
-                    if i < len(node.children):
-                        node_md += "---\n\n"
-                return node_md
-
-            return node_md
-
-        md += _add_node_to_md(plan.root_node, 0)
-        return md
-
-    def _generate_text(self, plan: Plan) -> str:
-        """Generate text representation of the plan"""
-        text = f"HIERARCHICAL PLAN FOR: {plan.request}\n\n"
-
-        def _add_node_to_text(node: PlanNode, depth: int) -> str:
-            node_text = ""
-            indent = "  " * depth
-
-            if depth == 0:
-                # Skip root node
-                for child in node.children:
-                    node_text += _add_node_to_text(child, depth + 1)
-                return node_text
-
-            node_text += f"{indent}- {node.description} (Weight: {node.weight:.2f})\n"
-
-            if node.children:
-                for child in node.children:
-                    node_text += _add_node_to_text(child, depth + 1)
-
-            return node_text
-
-        text += _add_node_to_text(plan.root_node, 0)
-        return text
+        """Export plan in the specified format, memoized until the plan changes"""
+        computed = []
+
+        def _export() -> str:
+            buffer = io.StringIO()
+            self.write_plan(plan, buffer, format)
+            computed.append(True)
+            return buffer.getvalue()
+
+        exported = plan.cached(f"export:{format}", _export)
+        EXPORT_CACHE.inc(format=format, result="miss" if computed else "hit")
+        return exported
+
+    def write_plan(self, plan: Plan, fp: IO[str], format: str = "json") -> int:
+        """Stream plan in the specified format to a text file-like object"""
+        start = time.perf_counter()
+        with span("PlanningSystem.export_plan", format=format):
+            written = write_plan(plan, fp, format)
+
+        EXPORT_DURATION.observe(time.perf_counter() - start, format=format)
+        return written
@@ -1,16 +1,26 @@
-# INITIAL_PLAN_PROMPT = """
-# You are a planning assistant that creates step-by-step plans for tasks.
-# Please create a plan with 5-10 high-level steps for the following request:
+import json
+import hashlib
+
+# Every call starts with the same SYSTEM_PROMPT, then the static instructions
+# of its operation, and the variable content (request, step or steps) always
+# comes last; the fake server relies on that to recognize the operation.
+#
+# These static prefixes (about 140-250 tokens, each behind its own response
+# schema) are well below the 1024 tokens providers need before they cache a
+# prompt, so calls are not expected to hit the prompt cache. Padding them up
+# to that size would cost more than the cached-token discount saves. Cached
+# prompt tokens are still recorded from the API usage data.
+#
+# Every operation asks for JSON matching its *_FORMAT schema below, sent as a
+# strict structured-output response format. Batch operations number their
+# steps and key results by that number ("index") instead of echoing the text.
+SYSTEM_PROMPT = (
+    "You are a professional planning assistant. When asked for JSON, always "
+    "return only valid JSON without any additional text or formatting."
+)
 
-# {request}
-
-# Respond in the same language as the request.
-# Return only the numbered steps as a list, without any additional explanations or commentary.
-# Each step should be a short, clear phrase describing a single action or milestone.
-# """
 INITIAL_PLAN_PROMPT = """
-You are an expert planning strategist. For this request, create 5-10 strategic steps:
-{request}
+You are an expert planning strategist. For the request below, create 5-10 strategic steps.
 Include:
 
 Measurable milestones
@@ -20,9 +30,11 @@ Critical path elements
 Logical sequence
 
 Respond in the request's language.
-Return only numbered steps without explanations.
 Make each step concise yet descriptive (what + why).
-"""
+Return a JSON object whose "steps" array lists the steps in order, without numbers or explanations.
+
+Request:
+{request}"""
 
 WEIGHT_ASSIGNMENT_PROMPT = """
 You are a planning assistant that evaluates task complexity for average human intelligence. Assign weights (1-100) to each step based on:
@@ -37,17 +49,14 @@ Scale for average human:
 - 71-90: High (specialized knowledge needed)
 - 91-100: Extreme (beyond average human capability, like solving Riemann Hypothesis)
 
-Steps:
-{steps}
+Return ONLY a JSON object with a "weights" array holding one entry per step, with the step's number from the list below as "index".
+Example: {{"weights": [{{"index": 1, "weight": 75}}, {{"index": 2, "weight": 30}}]}}
 
-Return ONLY a JSON object with the exact step descriptions as keys and weights as values.
-Example: {{"Create system architecture": 75, "Setup basic configuration": 30}}
-"""
+Steps:
+{steps}"""
 
 STEP_DECOMPOSITION_PROMPT = """
-Break down this complex task into 2-3 simpler, more manageable sub-steps:
-
-Step: {step}
+Break down the complex task below into 2-3 simpler, more manageable sub-steps.
 
 Respond in the same language as the step.
 Guidelines:
@@ -56,14 +65,14 @@ Guidelines:
 - Avoid creating sub-steps that still require complex decision-making
 - Ensure sub-steps collectively cover the entire original task
 
-Return only numbered sub-steps as a list, without explanations.
-"""
+Return a JSON object whose "sub_steps" array lists the sub-steps, without numbers or explanations.
 
+Step:
+{step}"""
 
-MULTIPLE_STEPS_DECOMPOSITION_PROMPT = """
-Break down this complex task into 2-3 simpler, more manageable sub-steps:
 
-Steps: {steps}
+MULTIPLE_STEPS_DECOMPOSITION_PROMPT = """
+Break down each complex task below into 2-3 simpler, more manageable sub-steps.
 
 Respond in the same language as the steps.
 Guidelines:
@@ -72,13 +81,91 @@ Guidelines:
 - Avoid creating sub-steps that still require complex decision-making
 - Ensure sub-steps collectively cover the entire original task
 
+Return a JSON object with a "decompositions" array holding one entry per step, with the step's number from the list below as "index".
 For example:
 {{
-  "Design system architecture": [
-    "Define system components",
-    "Create component interaction diagram",
-    "Document data flow",
-    "Establish technical constraints"
+  "decompositions": [
+    {{
+      "index": 1,
+      "sub_steps": [
+        "Define system components",
+        "Create component interaction diagram",
+        "Document data flow"
+      ]
+    }}
   ]
 }}
-"""
+
+Steps:
+{steps}"""
+
+
+_STEP_LIST = {"type": "array", "items": {"type": "string"}, "minItems": 1}
+
+
+def _response_format(name, field, schema):
+    """Strict JSON-schema response format for an object with one array field"""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {field: schema},
+                "required": [field],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def _indexed(field, schema):
+    """Array of results keyed by the 1-based number of the step they belong to"""
+    return {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "properties": {"index": {"type": "integer"}, field: schema},
+            "required": ["index", field],
+            "additionalProperties": False,
+        },
+    }
+
+
+INITIAL_PLAN_FORMAT = _response_format("initial_plan", "steps", _STEP_LIST)
+
+WEIGHT_ASSIGNMENT_FORMAT = _response_format(
+    "step_weights",
+    "weights",
+    _indexed("weight", {"type": "integer", "minimum": 1, "maximum": 100}),
+)
+
+STEP_DECOMPOSITION_FORMAT = _response_format(
+    "step_decomposition", "sub_steps", _STEP_LIST
+)
+
+MULTIPLE_STEPS_DECOMPOSITION_FORMAT = _response_format(
+    "step_decompositions", "decompositions", _indexed("sub_steps", _STEP_LIST)
+)
+
+
+# Hash of the prompts and response formats above; plans built from other
+# prompts are not reused (plan store, prebuilt plans)
+PROMPT_VERSION = hashlib.sha256(
+    json.dumps(
+        [
+            SYSTEM_PROMPT,
+            INITIAL_PLAN_PROMPT,
+            WEIGHT_ASSIGNMENT_PROMPT,
+            STEP_DECOMPOSITION_PROMPT,
+            MULTIPLE_STEPS_DECOMPOSITION_PROMPT,
+            INITIAL_PLAN_FORMAT,
+            WEIGHT_ASSIGNMENT_FORMAT,
+            STEP_DECOMPOSITION_FORMAT,
+            MULTIPLE_STEPS_DECOMPOSITION_FORMAT,
+        ],
+        sort_keys=True,
+        ensure_ascii=False,
+    ).encode("utf-8")
+).hexdigest()[:16]
@@ -1,11 +1,7 @@
 import streamlit as st
 from dotenv import load_dotenv
 import os
-import json
-import pandas as pd
-import numpy as np
-import time
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import sys
 
 # Add the project root to the Python path
@@ -16,11 +12,36 @@ sys.path.insert(0, root_path)
 load_dotenv()
 
 from app.visualization.planner_viz import PlanVisualizer
+from app.visualization.lod import PlanLevelOfDetail
+from app.visualization.plan_graph import plan_graph
+from app.visualization.graphviz_viz import GraphvizVisualizer
 from app.planning.system import PlanningSystem
-from app.llm.openai_client import OpenAILLMClient
+from app.planning.jobs import PlanJob
 from app.planning.htn import HTNPlanningStrategy
-from app.core.models import Plan
-from app.visualization.examples import EXAMPLE_PROMPTS
+from app.visualization.examples import EXAMPLE_PROMPTS, PLAN_PRESETS
+from app.visualization.prebuilt import has_prebuilt, load_prebuilt
+from app.core.metrics import start_metrics_server
+
+# Plans above this many nodes are rendered with collapsed subtrees
+LOD_NODE_THRESHOLD = 150
+LOD_LEVELS = 2
+
+# Background plan generation
+PLAN_WORKERS = 4
+JOB_POLL_INTERVAL = 1.0
+
+
+@st.cache_resource
+def plan_executor():
+    # Shared by all sessions; plan generation is I/O bound on LLM calls
+    return ThreadPoolExecutor(max_workers=PLAN_WORKERS, thread_name_prefix="plan")
+
+
+@st.cache_resource
+def start_metrics_endpoint():
+    # Started once per server process, shared by all sessions
+    port = os.environ.get("HIERAPLAN_METRICS_PORT")
+    return start_metrics_server(int(port)) if port else None
 
 
 def add_custom_css():
@@ -67,6 +88,7 @@ def main():
         initial_sidebar_state="expanded",
     )
 
+    start_metrics_endpoint()
     add_custom_css()
     st.title("📊 HieraPlan Visualization")
 
@@ -98,12 +120,7 @@ def main():
             )
 
             # Combine difficulty and depth into one control
-            breakdown_options = {
-                "Basic Plan 🌱": {"depth": 1, "threshold": 90},
-                "Standard Plan 🌟": {"depth": 2, "threshold": 70},
-                "Detailed Plan 🔥": {"depth": 2, "threshold": 50},
-                "Complete Plan 🚀": {"depth": 3, "threshold": 30},
-            }
+            breakdown_options = PLAN_PRESETS
 
             selected_breakdown = st.selectbox(
                 "Plan Detail Level",
@@ -117,103 +134,60 @@ def main():
             max_depth = config["depth"]
             weight_threshold = config["threshold"]
 
-            generate_button = st.button("Generate Plan 🚀", use_container_width=True)
-
-    # Move the plan generation logic outside the if-else block
-    if generate_button and request:
-        example_container.empty()
-        st.session_state.plan_generated = True
-
-        # Create containers for temporary messages
-        warning_container = st.empty()
-        success_container = st.empty()
-
-        # Add estimated time warning based on depth
-        if max_depth >= 2:
-            processing_time = "1-2 minutes" if max_depth == 2 else "2-3 minutes"
-            warning_container.warning(
-                f"""⏳ Detailed Planning in Progress
-
-                You've selected depth level {max_depth}, which enables more comprehensive task breakdown.
-                Estimated processing time: {processing_time}
-
-                This allows our AI to:
-                • Analyze tasks more thoroughly
-                • Create more detailed subtasks
-                • Ensure better task organization
-
-                Feel free to grab a coffee while we craft your plan! ☕️
-                """
-            )
-
-        with st.spinner(
-            """Generating your plan... Please wait.
-
-            🔍 Steps being performed:
-            1. Analyzing your request
-            2. Creating initial plan structure
-            3. Decomposing complex tasks
-            4. Calculating task complexities
-            """
-        ):
-            llm_client = OpenAILLMClient(api_key=st.secrets["OPENAI_API_KEY"])
-            strategy = HTNPlanningStrategy(llm_client, weight_threshold, max_depth)
-            planning_system = PlanningSystem(strategy)
-            plan = planning_system.process_request(request)
-
-            # Display success message with additional info
-            success_container.success(
-                """✨ Plan generated successfully!
-
-                Your plan has been created with:
-                - Depth Level: {max_depth}
-                - Complexity Threshold: {weight_threshold}%
-
-                Explore the visualization and details in the tabs below.
-                """.format(
-                    max_depth=max_depth, weight_threshold=weight_threshold
-                )
-            )
-
-            # Clear the temporary messages after 2 seconds
-            time.sleep(2)
-            warning_container.empty()
-            success_container.empty()
-
-            # Create tabs for different views
-            tab1, tab2 = st.tabs(["📝 Plan Details", "📈 Interactive Visualization"])
-
-            with tab1:
-                # Display statistics and markdown in rows
-                display_plan_statistics(
-                    plan.to_dict(), weight_threshold
-                )  # weight_threshold 전달
-                st.markdown("---")
-                display_plan_markdown(plan, planning_system)
-
-            with tab2:
-                st.subheader("Interactive Plan Visualization")
-                st.markdown(
-                    "Interact with the visualization: zoom, drag, and hover over nodes for task description."
+            # Example prompts are served from plans built ahead of time
+            regenerate = False
+            if has_prebuilt(request, selected_breakdown):
+                regenerate = st.checkbox(
+                    "Regenerate fresh plan",
+                    help="This example has a prebuilt plan that loads instantly. Tick to run the planner anyway.",
                 )
 
-                # Modern visualization
-                visualizer = PlanVisualizer()
-                html_path = visualizer.visualize_plan(plan)
+            generate_button = st.button("Generate Plan 🚀", use_container_width=True)
 
-                # HTML 파일 읽기 및 표시
-                with open(html_path, "r", encoding="utf-8") as f:
-                    html_content = f.read()
+    prebuilt_plan = None
+    if generate_button and request and not regenerate:
+        prebuilt_plan = load_prebuilt(request, selected_breakdown)
 
-                # HTML 컨텐츠를 직접 표시
-                with st.container():
-                    st.components.v1.html(html_content, height=700, scrolling=False)
+    if prebuilt_plan is not None:
+        example_container.empty()
+        st.session_state.plan_generated = True
+        st.session_state.plan = prebuilt_plan
+        st.session_state.planning_system = PlanningSystem(planning_strategy=None)
+        st.session_state.plan_threshold = weight_threshold
+        st.session_state.expanded_steps = []
+        st.session_state.pop("plan_job", None)
+        st.toast("⚡ Loaded the prebuilt plan for this example")
+
+    # Plans are generated in the background so this script thread stays free
+    elif generate_button and request:
+        example_container.empty()
+        st.session_state.plan_generated = True
 
-                # 임시 파일 삭제
-                os.remove(html_path)
+        # Imported on first use so the page draws before the OpenAI SDK loads
+        from app.llm.openai_client import OpenAILLMClient
 
-    else:
+        llm_client = OpenAILLMClient(api_key=st.secrets["OPENAI_API_KEY"])
+        strategy = HTNPlanningStrategy(llm_client, weight_threshold, max_depth)
+        st.session_state.plan_job = PlanJob(PlanningSystem(strategy), request).submit(
+            plan_executor()
+        )
 
+    job = st.session_state.get("plan_job")
+    if job is not None:
+        if job.done():
+            del st.session_state.plan_job
+            collect_plan_job(job)
+        else:
+            display_plan_job(job)
+
+    # Results are kept in the session so they survive reruns (e.g. widget changes)
+    if "plan" in st.session_state:
+        display_plan_results(
+            st.session_state.plan,
+            st.session_state.planning_system,
+            st.session_state.plan_threshold,
+        )
+    elif "plan_job" not in st.session_state:
         st.info("Enter your planning request and click 'Generate Plan' to start.")
 
         # st.image("https://via.placeholder.com/800x400.png?text=HTN+Planner+Visualization+Example",
@@ -221,40 +195,137 @@ def main():
         #          use_container_width=True)
 
 
-def display_plan_statistics(plan_dict, weight_threshold):
-    node_dict = plan_dict["plan"]
+def display_plan_job(job):
+    max_depth = job.planning_system.planning_strategy.max_depth
 
-    # 먼저 노드 계산을 수행
-    def count_nodes(node_dict):
-        count = 1
-        weight_sum = node_dict.get("weight", 0)
-        depth = 0
+    # Add estimated time warning based on depth
+    if max_depth >= 2:
+        processing_time = "1-2 minutes" if max_depth == 2 else "2-3 minutes"
+        st.warning(
+            f"""⏳ Detailed Planning in Progress
+
+            You've selected depth level {max_depth}, which enables more comprehensive task breakdown.
+            Estimated processing time: {processing_time}
+
+            This allows our AI to:
+            • Analyze tasks more thoroughly
+            • Create more detailed subtasks
+            • Ensure better task organization
+
+            Feel free to grab a coffee while we craft your plan! ☕️
+            """
+        )
+
+    @st.fragment(run_every=JOB_POLL_INTERVAL)
+    def job_progress():
+        if job.done():
+            # Show the finished plan with a full rerun
+            st.rerun()
+
+        status = job.status()
+        for phase in status["phases"]:
+            if phase["done"]:
+                st.markdown(f"✅ {phase['name']} ({phase['elapsed']:.1f}s)")
+            elif phase["total"]:
+                st.progress(
+                    phase["completed"] / phase["total"],
+                    text=f"{phase['name']}: {phase['completed']}/{phase['total']} steps",
+                )
+            else:
+                st.markdown(f"⏳ {phase['name']}...")
+        st.caption(f"Generating your plan... {status['elapsed']:.0f}s elapsed")
+
+    job_progress()
+
+
+def collect_plan_job(job):
+    try:
+        plan = job.result()
+    except Exception as e:
+        st.error(f"Plan generation failed: {e}")
+        return
+
+    strategy = job.planning_system.planning_strategy
+    st.session_state.plan = plan
+    st.session_state.planning_system = job.planning_system
+    st.session_state.plan_threshold = strategy.weight_threshold
+    st.session_state.expanded_steps = []
+    st.toast(
+        f"✨ Plan generated successfully! Depth Level: {strategy.max_depth},"
+        f" Complexity Threshold: {strategy.weight_threshold}%"
+    )
 
-        if "children" in node_dict:
-            for child in node_dict["children"]:
-                child_count, child_weight_sum, child_depth = count_nodes(child)
-                count += child_count
-                weight_sum += child_weight_sum
-                depth = max(depth, child_depth)
 
-        return count, weight_sum, depth + 1
+def display_plan_results(plan, planning_system, weight_threshold):
+    # Create tabs for different views
+    tab1, tab2 = st.tabs(["📝 Plan Details", "📈 Interactive Visualization"])
+
+    with tab1:
+        # Display statistics and markdown in rows
+        display_plan_statistics(plan, weight_threshold)  # weight_threshold 전달
+        st.markdown("---")
+        display_plan_markdown(plan, planning_system)
+
+    with tab2:
+        st.subheader("Interactive Plan Visualization")
+        st.markdown(
+            "Interact with the visualization: zoom, drag, and hover over nodes for task description."
+        )
+
+        if len(plan) > LOD_NODE_THRESHOLD:
+            # Large plans start collapsed below the first levels, and the graph
+            # is updated in place as steps are expanded or collapsed
+            lod = display_detail_controls(plan)
+            with st.container():
+                plan_graph(lod, height=700)
+        else:
+            # Modern visualization
+            visualizer = PlanVisualizer()
+            html_content = visualizer.render_html(plan)
+
+            # HTML 컨텐츠를 직접 표시
+            with st.container():
+                st.components.v1.html(html_content, height=700, scrolling=False)
+
+        # Static diagram of the whole plan, laid out server-side
+        if GraphvizVisualizer.is_available():
+            st.download_button(
+                label="Download Plan as SVG",
+                data=GraphvizVisualizer().render(plan, format="svg"),
+                file_name="plan.svg",
+                mime="image/svg+xml",
+            )
 
-    # 계산된 값들을 저장
-    total_nodes, total_weight, max_plan_depth = count_nodes(node_dict)
-    avg_weight = total_weight / total_nodes if total_nodes > 0 else 0
 
-    # 가중치 수집
-    weights = []
+def display_detail_controls(plan):
+    lod = PlanLevelOfDetail(
+        plan, levels=LOD_LEVELS, expanded=set(st.session_state.expanded_steps)
+    )
+    collapsed = {summary.node_id: summary for summary in lod.collapsed_nodes()}
+    visible = {node.id for node in lod.visible().nodes}
+    # Drop selections hidden by collapsing one of their ancestors
+    st.session_state.expanded_steps = [
+        node_id for node_id in st.session_state.expanded_steps if node_id in visible
+    ]
+
+    def format_step(node_id):
+        summary = collapsed.get(node_id)
+        return f"{node_id} (+{summary.count} steps)" if summary else node_id
+
+    st.multiselect(
+        "Expand steps",
+        options=st.session_state.expanded_steps + list(collapsed),
+        format_func=format_step,
+        key="expanded_steps",
+        help=f"Large plans show {LOD_LEVELS} levels at first; pick collapsed steps to see their sub-steps.",
+    )
+    return lod
 
-    def collect_weights(node_dict):
-        weight = node_dict.get("weight")
-        if weight is not None:
-            weights.append(float(weight))
-        if "children" in node_dict and node_dict["children"]:
-            for child in node_dict["children"]:
-                collect_weights(child)
 
-    collect_weights(node_dict)
+def display_plan_statistics(plan, weight_threshold):
+    stats = plan.stats()
+    total_nodes = stats.node_count
+    avg_weight = stats.mean_weight
 
     # 이제 UI 표시
     col1, col2 = st.columns([1, 1])
@@ -284,48 +355,39 @@ def display_plan_statistics(plan_dict, weight_threshold):
         metric_cols = st.columns(2)
         with metric_cols[0]:
             # Find the highest difficulty task
-            max_weight = max(weights) if weights else 0
+            max_weight = stats.max_weight
             st.metric(
                 "Hardest Task Score",
                 f"{max_weight:.1f} ({get_difficulty_label(max_weight)})",
             )
         with metric_cols[1]:
             # Calculate percentage of challenging or higher tasks
-            high_difficulty_count = sum(1 for w in weights if w > 60)
-            high_difficulty_percent = (
-                (high_difficulty_count / len(weights) * 100) if weights else 0
-            )
+            high_difficulty_percent = stats.fraction_above(60) * 100
             st.metric(
                 "Complex Tasks",
                 f"{high_difficulty_percent:.1f}%",
                 help="Percentage of tasks rated as Challenging or higher",
             )
 
+        usage = plan.usage.summary() if plan.usage is not None else None
+        if usage:
+            cost = f", ~${usage['cost']:.4f}" if usage["cost"] is not None else ""
+            st.caption(
+                f"LLM usage: {usage['calls']} calls, {usage['total_tokens']} tokens{cost}"
+            )
+
     with col2:
-        if weights:
+        if total_nodes:
             st.subheader("Difficulty Distribution")
-            bins = [0, 30, 60, 80, 100]
             labels = [
                 "1. 🌱",
                 "2. 🌟",
                 "3. 🔥",
                 "4. 🚀",
             ]
+            import pandas as pd
 
-            hist_data = pd.DataFrame({"weight": weights})
-            hist_data["complexity"] = pd.cut(
-                hist_data["weight"],
-                bins=bins,
-                labels=labels,
-                include_lowest=True,
-            )
-
-            # Sort the data in the desired order
-            complexity_counts = hist_data["complexity"].value_counts(sort=False)
-            chart_data = pd.DataFrame(
-                {"Count": [complexity_counts.get(label, 0) for label in labels]},
-                index=labels,
-            )
+            chart_data = pd.DataFrame({"Count": stats.histogram}, index=labels)
 
             # Display the chart
             st.bar_chart(chart_data, height=300)
@@ -335,13 +397,14 @@ def display_plan_statistics(plan_dict, weight_threshold):
 
 def display_plan_markdown(plan, planning_system):
     st.subheader("Plan in Markdown")
+    markdown = planning_system.export_plan(plan, format="md")
     st.download_button(
         label="Download Plan as Markdown",
-        data=planning_system.export_plan(plan, format="md"),
+        data=markdown,
         file_name="plan.md",
         mime="text/markdown",
     )
-    st.markdown(planning_system.export_plan(plan, format="md"))
+    st.markdown(markdown)
 
 
 if __name__ == "__main__":
@@ -22,3 +22,11 @@ Additionally, I am planning to propose during this trip and need a special locat
 Please provide a detailed itinerary with daily activities, transportation suggestions, and must-visit spots.
 We would also appreciate essential travel tips to make the most of our visit.”""",
 }
+
+# Plan detail presets offered in the app: decomposition depth and weight threshold
+PLAN_PRESETS = {
+    "Basic Plan 🌱": {"depth": 1, "threshold": 90},
+    "Standard Plan 🌟": {"depth": 2, "threshold": 70},
+    "Detailed Plan 🔥": {"depth": 2, "threshold": 50},
+    "Complete Plan 🚀": {"depth": 3, "threshold": 30},
+}
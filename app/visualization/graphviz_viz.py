@@ -0,0 +1,122 @@
+import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+import graphviz
+from app.core.models import Plan, PlanNode
+from app.core.metrics import REGISTRY
+from app.visualization.planner_viz import PlanVisualizer, plan_fingerprint
+
+IMAGE_CACHE = REGISTRY.counter(
+    "hieraplan_image_cache_total", "Static plan image cache lookups", ["result"]
+)
+
+# Rendered images shared across sessions, least recently used evicted first
+IMAGE_CACHE_SIZE = 64
+_image_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_image_cache_lock = threading.Lock()
+
+
+class GraphvizVisualizer:
+    """Static SVG/PNG rendering of plans, laid out server-side by Graphviz
+
+    Styling follows the interactive PlanVisualizer. Rendering needs the
+    Graphviz `dot` executable; without it graphviz.ExecutableNotFound is
+    raised (see is_available).
+    """
+
+    def __init__(self, rankdir: str = "TB", engine: str = "dot"):
+        """Initialize Graphviz visualizer"""
+        self.rankdir = rankdir
+        self.engine = engine
+
+    @staticmethod
+    def is_available() -> bool:
+        """Whether the Graphviz executables are installed"""
+        return shutil.which("dot") is not None
+
+    @staticmethod
+    def _node_attributes(node: PlanNode, node_id: str, step: str) -> Dict[str, str]:
+        """Graphviz attributes of one node, styled like the interactive graph"""
+        props = PlanVisualizer._get_node_properties(node)
+        if node_id == "root":
+            label = "Plan"
+        else:
+            label = f"Step {step}: {node.weight:.0f}%"
+        return {
+            "label": label,
+            "tooltip": props["title"],
+            "fillcolor": props["color"],
+            "color": props["border_color"],
+            # Heavier steps get larger text, as they get larger boxes in the browser
+            "fontsize": f"{props['size'] * 0.4:.1f}",
+        }
+
+    def build_graph(self, plan: Plan) -> graphviz.Digraph:
+        """Graphviz source of the plan"""
+        graph = graphviz.Digraph(
+            engine=self.engine,
+            graph_attr={"rankdir": self.rankdir, "bgcolor": "#ffffff"},
+            node_attr={
+                "shape": "box",
+                "style": "filled,rounded",
+                "fontname": "Helvetica",
+                "fontcolor": "#ffffff",
+                "penwidth": "2",
+            },
+            edge_attr={"color": "#95a5a6", "arrowsize": "0.8"},
+        )
+
+        # 루트 노드부터 시작하여 모든 노드를 추가 (하위 단계는 상위 단계 번호를 이어받음)
+        steps = {}
+        tree = plan.tree
+        for index, node_id, parent_id in tree.iter_ids(tree.iter_dfs()):
+            node = tree.node(index)
+            step_prefix = (
+                f"{steps[parent_id]}." if parent_id not in (None, "root") else ""
+            )
+            steps[node_id] = (
+                f"{step_prefix}{node_id.split('_')[-1]}"
+                if node_id != "root"
+                else "Root"
+            )
+            graph.node(node_id, **self._node_attributes(node, node_id, steps[node_id]))
+            if parent_id:
+                graph.edge(parent_id, node_id)
+        return graph
+
+    def render(self, plan: Plan, format: str = "svg") -> bytes:
+        """Render the plan to an image ("svg", "png", ...), cached by plan hash"""
+        key = f"{plan_fingerprint(plan)}:{format}:{self.rankdir}:{self.engine}"
+        with _image_cache_lock:
+            image = _image_cache.get(key)
+            if image is not None:
+                _image_cache.move_to_end(key)
+        IMAGE_CACHE.inc(result="hit" if image is not None else "miss")
+        if image is not None:
+            return image
+
+        image = self.build_graph(plan).pipe(format=format)
+        with _image_cache_lock:
+            _image_cache[key] = image
+            while len(_image_cache) > IMAGE_CACHE_SIZE:
+                _image_cache.popitem(last=False)
+        return image
+
+    def render_many(
+        self,
+        plans: Iterable[Plan],
+        format: str = "svg",
+        max_workers: Optional[int] = None,
+    ) -> List[bytes]:
+        """Render several plans concurrently, one Graphviz process each"""
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return list(pool.map(lambda plan: self.render(plan, format), plans))
+
+    def write(self, plan: Plan, path: str, format: Optional[str] = None) -> str:
+        """Render the plan to a file; the format defaults to the file extension"""
+        format = format or path.rsplit(".", 1)[-1].lower()
+        with open(path, "wb") as f:
+            f.write(self.render(plan, format))
+        return path
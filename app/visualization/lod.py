@@ -0,0 +1,166 @@
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Iterator, Optional, Set
+import numpy as np
+from app.core.models import Plan
+from app.core.tree import PlanTree
+
+# Suffix of the placeholder node standing in for a collapsed subtree
+COLLAPSED_SUFFIX = "::collapsed"
+
+
+@dataclass
+class CollapsedSubtree:
+    """Aggregate of the hidden descendants of a visible node"""
+
+    node_id: str
+    count: int
+    max_weight: float
+    avg_weight: float
+
+    @property
+    def id(self) -> str:
+        return f"{self.node_id}{COLLAPSED_SUFFIX}"
+
+
+@dataclass
+class VisibleGraph:
+    """Visible nodes of a plan and the placeholders of its collapsed subtrees"""
+
+    nodes: List[Any] = field(default_factory=list)
+    collapsed: List[CollapsedSubtree] = field(default_factory=list)
+
+
+@dataclass
+class GraphDelta:
+    """Change between two visible graphs of the same plan
+
+    nodes and collapsed are added (nodes in pre-order); removed holds the ids
+    of nodes and placeholders that disappear.
+    """
+
+    nodes: List[Any] = field(default_factory=list)
+    collapsed: List[CollapsedSubtree] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+
+def descendant_aggregates(tree: PlanTree) -> Dict[str, np.ndarray]:
+    """Count, weight sum and max weight of every node's descendants
+
+    Computed level by level from the deepest up, one vectorized step per level.
+    """
+    size = len(tree)
+    weights = np.asarray(tree.weights, dtype=np.float64)
+    parents = tree.parents
+    depths = tree.depths
+    count = np.zeros(size, dtype=np.int64)
+    total = np.zeros(size, dtype=np.float64)
+    maximum = np.full(size, -np.inf)
+
+    order = np.argsort(depths, kind="stable")
+    bounds = np.searchsorted(depths[order], np.arange(int(depths.max()) + 2))
+    for depth in range(int(depths.max()), 0, -1):
+        level = order[bounds[depth] : bounds[depth + 1]]
+        level_parents = parents[level]
+        np.add.at(count, level_parents, count[level] + 1)
+        np.add.at(total, level_parents, total[level] + weights[level])
+        np.maximum.at(
+            maximum, level_parents, np.maximum(maximum[level], weights[level])
+        )
+    return {"count": count, "total": total, "max": maximum}
+
+
+class PlanLevelOfDetail:
+    """Which part of a large plan is visible, with deeper subtrees collapsed
+
+    The root and the first `levels` levels are shown, plus the children of
+    the expanded nodes; every visible node with hidden children is
+    represented by one aggregate placeholder. Only the visible graph is
+    rendered, so the page sent to the browser scales with what is visible
+    rather than with the plan size. delta() gives what changes between two
+    expanded sets, so a front end can update without a full re-render.
+    """
+
+    def __init__(
+        self, plan: Plan, levels: int = 2, expanded: Optional[Set[str]] = None
+    ):
+        """Initialize level-of-detail view"""
+        self.plan = plan
+        self.levels = levels
+        self._aggregates = descendant_aggregates(plan.tree)
+        self._expanded: Set[int] = set()
+        for node_id in expanded or ():
+            node = plan.get_node(node_id)
+            if node is not None:
+                self._expanded.add(node.index)
+
+    @property
+    def expanded(self) -> Set[str]:
+        """Ids of nodes expanded beyond the default levels"""
+        return {self.plan.tree.id(index) for index in self._expanded}
+
+    def _is_open(self, index: int) -> bool:
+        return self.plan.tree.depth(index) < self.levels or index in self._expanded
+
+    def _summary(self, index: int, node_id: str) -> Optional[CollapsedSubtree]:
+        count = int(self._aggregates["count"][index])
+        if count == 0:
+            return None
+        return CollapsedSubtree(
+            node_id=node_id,
+            count=count,
+            max_weight=float(self._aggregates["max"][index]),
+            avg_weight=float(self._aggregates["total"][index]) / count,
+        )
+
+    def _visible_indices(self, index: int) -> Iterator[int]:
+        tree = self.plan.tree
+        stack = [index]
+        while stack:
+            index = stack.pop()
+            yield index
+            if self._is_open(index):
+                children = list(tree.children(index))
+                children.reverse()
+                stack.extend(children)
+
+    def visible(self) -> VisibleGraph:
+        """Everything currently visible, nodes in pre-order"""
+        tree = self.plan.tree
+        graph = VisibleGraph()
+        for index, node_id, _ in tree.iter_ids(self._visible_indices(0)):
+            graph.nodes.append(tree.node(index))
+            if not self._is_open(index):
+                summary = self._summary(index, node_id)
+                if summary is not None:
+                    graph.collapsed.append(summary)
+        return graph
+
+    def delta(self, previous: "PlanLevelOfDetail") -> GraphDelta:
+        """What turns the visible graph of previous (same plan) into this one"""
+        before, after = previous.visible(), self.visible()
+        before_nodes = {node.index for node in before.nodes}
+        after_nodes = {node.index for node in after.nodes}
+        before_collapsed = {summary.id: summary for summary in before.collapsed}
+        after_collapsed = {summary.id: summary for summary in after.collapsed}
+
+        tree = self.plan.tree
+        delta = GraphDelta(
+            nodes=[node for node in after.nodes if node.index not in before_nodes],
+            collapsed=[
+                summary
+                for summary in after.collapsed
+                if before_collapsed.get(summary.id) != summary
+            ],
+        )
+        removed = [index for index in before_nodes if index not in after_nodes]
+        delta.removed = [id for _, id, _ in tree.iter_ids(sorted(removed))]
+        delta.removed += [
+            id
+            for id, summary in before_collapsed.items()
+            if after_collapsed.get(id) != summary
+        ]
+        return delta
+
+    def collapsed_nodes(self) -> List[CollapsedSubtree]:
+        """Visible nodes that can be expanded, in pre-order"""
+        return self.visible().collapsed
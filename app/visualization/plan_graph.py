@@ -0,0 +1,95 @@
+"""Level-of-detail plan graph that updates in place between Streamlit reruns
+
+The whole pyvis page is only rebuilt for small plans. For large ones this
+component keeps the vis.js graph in the browser and, when steps are expanded
+or collapsed, sends just the nodes and edges that change. The browser
+reports the revision it holds; whenever that is not what the app last sent
+(first render, new plan, reloaded frame), a full snapshot is sent instead.
+"""
+
+import os
+import json
+from typing import Any, Dict, Optional, Tuple
+import streamlit as st
+import streamlit.components.v1 as components
+from app.core.metrics import REGISTRY
+from app.visualization.lod import PlanLevelOfDetail
+from app.visualization.planner_viz import (
+    DEPTH_LABELS,
+    NETWORK_OPTIONS,
+    PlanVisualizer,
+    plan_fingerprint,
+)
+
+GRAPH_UPDATES = REGISTRY.counter(
+    "hieraplan_graph_updates_total",
+    "Level-of-detail graph updates sent to the browser by kind",
+    ["kind"],
+)
+
+_component = components.declare_component(
+    "plan_graph",
+    path=os.path.join(os.path.dirname(__file__), "static", "plan_graph"),
+)
+
+
+def graph_update(
+    lod: PlanLevelOfDetail,
+    height: int,
+    sent: Optional[Dict[str, Any]],
+    shown: Any,
+) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    """Component arguments for this run and the record of what was sent
+
+    sent is the record returned by the previous run, shown the revision the
+    browser last reported ({"graph", "revision"}, None before its first
+    report).
+    """
+    graph = f"{plan_fingerprint(lod.plan)}:{lod.levels}"
+    expanded = sorted(lod.expanded)
+    same_graph = sent is not None and sent["graph"] == graph
+    in_sync = same_graph and shown == {"graph": graph, "revision": sent["revision"]}
+
+    if same_graph and sent["expanded"] == expanded:
+        if in_sync:
+            return {
+                "graph": graph,
+                "revision": sent["revision"],
+                "height": height,
+            }, sent
+        if shown == sent["shown"]:
+            # The browser has not reported the last update yet; send it again
+            return sent["args"], sent
+
+    visualizer = PlanVisualizer()
+    revision = sent["revision"] + 1 if sent is not None else 1
+    args = {"graph": graph, "revision": revision, "height": height}
+    if in_sync and sent["expanded"] != expanded:
+        previous = PlanLevelOfDetail(lod.plan, lod.levels, set(sent["expanded"]))
+        args["delta"] = {
+            "base": sent["revision"],
+            **visualizer.delta_payload(lod.plan, lod.delta(previous)),
+        }
+        GRAPH_UPDATES.inc(kind="delta")
+    else:
+        args["full"] = visualizer.graph_payload(lod)
+        args["options"] = json.loads(NETWORK_OPTIONS)
+        args["overlay"] = DEPTH_LABELS
+        GRAPH_UPDATES.inc(kind="full")
+    record = {
+        "graph": graph,
+        "revision": revision,
+        "expanded": expanded,
+        "shown": shown,
+        "args": args,
+    }
+    return args, record
+
+
+def plan_graph(lod: PlanLevelOfDetail, height: int = 700, key: str = "plan_graph"):
+    """Show a level-of-detail view, sending only what changed since the last run"""
+    sent_key = f"{key}:sent"
+    args, st.session_state[sent_key] = graph_update(
+        lod, height, st.session_state.get(sent_key), st.session_state.get(key)
+    )
+    _component(**args, key=key, default=None)
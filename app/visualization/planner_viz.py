@@ -1,70 +1,142 @@
-import streamlit as st
-import pandas as pd
-import numpy as np
-from pyvis.network import Network
+import hashlib
 import tempfile
-import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
 from app.core.models import Plan, PlanNode
+from app.core.tree import NO_NODE, PlanNodeView, PlanTree
+from app.visualization.lod import CollapsedSubtree, GraphDelta, PlanLevelOfDetail
+from app.core.metrics import REGISTRY
 
+RENDER_CACHE = REGISTRY.counter(
+    "hieraplan_render_cache_total", "Plan HTML render cache lookups", ["result"]
+)
 
-class PlanVisualizer:
-    def __init__(self):
-        self.network = Network(
-            height="700px",
-            width="100%",
-            bgcolor="#ffffff",
-            font_color="#2c3e50",
-            directed=True,
-        )
-        # Hierarchical layout settings
-        self.network.set_options(
-            """
-        {
-          "layout": {
-            "hierarchical": {
-              "enabled": true,
-              "direction": "UD",
-              "sortMethod": "directed",
-              "nodeSpacing": 150,
-              "levelSeparation": 200
-            }
-          },
-          "nodes": {
-            "font": {
-              "size": 16,
-              "face": "Helvetica"
-            },
-            "borderWidth": 2,
-            "shadow": {
-              "enabled": true,
-              "size": 5,
-              "x": 2,
-              "y": 2
-            }
-          },
-          "edges": {
-            "color": {
-              "color": "#95a5a6",
-              "opacity": 0.8
-            },
-            "smooth": {
-              "type": "straightCross"
-            },
-            "arrows": {
-              "to": {
-                "enabled": true,
-                "scaleFactor": 0.8
-              }
-            }
-          },
-          "physics": {
-            "enabled": false
-          }
-        }
+# Rendered pages shared across sessions, least recently used evicted first
+HTML_CACHE_SIZE = 32
+_html_cache: "OrderedDict[str, str]" = OrderedDict()
+_html_cache_lock = threading.Lock()
+
+# Depth 레이블 추가를 위한 HTML
+DEPTH_LABELS = """
+        <div style='position: absolute; right: 20px; top: 50%; transform: translateY(-50%);
+             background: rgba(255,255,255,0.9); padding: 15px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1)'>
+            <h3 style='margin: 0 0 10px 0; color: #2c3e50'>Depth Levels</h3>
+            <div style='color: #2c3e50'>
+                <p>Root: Plan</p>
+                <p>Depth 1: Main Steps</p>
+                <p>Depth 2: Sub Steps</p>
+            </div>
+        </div>
         """
+
+
+# vis.js options shared by the pyvis page and the level-of-detail component
+NETWORK_OPTIONS = """
+{
+  "layout": {
+    "hierarchical": {
+      "enabled": true,
+      "direction": "UD",
+      "sortMethod": "directed",
+      "nodeSpacing": 150,
+      "levelSeparation": 200,
+      "treeSpacing": 200,
+      "shakeTowards": "roots"
+    }
+  },
+  "nodes": {
+    "font": {
+      "size": 16,
+      "face": "Helvetica",
+      "color": "#ffffff"
+    },
+    "borderWidth": 2,
+    "shadow": {
+      "enabled": true,
+      "size": 5,
+      "x": 2,
+      "y": 2
+    }
+  },
+  "edges": {
+    "color": {
+      "color": "#95a5a6",
+      "opacity": 0.8
+    },
+    "smooth": {
+      "type": "straightCross"
+    },
+    "arrows": {
+      "to": {
+        "enabled": true,
+        "scaleFactor": 0.8
+      }
+    }
+  },
+  "physics": {
+    "enabled": false,
+    "hierarchicalRepulsion": {
+      "centralGravity": 0.0,
+      "springLength": 100,
+      "springConstant": 0.01,
+      "nodeDistance": 120
+    }
+  },
+  "interaction": {
+    "hover": true,
+    "tooltipDelay": 300,
+    "zoomView": true,
+    "dragView": true
+  }
+}
+"""
+
+
+def _edge_options() -> Dict:
+    return dict(
+        width=2,
+        color={"color": "#95a5a6", "opacity": 0.8},
+        smooth={"type": "straightCross"},
+    )
+
+
+def _vis_edge(parent_id: str, node_id: str) -> Dict:
+    # Every node has exactly one incoming edge, so it is keyed by the child
+    return {
+        "id": f"edge:{node_id}",
+        "from": parent_id,
+        "to": node_id,
+        "arrows": "to",
+        **_edge_options(),
+    }
+
+
+def plan_fingerprint(plan: Plan) -> str:
+    """Hash of everything the rendered graph depends on: structure, ids, text and weights"""
+    return plan.cached("fingerprint", lambda: _tree_fingerprint(plan.tree))
+
+
+def _tree_fingerprint(tree: PlanTree) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    ids = tree.ids()
+    for index in tree.iter_dfs():
+        digest.update(
+            f"{tree.parent(index)}\0{ids[index]}\0{tree.description(index)}\0".encode(
+                "utf-8"
+            )
         )
+    digest.update(tree.weights.tobytes())
+    return digest.hexdigest()
+
+
+class PlanVisualizer:
+    def __init__(self):
+        # The pyvis network is built per render (see _build_network)
+        self.network = None
 
-    def _get_node_properties(self, node: PlanNode):
+    @staticmethod
+    def _get_node_properties(node: PlanNode):
         """Determines node properties."""
         # Calculate node size based on weight
         size = 30 + node.weight * 0.2
@@ -92,23 +164,24 @@ class PlanVisualizer:
             "title": details,
         }
 
-    def _add_node_to_network(self, node: PlanNode, parent_id=None, step_prefix=""):
+    def _node_options(
+        self, node: PlanNode, node_id: str, step_prefix=""
+    ) -> Tuple[str, Dict]:
+        """Step number and vis.js options of one node"""
         props = self._get_node_properties(node)
 
         # Generate step number
         current_step = (
-            f"{step_prefix}{node.id.split('_')[-1]}" if node.id != "root" else "Root"
+            f"{step_prefix}{node_id.split('_')[-1]}" if node_id != "root" else "Root"
         )
 
         # Add complexity to node label
-        if node.id == "root":
+        if node_id == "root":
             label = "Plan"
         else:
             label = f"Step {current_step}: {node.weight:.0f}%"
 
-        # Add node
-        self.network.add_node(
-            node.id,
+        return current_step, dict(
             label=label,
             title=props["title"],
             size=props["size"],
@@ -129,120 +202,175 @@ class PlanVisualizer:
             font={"face": "Helvetica", "size": 16, "color": "#ffffff"},
         )
 
+    @staticmethod
+    def _collapsed_options(summary: CollapsedSubtree) -> Dict:
+        """vis.js options of the placeholder for a collapsed subtree"""
+        return dict(
+            label=f"+{summary.count} steps\nmax {summary.max_weight:.0f}% · avg {summary.avg_weight:.0f}%",
+            title=(
+                f"Collapsed subtree\n\n"
+                f"Steps: {summary.count}\n"
+                f"Hardest: {summary.max_weight:.0f}%\n"
+                f"Average: {summary.avg_weight:.0f}%"
+            ),
+            size=25,
+            color={"background": "#bdc3c7", "border": "#95a5a6"},
+            shape="box",
+            shapeProperties={"borderDashes": [5, 5]},
+            font={"face": "Helvetica", "size": 14, "color": "#2c3e50"},
+        )
+
+    @staticmethod
+    def _step_number(tree: PlanTree, index: int) -> str:
+        """Step number of a node, from the ids of its ancestors"""
+        path = []
+        while index != NO_NODE:
+            path.append(index)
+            index = tree.parent(index)
+        step = ""
+        for _, node_id, parent_id in tree.iter_ids(reversed(path)):
+            step_prefix = f"{step}." if parent_id not in (None, "root") else ""
+            step = (
+                f"{step_prefix}{node_id.split('_')[-1]}"
+                if node_id != "root"
+                else "Root"
+            )
+        return step
+
+    def _vis_elements(
+        self,
+        plan: Plan,
+        nodes: Iterable[PlanNodeView],
+        collapsed: Iterable[CollapsedSubtree],
+    ) -> Tuple[List[Dict], List[Dict]]:
+        """vis.js nodes and edges for plan nodes given parents first"""
+        tree = plan.tree
+        steps: Dict[str, str] = {}
+        vis_nodes, vis_edges = [], []
+        for index, node_id, parent_id in tree.iter_ids(node.index for node in nodes):
+            step_prefix = ""
+            if parent_id not in (None, "root"):
+                if parent_id not in steps:
+                    steps[parent_id] = self._step_number(tree, tree.parent(index))
+                step_prefix = f"{steps[parent_id]}."
+            steps[node_id], options = self._node_options(
+                tree.node(index), node_id, step_prefix
+            )
+            vis_nodes.append({"id": node_id, **options})
+            if parent_id:
+                vis_edges.append(_vis_edge(parent_id, node_id))
+        for summary in collapsed:
+            vis_nodes.append({"id": summary.id, **self._collapsed_options(summary)})
+            vis_edges.append(_vis_edge(summary.node_id, summary.id))
+        return vis_nodes, vis_edges
+
+    def graph_payload(self, lod: PlanLevelOfDetail) -> Dict:
+        """vis.js nodes and edges of everything visible in a level-of-detail view"""
+        visible = lod.visible()
+        nodes, edges = self._vis_elements(lod.plan, visible.nodes, visible.collapsed)
+        return {"nodes": nodes, "edges": edges}
+
+    def delta_payload(self, plan: Plan, delta: GraphDelta) -> Dict:
+        """vis.js changes that apply a level-of-detail delta to a shown graph"""
+        nodes, edges = self._vis_elements(plan, delta.nodes, delta.collapsed)
+        return {
+            "nodes": nodes,
+            "edges": edges,
+            "removed_nodes": delta.removed,
+            "removed_edges": [f"edge:{node_id}" for node_id in delta.removed],
+        }
+
+    def _add_node_to_network(
+        self, node: PlanNode, node_id: str, parent_id=None, step_prefix=""
+    ) -> str:
+        """Add one node (and the edge from its parent); returns its step number"""
+        current_step, options = self._node_options(node, node_id, step_prefix)
+        self.network.add_node(node_id, **options)
+
         # Add edge if parent exists
         if parent_id:
-            self.network.add_edge(
-                parent_id,
-                node.id,
-                width=2,
-                color={"color": "#95a5a6", "opacity": 0.8},
-                smooth={"type": "straightCross"},
-            )
+            self.network.add_edge(parent_id, node_id, **_edge_options())
+
+        return current_step
 
-        # Recursively add child nodes (add substep to step number)
-        for i, child in enumerate(node.children, 1):
-            new_prefix = f"{current_step}." if node.id != "root" else ""
-            self._add_node_to_network(child, node.id, new_prefix)
+    def _build_network(
+        self, plan: Plan, height: str, lod: Optional[PlanLevelOfDetail] = None
+    ) -> str:
+        # pyvis is only needed for interactive pages, not for exports or images
+        from pyvis.network import Network
 
-    def visualize_plan(self, plan: Plan):
         self.network = Network(
-            height="700px",
+            height=height,
             width="100%",
             bgcolor="#ffffff",
             font_color="#ffffff",
             directed=True,
         )
 
-        self.network.set_options(
-            """
-        {
-          "layout": {
-            "hierarchical": {
-              "enabled": true,
-              "direction": "UD",
-              "sortMethod": "directed",
-              "nodeSpacing": 150,
-              "levelSeparation": 200,
-              "treeSpacing": 200,
-              "shakeTowards": "roots"
-            }
-          },
-          "nodes": {
-            "font": {
-              "size": 16,
-              "face": "Helvetica",
-              "color": "#ffffff"
-            },
-            "borderWidth": 2,
-            "shadow": {
-              "enabled": true,
-              "size": 5,
-              "x": 2,
-              "y": 2
-            }
-          },
-          "edges": {
-            "color": {
-              "color": "#95a5a6",
-              "opacity": 0.8
-            },
-            "smooth": {
-              "type": "straightCross"
-            },
-            "arrows": {
-              "to": {
-                "enabled": true,
-                "scaleFactor": 0.8
-              }
-            }
-          },
-          "physics": {
-            "enabled": false,
-            "hierarchicalRepulsion": {
-              "centralGravity": 0.0,
-              "springLength": 100,
-              "springConstant": 0.01,
-              "nodeDistance": 120
-            }
-          },
-          "interaction": {
-            "hover": true,
-            "tooltipDelay": 300,
-            "zoomView": true,
-            "dragView": true
-          }
-        }
-        """
-        )
-
-        # 루트 노드부터 시작하여 모든 노드를 추가
-        self._add_node_to_network(plan.root_node)
+        self.network.set_options(NETWORK_OPTIONS)
 
-        # Depth 레이블 추가를 위한 HTML 생성
-        depth_labels = """
-        <div style='position: absolute; right: 20px; top: 50%; transform: translateY(-50%);
-             background: rgba(255,255,255,0.9); padding: 15px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1)'>
-            <h3 style='margin: 0 0 10px 0; color: #2c3e50'>Depth Levels</h3>
-            <div style='color: #2c3e50'>
-                <p>Root: Plan</p>
-                <p>Depth 1: Main Steps</p>
-                <p>Depth 2: Sub Steps</p>
-            </div>
-        </div>
-        """
+        # 루트 노드부터 시작하여 모든 노드를 추가 (하위 단계는 상위 단계 번호를 이어받음)
+        tree = plan.tree
+        if lod is None:
+            indices, collapsed = tree.iter_dfs(), []
+        else:
+            visible = lod.visible()
+            indices = (node.index for node in visible.nodes)
+            collapsed = visible.collapsed
+        steps = {}
+        for index, node_id, parent_id in tree.iter_ids(indices):
+            node = tree.node(index)
+            step_prefix = (
+                f"{steps[parent_id]}." if parent_id not in (None, "root") else ""
+            )
+            steps[node_id] = self._add_node_to_network(
+                node, node_id, parent_id, step_prefix
+            )
+        for summary in collapsed:
+            self.network.add_node(summary.id, **self._collapsed_options(summary))
+            self.network.add_edge(summary.node_id, summary.id, **_edge_options())
 
-        # 임시 파일에 HTML 저장 (Depth 레이블 포함)
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".html") as tmp_file:
-            self.network.save_graph(tmp_file.name)
+        # body 태그 바로 뒤에 depth_labels 삽입
+        html = self.network.generate_html()
+        return html.replace("<body>", f"<body>{DEPTH_LABELS}", 1)
 
-            # HTML 파일에 Depth 레이블 추가
-            with open(tmp_file.name, "r", encoding="utf-8") as f:
-                content = f.read()
+    def render_html(
+        self,
+        plan: Plan,
+        height: str = "700px",
+        lod: Optional[PlanLevelOfDetail] = None,
+    ) -> str:
+        """Render the plan as a standalone HTML page, entirely in memory
 
-            # body 태그 바로 뒤에 depth_labels 삽입
-            content = content.replace("<body>", f"<body>{depth_labels}")
+        With a level-of-detail view only its visible nodes are rendered, and
+        collapsed subtrees appear as aggregate placeholders. Output is cached
+        by a structural hash of the plan and the render options, so
+        re-rendering an unchanged plan (e.g. on every Streamlit rerun) returns
+        the cached page.
+        """
+        key = f"{plan_fingerprint(plan)}:{height}"
+        if lod is not None:
+            key += f":{lod.levels}:{','.join(sorted(lod.expanded))}"
+        with _html_cache_lock:
+            html = _html_cache.get(key)
+            if html is not None:
+                _html_cache.move_to_end(key)
+        RENDER_CACHE.inc(result="hit" if html is not None else "miss")
+        if html is not None:
+            return html
 
-            with open(tmp_file.name, "w", encoding="utf-8") as f:
-                f.write(content)
+        html = self._build_network(plan, height, lod)
+        with _html_cache_lock:
+            _html_cache[key] = html
+            while len(_html_cache) > HTML_CACHE_SIZE:
+                _html_cache.popitem(last=False)
+        return html
 
+    def visualize_plan(self, plan: Plan) -> str:
+        """Write the rendered plan to a temporary HTML file and return its path"""
+        html = self.render_html(plan)
+        with tempfile.NamedTemporaryFile(
+            "w", delete=False, suffix=".html", encoding="utf-8"
+        ) as tmp_file:
+            tmp_file.write(html)
             return tmp_file.name
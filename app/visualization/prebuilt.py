@@ -0,0 +1,230 @@
+"""Prebuilt plans for the example prompts
+
+Plans for every EXAMPLE_PROMPTS x PLAN_PRESETS combination are generated once
+by the build step below and shipped in app/visualization/prebuilt as binary
+plans with prerendered exports, so the app can serve the examples without
+calling the LLM. The manifest records the model and prompt version each plan
+was built with; plans built with another model or older prompts are not
+served. No plans ship with the repository: building them needs an OpenAI key.
+
+    python -m app.visualization.prebuilt             # build missing plans
+    python -m app.visualization.prebuilt --force     # regenerate all plans
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+import threading
+from typing import Dict, Any, List, Optional
+from dotenv import load_dotenv
+from app.core.archive import dump_plan, load_plan
+from app.core.metrics import REGISTRY
+from app.core.models import Plan
+from app.core.store import request_hash
+from app.llm.base import DEFAULT_OPENAI_MODEL
+from app.prompts import planning as prompts
+from app.planning.htn import HTNPlanningStrategy
+from app.planning.system import PlanningSystem
+from app.visualization.examples import EXAMPLE_PROMPTS, PLAN_PRESETS
+
+logger = logging.getLogger(__name__)
+
+PREBUILT_DIR = os.path.join(os.path.dirname(__file__), "prebuilt")
+MANIFEST = "manifest.json"
+
+# Exports rendered at build time and served as they are
+PRERENDERED_FORMATS = ("md", "json")
+
+PREBUILT_LOOKUPS = REGISTRY.counter(
+    "hieraplan_prebuilt_lookups_total", "Prebuilt example plan lookups", ["result"]
+)
+
+_loaded: Dict[str, Plan] = {}
+_loaded_lock = threading.Lock()
+
+
+def prebuilt_key(request: str, preset: str) -> str:
+    """File name stem of the prebuilt plan for a request and preset"""
+    return f"{request_hash(request.strip())[:16]}-{preset.split()[0].lower()}"
+
+
+def configured_model() -> str:
+    """Model the app generates plans with"""
+    return os.environ.get("OPENAI_MODEL", DEFAULT_OPENAI_MODEL)
+
+
+def _read_manifest(directory: str) -> Dict[str, Any]:
+    path = os.path.join(directory, MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def build_prebuilt(
+    llm_client,
+    directory: str = PREBUILT_DIR,
+    presets: Optional[List[str]] = None,
+    force: bool = False,
+) -> List[str]:
+    """Generate and save plans for every example prompt and preset
+
+    Existing plans are kept unless force is set, or unless they were built
+    with another model or older prompts; returns the keys built. Synthetic
+    plans from the fake backend are refused for the served directory.
+    """
+    from app.llm.fake_client import FakeLLMClient
+
+    if isinstance(llm_client, FakeLLMClient) and os.path.abspath(
+        directory
+    ) == os.path.abspath(PREBUILT_DIR):
+        raise ValueError(
+            "Plans from the fake backend cannot be written to the served prebuilt directory"
+        )
+
+    os.makedirs(directory, exist_ok=True)
+    manifest = _read_manifest(directory)
+    built = []
+    for preset in presets or list(PLAN_PRESETS):
+        config = PLAN_PRESETS[preset]
+        strategy = HTNPlanningStrategy(llm_client, config["threshold"], config["depth"])
+        system = PlanningSystem(strategy)
+        for title, prompt in EXAMPLE_PROMPTS.items():
+            key = prebuilt_key(prompt, preset)
+            if not force and _is_current(manifest.get(key), llm_client.model):
+                continue
+
+            logger.info(f"Building {preset} plan for {title}")
+            plan = system.process_request(prompt)
+            with open(os.path.join(directory, f"{key}.hpln"), "wb") as f:
+                dump_plan(plan, f)
+            for format in PRERENDERED_FORMATS:
+                with open(
+                    os.path.join(directory, f"{key}.{format}"), "w", encoding="utf-8"
+                ) as f:
+                    system.write_plan(plan, f, format)
+
+            manifest[key] = {
+                "example": title,
+                "preset": preset,
+                "settings": config,
+                "nodes": len(plan),
+                "model": llm_client.model,
+                "backend": type(llm_client).__name__,
+                "prompt_version": prompts.PROMPT_VERSION,
+                "built_at": time.time(),
+            }
+            # Written after every plan so an interrupted build keeps its progress
+            with open(os.path.join(directory, MANIFEST), "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2, ensure_ascii=False)
+            built.append(key)
+    return built
+
+
+def _is_current(entry: Optional[Dict[str, Any]], model: str) -> bool:
+    return (
+        entry is not None
+        and entry.get("model") == model
+        and entry.get("prompt_version") == prompts.PROMPT_VERSION
+    )
+
+
+def has_prebuilt(
+    request: str,
+    preset: str,
+    directory: str = PREBUILT_DIR,
+    model: Optional[str] = None,
+) -> bool:
+    """Whether a current prebuilt plan exists for this request and preset
+
+    Current means built with model (the configured model by default) and the
+    present prompts.
+    """
+    key = prebuilt_key(request, preset)
+    return _is_current(
+        _read_manifest(directory).get(key), model or configured_model()
+    ) and os.path.exists(os.path.join(directory, f"{key}.hpln"))
+
+
+def load_prebuilt(
+    request: str,
+    preset: str,
+    directory: str = PREBUILT_DIR,
+    model: Optional[str] = None,
+) -> Optional[Plan]:
+    """The current prebuilt plan for this request and preset, or None
+
+    Plans are loaded once per process and shared; their prerendered exports
+    seed the plan's artifact cache, so exporting them does no work.
+    """
+    if not has_prebuilt(request, preset, directory, model):
+        PREBUILT_LOOKUPS.inc(result="miss")
+        return None
+
+    key = prebuilt_key(request, preset)
+    path = os.path.join(directory, f"{key}.hpln")
+    with _loaded_lock:
+        plan = _loaded.get(path)
+    if plan is None:
+        with open(path, "rb") as f:
+            plan = load_plan(f)
+        for format in PRERENDERED_FORMATS:
+            export_path = os.path.join(directory, f"{key}.{format}")
+            if os.path.exists(export_path):
+                with open(export_path, "r", encoding="utf-8") as f:
+                    exported = f.read()
+                plan.cached(f"export:{format}", lambda: exported)
+        with _loaded_lock:
+            plan = _loaded.setdefault(path, plan)
+
+    PREBUILT_LOOKUPS.inc(result="hit")
+    return plan
+
+
+def main():
+    """Build the prebuilt example plans from the command line"""
+    parser = argparse.ArgumentParser(description="Prebuild example plans")
+    parser.add_argument(
+        "--preset",
+        action="append",
+        choices=list(PLAN_PRESETS),
+        help="only build these presets (repeatable)",
+    )
+    parser.add_argument("--output", default=PREBUILT_DIR, help="artifact directory")
+    parser.add_argument(
+        "--force", action="store_true", help="regenerate plans that already exist"
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["openai", "fake"],
+        default=os.environ.get("HIERAPLAN_LLM_BACKEND", "openai"),
+        help="fake only builds into another --output, for trying the build offline",
+    )
+    args = parser.parse_args()
+    if args.backend == "fake" and os.path.abspath(args.output) == os.path.abspath(
+        PREBUILT_DIR
+    ):
+        parser.error("--backend fake needs an --output other than the served directory")
+
+    load_dotenv()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    if args.backend == "fake":
+        from app.llm.fake_client import FakeLLMClient
+
+        llm_client = FakeLLMClient()
+    else:
+        from app.llm.openai_client import OpenAILLMClient
+
+        llm_client = OpenAILLMClient(api_key=os.environ.get("OPENAI_API_KEY"))
+
+    built = build_prebuilt(llm_client, args.output, args.preset, args.force)
+    logger.info(f"Built {len(built)} plans in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+// Level-of-detail plan graph (see app/visualization/plan_graph.py).
+//
+// The vis.js DataSets live for as long as the component, across Streamlit
+// reruns. A render carries either a full snapshot or a delta against the
+// revision the browser reported holding; the browser reports every revision
+// it reaches, so the app knows what the next delta can be based on.
+(function () {
+  "use strict";
+
+  var state = { graph: null, revision: null };
+  var nodes = null;
+  var edges = null;
+  var network = null;
+  var reported = null;
+
+  function send(type, data) {
+    var message = { isStreamlitMessage: true, type: type };
+    for (var name in data) {
+      message[name] = data[name];
+    }
+    window.parent.postMessage(message, "*");
+  }
+
+  function report() {
+    var value = { graph: state.graph, revision: state.revision };
+    var serialized = JSON.stringify(value);
+    if (serialized !== reported) {
+      reported = serialized;
+      send("streamlit:setComponentValue", { value: value, dataType: "json" });
+    }
+  }
+
+  function reset(args) {
+    document.getElementById("overlay").innerHTML = args.overlay || "";
+    nodes = new vis.DataSet(args.full.nodes);
+    edges = new vis.DataSet(args.full.edges);
+    if (network !== null) {
+      network.destroy();
+    }
+    network = new vis.Network(
+      document.getElementById("graph"),
+      { nodes: nodes, edges: edges },
+      args.options
+    );
+  }
+
+  function apply(delta) {
+    edges.remove(delta.removed_edges);
+    nodes.remove(delta.removed_nodes);
+    nodes.add(delta.nodes);
+    edges.add(delta.edges);
+  }
+
+  function render(args) {
+    send("streamlit:setFrameHeight", { height: args.height });
+    if (state.graph === args.graph && state.revision === args.revision) {
+      // A rerun that changed nothing
+    } else if (args.full) {
+      reset(args);
+      state = { graph: args.graph, revision: args.revision };
+    } else if (
+      args.delta &&
+      state.graph === args.graph &&
+      state.revision === args.delta.base
+    ) {
+      try {
+        apply(args.delta);
+        state.revision = args.revision;
+      } catch (error) {
+        // Out of step with the app: report nothing held to get a snapshot
+        console.error(error);
+        state = { graph: null, revision: null };
+      }
+    }
+    report();
+  }
+
+  window.addEventListener("message", function (event) {
+    if (event.data && event.data.type === "streamlit:render") {
+      render(event.data.args);
+    }
+  });
+  send("streamlit:componentReady", { apiVersion: 1 });
+})();
@@ -0,0 +1,99 @@
+import json
+import math
+import platform
+from typing import List, Dict, Any, Sequence
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Linearly interpolated percentile (q in 0-100)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low, high = math.floor(rank), math.ceil(rank)
+    if low == high:
+        return ordered[low]
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    """Mean, min, max and tail percentiles of a sample"""
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": sum(values) / len(values),
+        "min": min(values),
+        "max": max(values),
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "p99": percentile(values, 99),
+    }
+
+
+def environment() -> Dict[str, str]:
+    """Describe the machine a benchmark ran on"""
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+    }
+
+
+def write_results(path: str, results: Dict[str, Any]):
+    """Write benchmark results as JSON"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    """Read benchmark results written by write_results"""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _lookup(case: Dict[str, Any], metric: str) -> Any:
+    value = case
+    for part in metric.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def find_regressions(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    metrics: List[str],
+    tolerance: float,
+) -> List[str]:
+    """Compare cases by name and describe every metric that grew beyond tolerance
+
+    Metrics are dotted paths into each case (e.g. "wall.p95"); lower is better.
+    Cases present on only one side are reported too, so a renamed or dropped
+    case cannot hide a regression; compare runs with the same case selection
+    as the baseline.
+    """
+    regressions = [
+        f"{name}: in the baseline but not in this run"
+        for name in baseline
+        if name not in current
+    ]
+    for name, case in current.items():
+        base_case = baseline.get(name)
+        if base_case is None:
+            regressions.append(f"{name}: not in the baseline")
+            continue
+        for metric in metrics:
+            value, base_value = _lookup(case, metric), _lookup(base_case, metric)
+            if not isinstance(value, (int, float)) or not isinstance(
+                base_value, (int, float)
+            ):
+                continue
+            if value > base_value * (1 + tolerance) and value - base_value > 1e-9:
+                change = (value / base_value - 1) * 100 if base_value else math.inf
+                regressions.append(
+                    f"{name}: {metric} {base_value:.6g} -> {value:.6g} (+{change:.1f}%)"
+                )
+    return regressions
@@ -0,0 +1,215 @@
+"""Concurrent-user load test for the planner
+
+Simulated users submit planning requests with think time to a planner
+process modelled as a fixed pool of worker threads sharing one LLM client.
+Concurrency ramps through the given levels; each stage reports throughput,
+end-to-end latency, queueing delay, service time and error rate.
+
+    python -m benchmarks.load --users 1 2 4 8 16 --workers 4 --duration 20
+"""
+
+import time
+import random
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
+from app.llm.fake_client import FakeLLMClient, lognormal_latency
+from app.planning.htn import HTNPlanningStrategy
+from app.planning.system import PlanningSystem
+from app.visualization.examples import EXAMPLE_PROMPTS, PLAN_PRESETS
+from benchmarks.common import summarize, environment, write_results
+
+_GOALS = [
+    "Launch",
+    "Migrate",
+    "Organize",
+    "Redesign",
+    "Scale",
+    "Audit",
+    "Automate",
+    "Plan",
+]
+_SUBJECTS = [
+    "a customer support chatbot",
+    "the billing platform to the cloud",
+    "a regional sales conference",
+    "the onboarding flow of a mobile app",
+    "a data warehouse for marketing analytics",
+    "a family relocation to another country",
+    "the quarterly security review",
+    "a community fundraising campaign",
+]
+
+
+def synthetic_prompt(rng: random.Random) -> str:
+    """Random planning request in the style of real user input"""
+    return f"{rng.choice(_GOALS)} {rng.choice(_SUBJECTS)} within {rng.randint(2, 12)} weeks"
+
+
+class _StageStats:
+    """Thread-safe collection of per-request timings for one stage"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latency: List[float] = []
+        self.queue_delay: List[float] = []
+        self.service_time: List[float] = []
+        self.errors: Dict[str, int] = {}
+
+    def record(self, submitted: float, started: float, finished: float):
+        with self._lock:
+            self.latency.append(finished - submitted)
+            self.queue_delay.append(started - submitted)
+            self.service_time.append(finished - started)
+
+    def record_error(self, error: BaseException):
+        with self._lock:
+            name = type(error).__name__
+            self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def run_stage(
+    system: PlanningSystem,
+    pool: ThreadPoolExecutor,
+    users: int,
+    duration: float,
+    think_time: float,
+    prompts: List[str],
+    seed: int,
+) -> Dict[str, Any]:
+    """Run `users` simulated users for `duration` seconds"""
+    stats = _StageStats()
+    deadline = time.perf_counter() + duration
+
+    def _job(request: str, submitted: float):
+        started = time.perf_counter()
+        system.process_request(request)
+        return submitted, started, time.perf_counter()
+
+    def _user(user_id: int):
+        rng = random.Random(f"{seed}:{users}:{user_id}")
+        while time.perf_counter() < deadline:
+            request = (
+                rng.choice(prompts) if rng.random() < 0.3 else synthetic_prompt(rng)
+            )
+            future = pool.submit(_job, request, time.perf_counter())
+            try:
+                stats.record(*future.result())
+            except Exception as e:
+                stats.record_error(e)
+            if think_time > 0:
+                time.sleep(rng.expovariate(1 / think_time))
+
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(target=_user, args=(i,), daemon=True) for i in range(users)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    completed = len(stats.latency)
+    failed = sum(stats.errors.values())
+    total = completed + failed
+    return {
+        "users": users,
+        "elapsed": elapsed,
+        "completed": completed,
+        "failed": failed,
+        "errors": stats.errors,
+        "error_rate": failed / total if total else 0.0,
+        "throughput": completed / elapsed if elapsed else 0.0,
+        "latency": summarize(stats.latency),
+        "queue_delay": summarize(stats.queue_delay),
+        "service_time": summarize(stats.service_time),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planner load test")
+    parser.add_argument(
+        "--users",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8, 16],
+        help="concurrency levels to ramp through",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=4, help="planner worker threads in the process"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="seconds per stage"
+    )
+    parser.add_argument(
+        "--think-time", type=float, default=1.0, help="mean user think time (s)"
+    )
+    parser.add_argument(
+        "--preset",
+        default="standard",
+        choices=[name.split()[0].lower() for name in PLAN_PRESETS],
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="median LLM latency (s)"
+    )
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write results JSON to this path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    preset = next(
+        config
+        for name, config in PLAN_PRESETS.items()
+        if name.split()[0].lower() == args.preset
+    )
+    client = FakeLLMClient(
+        seed=args.seed,
+        latency=lognormal_latency(args.latency) if args.latency > 0 else 0.0,
+        failure_rate=args.failure_rate,
+    )
+    system = PlanningSystem(
+        HTNPlanningStrategy(client, preset["threshold"], preset["depth"])
+    )
+    prompts = list(EXAMPLE_PROMPTS.values())
+
+    stages = []
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        for users in args.users:
+            stage = run_stage(
+                system,
+                pool,
+                users,
+                args.duration,
+                args.think_time,
+                prompts,
+                args.seed,
+            )
+            stages.append(stage)
+            print(
+                f"users {users:>3}  throughput {stage['throughput']:6.2f} req/s  "
+                f"p50 {stage['latency'].get('p50', 0):.3f}s  "
+                f"p95 {stage['latency'].get('p95', 0):.3f}s  "
+                f"queue p95 {stage['queue_delay'].get('p95', 0):.3f}s  "
+                f"errors {stage['error_rate'] * 100:.1f}%",
+                flush=True,
+            )
+
+    if args.output:
+        write_results(
+            args.output,
+            {
+                "benchmark": "load",
+                "environment": environment(),
+                "config": vars(args),
+                "stages": stages,
+            },
+        )
+
+
+if __name__ == "__main__":
+    main()
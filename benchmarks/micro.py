@@ -0,0 +1,181 @@
+"""Micro-benchmarks for tree traversal, export and parsing hot paths
+
+Times each function on wide, deep and balanced synthetic plans and tracks
+peak allocations with tracemalloc. Failures such as RecursionError on deep
+plans are recorded instead of aborting the run.
+
+    python -m benchmarks.micro --compare benchmarks/baselines/micro.json
+    python -m benchmarks.micro --output benchmarks/baselines/micro.json
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import tracemalloc
+from typing import Callable, Dict, Any, List, Optional
+from app.core.models import Plan
+from app.core.stats import PlanStats
+from app.llm.fake_client import FakeLLMClient
+from app.planning.htn import HTNPlanningStrategy
+from app.prompts.planning import WEIGHT_ASSIGNMENT_FORMAT
+from app.planning.system import PlanningSystem
+from benchmarks.common import (
+    summarize,
+    environment,
+    write_results,
+    load_results,
+    find_regressions,
+)
+from benchmarks.trees import SHAPES
+
+COMPARED_METRICS = ["time.min", "time.p50", "peak_memory_bytes"]
+
+
+def _llm_json_response(plan: Plan) -> str:
+    """A weight-assignment response covering every node, as a model returns it"""
+    weights = [
+        {"index": i, "weight": min(100, max(1, int(node.weight)))}
+        for i, node in enumerate(plan.dfs(), 1)
+    ]
+    return json.dumps({"weights": weights}, indent=2)
+
+
+class _NullWriter:
+    """File-like sink that discards output
+
+    Indented exports of deep plans grow quadratically, so exports are measured
+    streaming rather than building the whole document in memory.
+    """
+
+    def write(self, chunk: str) -> int:
+        return len(chunk)
+
+
+def hot_paths(plan: Plan) -> Dict[str, Callable[[], Any]]:
+    """Benchmarked functions bound to one plan"""
+    system = PlanningSystem(planning_strategy=None)
+    strategy = HTNPlanningStrategy(llm_client=None)
+    parser = FakeLLMClient()
+    response = _llm_json_response(plan)
+
+    def identify_all_depths():
+        for frontier in plan.tree.iter_levels():
+            strategy._identify_nodes_to_decompose(plan.tree, frontier, 50)
+
+    functions = {
+        "plan.to_dict": plan.to_dict,
+        "identify_nodes_at_depth": identify_all_depths,
+        "export.markdown": lambda: system.write_plan(plan, _NullWriter(), "md"),
+        "export.text": lambda: system.write_plan(plan, _NullWriter(), "txt"),
+        "export.json": lambda: system.write_plan(plan, _NullWriter(), "json"),
+        "parse_structured_response": lambda: parser._parse_structured(
+            "assign_weights", response, WEIGHT_ASSIGNMENT_FORMAT
+        ),
+        # Not plan.stats, which is memoized and would only time a cache hit
+        "plan_statistics": lambda: PlanStats.of_tree(plan.tree),
+    }
+    return functions
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Time `repeat` calls, then measure peak allocations of one more call"""
+    times = []
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            func()
+            peak_memory = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    except RecursionError as e:
+        return {"error": type(e).__name__}
+
+    return {"time": summarize(times), "peak_memory_bytes": peak_memory}
+
+
+def run_benchmarks(
+    shapes: List[str], sizes: List[int], repeat: int, functions: Optional[List[str]]
+) -> Dict[str, Any]:
+    """Run every hot path on every shape and size"""
+    cases = {}
+    for shape in shapes:
+        for size in sizes:
+            plan = SHAPES[shape](size)
+            for name, func in hot_paths(plan).items():
+                if functions and name not in functions:
+                    continue
+                case_name = f"{name}/{shape}/{size}"
+                cases[case_name] = measure(func, repeat)
+                print(_format_case(case_name, cases[case_name]), flush=True)
+
+    return {
+        "benchmark": "micro",
+        "environment": environment(),
+        "config": {"shapes": shapes, "sizes": sizes, "repeat": repeat},
+        "cases": cases,
+    }
+
+
+def _format_case(name: str, case: Dict[str, Any]) -> str:
+    if "error" in case:
+        return f"{name:<45} {case['error']}"
+    return (
+        f"{name:<45} min {case['time']['min'] * 1000:9.2f} ms  "
+        f"p50 {case['time']['p50'] * 1000:9.2f} ms  "
+        f"peak {case['peak_memory_bytes'] / 1024 / 1024:8.2f} MiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan hot-path micro-benchmarks")
+    parser.add_argument(
+        "--shape", action="append", choices=list(SHAPES), help="repeatable"
+    )
+    parser.add_argument("--size", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--function", action="append", help="only run these hot paths (repeatable)"
+    )
+    parser.add_argument("--output", help="write results JSON to this path")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    results = run_benchmarks(
+        args.shape or list(SHAPES), args.size, args.repeat, args.function
+    )
+
+    if args.output:
+        write_results(args.output, results)
+
+    if args.compare:
+        baseline = load_results(args.compare)
+        regressions = find_regressions(
+            results["cases"], baseline["cases"], COMPARED_METRICS, args.tolerance
+        )
+        # A function that used to succeed and now fails is a regression too
+        regressions += [
+            f"{name}: now fails with {case['error']}"
+            for name, case in results["cases"].items()
+            if "error" in case
+            and "error" not in baseline["cases"].get(name, {"error": ""})
+        ]
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""End-to-end benchmark of PlanningSystem.process_request
+
+Runs every app preset (depth x threshold) against several plan sizes using
+the fake LLM backend with simulated latency, and reports wall-clock
+percentiles, LLM calls, tokens and peak memory.
+
+    python -m benchmarks.pipeline --runs 5 --compare benchmarks/baselines/pipeline.json
+    python -m benchmarks.pipeline --runs 5 --output benchmarks/baselines/pipeline.json
+"""
+
+import sys
+import time
+import logging
+import argparse
+import tracemalloc
+from typing import Dict, Any, List
+from app.core.stats import PlanStats
+from app.llm.fake_client import FakeLLMClient, lognormal_latency
+from app.planning.htn import HTNPlanningStrategy
+from app.planning.system import PlanningSystem
+from app.visualization.examples import EXAMPLE_PROMPTS, PLAN_PRESETS
+from benchmarks.common import (
+    summarize,
+    environment,
+    write_results,
+    load_results,
+    find_regressions,
+)
+
+# Fake backend settings producing increasingly large plans
+PLAN_SIZES = {
+    "small": {"steps_range": (3, 5), "sub_steps_range": (2, 2)},
+    "medium": {"steps_range": (5, 10), "sub_steps_range": (2, 3)},
+    "large": {"steps_range": (10, 15), "sub_steps_range": (3, 5)},
+}
+
+SYNTHETIC_PROMPTS = [
+    "Launch a subscription analytics product for small e-commerce stores",
+    "Migrate a monolithic billing service to event-driven microservices",
+    "Organize a three-day international developer conference",
+]
+
+COMPARED_METRICS = [
+    "wall.p50",
+    "wall.p95",
+    "llm_calls.mean",
+    "tokens.mean",
+    "peak_memory_bytes",
+]
+
+
+def _planning_system(
+    preset: Dict[str, Any], size: Dict[str, Any], seed: int, latency: float
+) -> PlanningSystem:
+    client = FakeLLMClient(
+        seed=seed,
+        latency=lognormal_latency(latency) if latency > 0 else 0.0,
+        **size,
+    )
+    strategy = HTNPlanningStrategy(
+        client, weight_threshold=preset["threshold"], max_depth=preset["depth"]
+    )
+    return PlanningSystem(strategy)
+
+
+def benchmark_case(
+    preset: Dict[str, Any],
+    size: Dict[str, Any],
+    prompts: List[str],
+    runs: int,
+    latency: float,
+    seed: int,
+) -> Dict[str, Any]:
+    """Time repeated plan generations for one preset and plan size"""
+    wall, calls, tokens, plans = [], [], [], []
+    for run in range(runs):
+        system = _planning_system(preset, size, seed + run, latency)
+        request = prompts[run % len(prompts)]
+
+        start = time.perf_counter()
+        plan = system.process_request(request)
+        wall.append(time.perf_counter() - start)
+
+        usage = plan.usage.summary()
+        calls.append(usage["calls"])
+        tokens.append(usage["total_tokens"])
+        plans.append(plan)
+
+    # Peak memory from a separate, latency-free run so tracing cost stays out of the timings
+    system = _planning_system(preset, size, seed, 0.0)
+    tracemalloc.start()
+    try:
+        system.process_request(prompts[0])
+        peak_memory = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    stats = PlanStats.aggregate(plans)
+    return {
+        "wall": summarize(wall),
+        "llm_calls": summarize(calls),
+        "tokens": summarize(tokens),
+        "nodes": summarize([len(plan) for plan in plans]),
+        "plan_stats": stats.summary(),
+        "peak_memory_bytes": peak_memory,
+    }
+
+
+def run_benchmarks(
+    runs: int, latency: float, seed: int, presets: List[str], sizes: List[str]
+) -> Dict[str, Any]:
+    """Run the preset x plan size matrix"""
+    prompts = list(EXAMPLE_PROMPTS.values()) + SYNTHETIC_PROMPTS
+    cases = {}
+    for preset_name in presets:
+        preset = PLAN_PRESETS[preset_name]
+        for size_name in sizes:
+            name = f"{preset_name.split()[0].lower()}/{size_name}"
+            cases[name] = benchmark_case(
+                preset, PLAN_SIZES[size_name], prompts, runs, latency, seed
+            )
+            cases[name]["preset"] = preset
+            print(_format_case(name, cases[name]), flush=True)
+
+    return {
+        "benchmark": "pipeline",
+        "environment": environment(),
+        "config": {"runs": runs, "latency": latency, "seed": seed},
+        "cases": cases,
+    }
+
+
+def _format_case(name: str, case: Dict[str, Any]) -> str:
+    wall = case["wall"]
+    return (
+        f"{name:<20} p50 {wall['p50']:.3f}s  p95 {wall['p95']:.3f}s  "
+        f"p99 {wall['p99']:.3f}s  calls {case['llm_calls']['mean']:.1f}  "
+        f"tokens {case['tokens']['mean']:.0f}  nodes {case['nodes']['mean']:.0f}  "
+        f"peak {case['peak_memory_bytes'] / 1024:.0f} KiB"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Planning pipeline benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="runs per case")
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.02,
+        help="median simulated LLM latency in seconds (0 disables)",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--preset",
+        action="append",
+        choices=[name.split()[0].lower() for name in PLAN_PRESETS],
+        help="limit to these presets (repeatable)",
+    )
+    parser.add_argument(
+        "--size", action="append", choices=list(PLAN_SIZES), help="repeatable"
+    )
+    parser.add_argument("--output", help="write results JSON to this path")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.15,
+        help="allowed relative increase before a metric counts as a regression",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    presets = [
+        name
+        for name in PLAN_PRESETS
+        if not args.preset or name.split()[0].lower() in args.preset
+    ]
+    results = run_benchmarks(
+        args.runs, args.latency, args.seed, presets, args.size or list(PLAN_SIZES)
+    )
+
+    if args.output:
+        write_results(args.output, results)
+
+    if args.compare:
+        baseline = load_results(args.compare)
+        regressions = find_regressions(
+            results["cases"], baseline["cases"], COMPARED_METRICS, args.tolerance
+        )
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""Cold-start import time of the CLI, batch and app entry points
+
+Each target is imported in fresh interpreters, timing the imports and
+recording which heavy dependencies they pulled in. A target that loads a
+dependency outside its budget fails the run, as does a regression against a
+saved baseline.
+
+    python -m benchmarks.startup --compare benchmarks/baselines/startup.json
+    python -m benchmarks.startup --output benchmarks/baselines/startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from typing import Dict, Any, List
+from benchmarks.common import (
+    environment,
+    find_regressions,
+    load_results,
+    summarize,
+    write_results,
+)
+
+COMPARED_METRICS = ["imports.min", "imports.p50"]
+
+# Dependencies that are expensive to import
+HEAVY_MODULES = [
+    "numpy",
+    "openai",
+    "httpx",
+    "streamlit",
+    "pandas",
+    "pyvis",
+    "graphviz",
+]
+
+# Entry point modules and the heavy dependencies each may load at import time
+TARGETS: Dict[str, Dict[str, List[str]]] = {
+    "cli": {"modules": ["app.main"], "allowed": []},
+    "batch": {
+        "modules": ["app.planning.system", "app.planning.jobs", "app.core.store"],
+        "allowed": [],
+    },
+    "app": {
+        "modules": ["app.visualization.app"],
+        "allowed": ["streamlit", "numpy", "graphviz"],
+    },
+}
+
+_PROBE = """
+import sys, json, time
+start = time.perf_counter()
+for module in {modules!r}:
+    __import__(module)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"imports": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _probe(modules: List[str]) -> Dict[str, Any]:
+    """Import modules in a fresh interpreter; returns timings and loaded dependencies"""
+    code = _PROBE.format(modules=modules, heavy=HEAVY_MODULES)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    result["wall"] = time.perf_counter() - start
+    return result
+
+
+def benchmark_target(target: Dict[str, List[str]], repeat: int) -> Dict[str, Any]:
+    """Time cold imports of one target"""
+    # One untimed run so the first sample doesn't pay for writing bytecode caches
+    _probe(target["modules"])
+    probes = [_probe(target["modules"]) for _ in range(repeat)]
+    loaded = probes[-1]["loaded"]
+    return {
+        "modules": target["modules"],
+        "imports": summarize([probe["imports"] for probe in probes]),
+        "wall": summarize([probe["wall"] for probe in probes]),
+        "loaded": loaded,
+        "unexpected": [module for module in loaded if module not in target["allowed"]],
+    }
+
+
+def run_benchmarks(targets: List[str], repeat: int) -> Dict[str, Any]:
+    """Run every selected target"""
+    cases = {}
+    for name in targets:
+        cases[name] = benchmark_target(TARGETS[name], repeat)
+        print(_format_case(name, cases[name]), flush=True)
+
+    return {
+        "benchmark": "startup",
+        "environment": environment(),
+        "config": {"targets": targets, "repeat": repeat},
+        "cases": cases,
+    }
+
+
+def _format_case(name: str, case: Dict[str, Any]) -> str:
+    loaded = ", ".join(case["loaded"]) or "-"
+    return (
+        f"{name:<8} imports p50 {case['imports']['p50'] * 1000:8.1f} ms  "
+        f"process p50 {case['wall']['p50'] * 1000:8.1f} ms  heavy: {loaded}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entry point cold-start benchmark")
+    parser.add_argument(
+        "--target", action="append", choices=list(TARGETS), help="repeatable"
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="write results JSON to this path")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.target or list(TARGETS), args.repeat)
+
+    if args.output:
+        write_results(args.output, results)
+
+    # Heavy imports outside a target's budget fail the run even without a baseline
+    problems = [
+        f"{name}: imports {', '.join(case['unexpected'])} at startup"
+        for name, case in results["cases"].items()
+        if case["unexpected"]
+    ]
+    if args.compare:
+        baseline = load_results(args.compare)
+        problems += find_regressions(
+            results["cases"], baseline["cases"], COMPARED_METRICS, args.tolerance
+        )
+    if problems:
+        print("\nRegressions:")
+        for problem in problems:
+            print(f"  {problem}")
+        sys.exit(1)
+    if args.compare:
+        print("\nNo regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Synthetic plan generators for micro-benchmarks"""
+
+import math
+import random
+from collections import deque
+from app.core.models import Plan, PlanNode
+
+
+_ACTIONS = ["Define", "Research", "Design", "Implement", "Validate", "Document"]
+_TOPICS = [
+    "requirements and constraints",
+    "budget and timeline",
+    "stakeholder feedback",
+    "data pipeline",
+    "deployment checklist",
+    "success metrics",
+]
+
+
+def _child(rng: random.Random, parent: PlanNode, node_id: str) -> PlanNode:
+    node = PlanNode(
+        id=node_id,
+        description=f"Task {node_id}: {rng.choice(_ACTIONS)} {rng.choice(_TOPICS)}",
+        weight=float(rng.randint(1, 100)),
+    )
+    parent.add_child(node)
+    return node
+
+
+def _sub_id(parent: PlanNode, index: int) -> str:
+    # Same id scheme as HTNPlanningStrategy
+    return f"step_{index}" if parent.id == "root" else f"{parent.id}_sub_{index}"
+
+
+def wide_plan(size: int, seed: int = 0) -> Plan:
+    """Two levels with a fan-out of about sqrt(size) at each level"""
+    rng = random.Random(seed)
+    root = PlanNode(id="root", description="Root Plan")
+    fan_out = max(1, math.isqrt(size))
+    count = 1
+    for i in range(fan_out):
+        if count >= size:
+            break
+        step = _child(rng, root, _sub_id(root, i))
+        count += 1
+        for j in range(fan_out):
+            if count >= size:
+                break
+            _child(rng, step, _sub_id(step, j))
+            count += 1
+    return Plan(request=f"wide plan with {size} nodes", root_node=root)
+
+
+def balanced_plan(size: int, branching: int = 4, seed: int = 0) -> Plan:
+    """Complete tree with the given branching factor, filled breadth first"""
+    rng = random.Random(seed)
+    root = PlanNode(id="root", description="Root Plan")
+    queue = deque([root])
+    count = 1
+    while count < size:
+        parent = queue.popleft()
+        for i in range(branching):
+            if count >= size:
+                break
+            queue.append(_child(rng, parent, _sub_id(parent, i)))
+            count += 1
+    return Plan(request=f"balanced plan with {size} nodes", root_node=root)
+
+
+def deep_plan(size: int, depth: int = 1200, seed: int = 0) -> Plan:
+    """Chains of `depth` nodes below the root, deeper than the recursion limit
+
+    Chains are bounded because indented exports grow quadratically with depth.
+    Uses flat ids: the strategy's path-style ids would grow quadratically too.
+    """
+    rng = random.Random(seed)
+    root = PlanNode(id="root", description="Root Plan")
+    node = root
+    for i in range(1, size):
+        if node.id != "root" and (i - 1) % depth == 0:
+            node = root
+        node = _child(rng, node, f"step_{i}")
+    return Plan(request=f"deep plan with {size} nodes", root_node=root)
+
+
+SHAPES = {
+    "wide": wide_plan,
+    "deep": deep_plan,
+    "balanced": balanced_plan,
+}
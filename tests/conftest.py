@@ -0,0 +1,39 @@
+import io
+import pytest
+from app.core.archive import dumps_plan, load_plan
+from app.core.models import Plan
+from app.core.store import PlanStore
+from app.planning.export import iter_ndjson, load_ndjson
+from tests.plans import PLANS, mixed_plan
+
+
+def _through_ndjson(plan: Plan) -> Plan:
+    return load_ndjson(io.StringIO("".join(iter_ndjson(plan))))
+
+
+def _through_store(plan: Plan) -> Plan:
+    with PlanStore() as store:
+        return store.load(store.save(plan))
+
+
+# Every persistence format, as a function from a plan to the plan read back
+ROUND_TRIPS = {
+    "ndjson": _through_ndjson,
+    "archive": lambda plan: load_plan(dumps_plan(plan)),
+    "store": _through_store,
+}
+
+
+@pytest.fixture(params=sorted(PLANS))
+def plan(request) -> Plan:
+    return PLANS[request.param]()
+
+
+@pytest.fixture
+def mixed() -> Plan:
+    return mixed_plan()
+
+
+@pytest.fixture(params=sorted(ROUND_TRIPS))
+def round_trip(request):
+    return ROUND_TRIPS[request.param]
@@ -0,0 +1,70 @@
+// Runs the plan_graph component against stub vis.js DataSets. Reads one
+// render's args per stdin line and answers with the ids the graph holds and
+// the value the component last reported to Streamlit.
+const fs = require("fs");
+const path = require("path");
+const readline = require("readline");
+const vm = require("vm");
+
+class DataSet {
+  constructor(items) {
+    this.items = new Map(items.map((item) => [item.id, item]));
+  }
+  add(items) {
+    for (const item of items) {
+      if (this.items.has(item.id)) throw new Error(`Duplicate id ${item.id}`);
+      this.items.set(item.id, item);
+    }
+  }
+  remove(ids) {
+    for (const id of ids) this.items.delete(id);
+  }
+}
+
+let listener = null;
+let value = null;
+let graph = null;
+const context = {
+  console,
+  document: { getElementById: () => ({ innerHTML: "" }) },
+  vis: {
+    DataSet,
+    Network: class {
+      constructor(container, data) {
+        graph = data;
+      }
+      destroy() {}
+    },
+  },
+  window: {
+    parent: {
+      postMessage: (message) => {
+        if (message.type === "streamlit:setComponentValue") value = message.value;
+      },
+    },
+    addEventListener: (type, handler) => {
+      listener = handler;
+    },
+  },
+};
+const script = path.join(process.argv[2], "main.js");
+vm.runInNewContext(fs.readFileSync(script, "utf8"), context);
+
+readline.createInterface({ input: process.stdin }).on("line", (line) => {
+  const args = JSON.parse(line);
+  if (args === "reload") {
+    // A new frame: the component starts over, Streamlit keeps the old value
+    vm.runInNewContext(fs.readFileSync(script, "utf8"), context);
+    graph = null;
+  } else {
+    listener({ data: { type: "streamlit:render", args: args } });
+  }
+  const ids = (set) => (graph === null ? [] : [...set.items.keys()].sort());
+  console.log(
+    JSON.stringify({
+      value: value,
+      nodes: graph === null ? [] : ids(graph.nodes),
+      edges: graph === null ? [] : ids(graph.edges),
+    })
+  );
+});
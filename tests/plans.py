@@ -0,0 +1,42 @@
+"""Plans shared by the tests and helpers for comparing them"""
+
+from app.core.models import Plan, PlanNode
+from app.core.usage import LLMCallRecord, UsageTracker
+from benchmarks.trees import balanced_plan, deep_plan, wide_plan
+
+
+def mixed_plan() -> Plan:
+    """Ids outside the planner's scheme, awkward text and a usage summary"""
+    root = PlanNode(id="launch", description='Ship the "v2" release')
+    first = PlanNode(id="step_0", description="Écrire la documentation ✍", weight=12.5)
+    root.add_child(first)
+    first.add_child(PlanNode(id="step_0_sub_0", description="Draft\nreview", weight=1))
+    first.add_child(
+        PlanNode(id="custom", description="Tabs\tand \\ slashes", weight=99.9)
+    )
+    second = PlanNode(id="step_7", description="中文 step", weight=100)
+    root.add_child(second)
+    second.add_child(PlanNode(id="step_7_sub_0", description="", weight=0))
+
+    usage = UsageTracker()
+    usage.record(LLMCallRecord("generate_initial_plan", "fake-llm", 120, 40, 0.5))
+    return Plan(
+        request="Launch plan — ünïcode",
+        root_node=root,
+        metadata={"preset": "small", "options": {"nested": [1, 2.5, None]}},
+        usage=usage,
+    )
+
+
+PLANS = {
+    "wide": lambda: wide_plan(300),
+    "balanced": lambda: balanced_plan(80),
+    # Shallow enough for the recursive json.dumps used by the reference output
+    "deep": lambda: deep_plan(300, depth=60),
+    "mixed": mixed_plan,
+}
+
+
+def flat_nodes(plan: Plan) -> list:
+    """Pre-order (id, parent_id, description, weight) of every node"""
+    return [(n.id, n.parent_id, n.description, n.weight) for n in plan.dfs()]
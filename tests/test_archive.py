@@ -0,0 +1,112 @@
+import io
+import os
+import pytest
+from app.core.archive import (
+    _HEADER,
+    PlanArchive,
+    dump_plan,
+    dumps_plan,
+    load_plan,
+)
+from tests.plans import flat_nodes, mixed_plan
+
+# Header fields, in order
+FIELDS = [
+    "magic",
+    "version",
+    "reserved",
+    "nodes",
+    "strings",
+    "string_offset",
+    "node_offset",
+    "weight_offset",
+    "meta_offset",
+    "end",
+]
+
+
+def with_header(data: bytes, **changes) -> bytes:
+    """Data with some header fields replaced"""
+    header = dict(zip(FIELDS, _HEADER.unpack_from(data, 0)))
+    header.update(changes)
+    return _HEADER.pack(*header.values()) + data[_HEADER.size :]
+
+
+def test_file_round_trip(plan, tmp_path):
+    path = tmp_path / "plan.hpl"
+    with open(path, "wb") as f:
+        written = dump_plan(plan, f)
+    assert written == path.stat().st_size
+
+    with open(path, "rb") as f:
+        assert flat_nodes(load_plan(f)) == flat_nodes(plan)
+    with PlanArchive.open(str(path)) as archive:
+        assert len(archive) == len(plan)
+        assert flat_nodes(archive.to_plan()) == flat_nodes(plan)
+
+
+def test_subtree(mixed):
+    archive = PlanArchive(dumps_plan(mixed))
+    subtree = archive.to_plan("step_0")
+    assert [node.id for node in subtree.dfs()] == ["step_0", "step_0_sub_0", "custom"]
+    assert subtree.root_node.parent_id is None
+    with pytest.raises(KeyError):
+        archive.find("nope")
+    assert archive.find("step_7_sub_0") == 5
+    assert archive.find("launch") == 0
+
+
+def test_rejects_other_data(mixed):
+    data = dumps_plan(mixed)
+    with pytest.raises(ValueError, match="too short"):
+        PlanArchive(b"HPL")
+    with pytest.raises(ValueError, match="too short"):
+        PlanArchive(data[: _HEADER.size - 1])
+    with pytest.raises(ValueError, match="magic"):
+        PlanArchive(b"XXXX" + data[4:])
+    with pytest.raises(ValueError, match="version: 2"):
+        PlanArchive(with_header(data, version=2))
+    with pytest.raises(ValueError, match="truncated"):
+        load_plan(io.BytesIO(data[:-1]))
+    with pytest.raises(ValueError, match="truncated"):
+        PlanArchive(data[: _HEADER.size])
+
+
+@pytest.mark.parametrize(
+    "changes",
+    [
+        {"nodes": 10**6},
+        {"strings": 10**6},
+        {"string_offset": 8},
+        {"string_offset": 10**6},
+        {"node_offset": 0},
+        {"weight_offset": 10**6},
+        {"meta_offset": 0},
+        # Sections in bounds but overlapping their neighbours
+        {"nodes": 7},
+        {"end": 600},
+    ],
+    ids=lambda changes: ",".join(f"{k}={v}" for k, v in changes.items()),
+)
+def test_rejects_corrupt_headers(mixed, changes):
+    with pytest.raises(ValueError, match="corrupt"):
+        PlanArchive(with_header(dumps_plan(mixed), **changes))
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+@pytest.mark.parametrize(
+    "corrupt, message",
+    [
+        (lambda data: data[:-1], "truncated"),
+        (lambda data: with_header(data, meta_offset=0), "corrupt"),
+    ],
+)
+def test_open_releases_the_file_when_the_data_is_bad(tmp_path, corrupt, message):
+    path = tmp_path / "plan.hpl"
+    path.write_bytes(corrupt(dumps_plan(mixed_plan())))
+    before = len(os.listdir("/proc/self/fd"))
+    # The traceback keeps open()'s frame, and so its locals, alive
+    with pytest.raises(ValueError, match=message) as error:
+        PlanArchive.open(str(path))
+    assert error.traceback
+    assert len(os.listdir("/proc/self/fd")) == before
@@ -0,0 +1,171 @@
+import hashlib
+import io
+import json
+import pytest
+from app.core.models import Plan, PlanNode
+from app.planning.export import write_plan
+from app.planning.system import PlanningSystem
+from benchmarks.trees import deep_plan
+
+
+# Exporters as they were before streaming, kept as the reference output
+
+
+def _complexity_bar(weight: float) -> str:
+    level = int(weight / 10)
+    if level <= 3:
+        return "  (Easy 🌱)"
+    elif level <= 6:
+        return "  (Moderate 🌟)"
+    elif level <= 8:
+        return "  (Challenging 🔥)"
+    else:
+        return "  (Intense 🚀)"
+
+
+def old_markdown(plan: Plan) -> str:
+    md = f"# Hierarchical Plan for: {plan.request}\n\n"
+    node = plan.root_node
+    for i, child in enumerate(node.children, 1):
+        md += f"### **{i}. {child.description}** {_complexity_bar(child.weight)}\n\n"
+        for j, grandchild in enumerate(child.children, 1):
+            md += f"- [ ] **{i}.{j}. {grandchild.description}**\n"
+            md += f"  {_complexity_bar(grandchild.weight)}\n"
+            for k, great_grandchild in enumerate(grandchild.children, 1):
+                md += f"    - [ ] **{i}.{j}.{k}. {great_grandchild.description}**\n"
+                md += f"        {_complexity_bar(great_grandchild.weight)}\n"
+            md += "\n"
+        if i < len(node.children):
+            md += "---\n\n"
+    return md
+
+
+def old_text(plan: Plan) -> str:
+    lines = [f"HIERARCHICAL PLAN FOR: {plan.request}\n\n"]
+    for node in plan.dfs():
+        if node.depth == 0:
+            continue
+        indent = "  " * node.depth
+        lines.append(f"{indent}- {node.description} (Weight: {node.weight:.2f})\n")
+    return "".join(lines)
+
+
+# JSON export of the mixed plan (without usage) and sha256 of the exports of
+# the generated plans, captured from the exporter before streaming
+OLD_MIXED_JSON = r"""{
+  "request": "Launch plan \u2014 \u00fcn\u00efcode",
+  "plan": {
+    "id": "launch",
+    "description": "Ship the \"v2\" release",
+    "weight": 0.0,
+    "parent_id": null,
+    "children": [
+      {
+        "id": "step_0",
+        "description": "\u00c9crire la documentation \u270d",
+        "weight": 12.5,
+        "parent_id": "launch",
+        "children": [
+          {
+            "id": "step_0_sub_0",
+            "description": "Draft\nreview",
+            "weight": 1.0,
+            "parent_id": "step_0",
+            "children": []
+          },
+          {
+            "id": "custom",
+            "description": "Tabs\tand \\ slashes",
+            "weight": 99.9,
+            "parent_id": "step_0",
+            "children": []
+          }
+        ]
+      },
+      {
+        "id": "step_7",
+        "description": "\u4e2d\u6587 step",
+        "weight": 100.0,
+        "parent_id": "launch",
+        "children": [
+          {
+            "id": "step_7_sub_0",
+            "description": "",
+            "weight": 0.0,
+            "parent_id": "step_7",
+            "children": []
+          }
+        ]
+      }
+    ]
+  },
+  "metadata": {
+    "preset": "small",
+    "options": {
+      "nested": [
+        1,
+        2.5,
+        null
+      ]
+    }
+  }
+}"""
+
+OLD_JSON_DIGESTS = {
+    "wide": "d6e99ff82c0ba6362cbc5317248ddc12940b720d0340276625258699657ae118",
+    "balanced": "4ad46562e4a80083770a85c593b1d12915568445ae634a7812b3b45ec4ac3e9b",
+    "deep": "47679fad92f2c4c748248f03aeeb0f60f44f622246ff87555682888af03d840c",
+}
+
+
+def export(plan: Plan, format: str) -> str:
+    return PlanningSystem(planning_strategy=None).export_plan(plan, format=format)
+
+
+def test_json_matches_previous_output(mixed):
+    mixed.usage = None
+    assert export(mixed, "json") == OLD_MIXED_JSON
+
+
+@pytest.mark.parametrize("plan, digest", OLD_JSON_DIGESTS.items(), indirect=["plan"])
+def test_json_of_generated_plans_matches_previous_output(plan, digest):
+    assert hashlib.sha256(export(plan, "json").encode()).hexdigest() == digest
+
+
+def test_json_includes_the_usage_summary(mixed):
+    exported = json.loads(export(mixed, "json"))
+    assert exported["metadata"]["usage"] == mixed.usage.summary()
+
+
+def test_text_matches_previous_output(plan):
+    assert export(plan, "txt") == old_text(plan)
+
+
+def test_markdown_matches_previous_output_up_to_three_levels(plan):
+    if max(map(plan.tree.depth, plan.tree.iter_dfs())) > 3:
+        pytest.skip("the previous exporter dropped steps below the third level")
+    assert export(plan, "md") == old_markdown(plan)
+
+
+def test_markdown_keeps_deeper_levels():
+    root = PlanNode(id="root", description="Root Plan")
+    node = root
+    for depth in range(1, 6):
+        child = PlanNode(id=f"n{depth}", description=f"level {depth}", weight=10)
+        node.add_child(child)
+        node = child
+    md = export(Plan(request="deep", root_node=root), "md")
+    assert "level 4" in md and "**1.1.1.1.1. level 5**" in md
+
+
+def test_write_plan_streams_past_the_recursion_limit():
+    plan = deep_plan(2500)
+    fp = io.StringIO()
+    written = write_plan(plan, fp, "txt")
+    assert written == len(fp.getvalue())
+    assert fp.getvalue() == old_text(plan)
+
+
+def test_unsupported_format():
+    with pytest.raises(ValueError):
+        write_plan(deep_plan(10), io.StringIO(), "xml")
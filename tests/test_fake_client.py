@@ -0,0 +1,44 @@
+from app.llm.fake_client import FakeLLMClient
+from app.llm.fake_server import FakeOpenAIServer
+from app.planning.htn import HTNPlanningStrategy
+from app.planning.system import PlanningSystem
+from app.prompts.planning import INITIAL_PLAN_PROMPT
+from tests.plans import flat_nodes
+
+
+def make_plan(client, request):
+    strategy = HTNPlanningStrategy(llm_client=client, weight_threshold=40, max_depth=2)
+    return PlanningSystem(planning_strategy=strategy).process_request(request)
+
+
+def test_same_request_same_plan_whatever_came_before():
+    client = FakeLLMClient(seed=3)
+    first = make_plan(client, "Open a bakery")
+    make_plan(client, "Learn the cello")
+    again = make_plan(client, "Open a bakery")
+    fresh = make_plan(FakeLLMClient(seed=3), "Open a bakery")
+    assert flat_nodes(first) == flat_nodes(again) == flat_nodes(fresh)
+    assert flat_nodes(first) != flat_nodes(
+        make_plan(FakeLLMClient(seed=4), "Open a bakery")
+    )
+
+
+def test_retries_get_a_different_draw():
+    client = FakeLLMClient()
+    messages = client._messages("Decompose: write the report")
+    inputs = {"step": "write the report"}
+    first = client.complete("decompose_step", messages, {**inputs, "attempt": 0})
+    retry = client.complete("decompose_step", messages, {**inputs, "attempt": 1})
+    again = client.complete("decompose_step", messages, {**inputs, "attempt": 0})
+    assert first.content == again.content != retry.content
+
+
+def test_server_answers_like_the_client():
+    client = FakeLLMClient()
+    request = "Plan a garden"
+    messages = client._messages(INITIAL_PLAN_PROMPT.format(request=request))
+    with FakeOpenAIServer(client) as server:
+        status, body = server.chat_completion({"messages": messages})
+    assert status == 200
+    expected = client.complete("generate_initial_plan", messages, {"request": request})
+    assert body["choices"][0]["message"]["content"] == expected.content
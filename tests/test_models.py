@@ -0,0 +1,53 @@
+from app.core.models import PlanNode
+from app.core.usage import LLMCallRecord, UsageTracker
+from app.planning.system import PlanningSystem
+from tests.plans import mixed_plan
+
+
+def export(plan):
+    return PlanningSystem(planning_strategy=None).export_plan(plan, format="json")
+
+
+def test_cached_until_nodes_change():
+    plan = mixed_plan()
+    calls = []
+    compute = lambda: calls.append(1) or len(calls)
+    assert plan.cached("key", compute) == plan.cached("key", compute) == 1
+
+    plan.root_node.children[0].weight = 3
+    assert plan.cached("key", compute) == 2
+    plan.root_node.add_child(PlanNode(id="extra", description="Extra step"))
+    assert plan.cached("key", compute) == 3
+
+
+def test_exports_follow_metadata_changes():
+    plan = mixed_plan()
+    before = export(plan)
+    plan.metadata["budget_exceeded"] = True
+    assert '"budget_exceeded": true' in export(plan)
+
+    # Nested, in-place edits count too
+    plan.metadata["options"]["nested"].append("more")
+    assert '"more"' in export(plan)
+    del plan.metadata["budget_exceeded"]
+    plan.metadata["options"]["nested"].pop()
+    assert export(plan) == before
+
+
+def test_exports_follow_usage_changes():
+    plan = mixed_plan()
+    assert '"calls": 1,' in export(plan)
+    plan.usage.record(LLMCallRecord("assign_weights", "fake-llm", 50, 10))
+    assert '"calls": 2,' in export(plan)
+
+    plan.usage = UsageTracker(token_budget=1000)
+    assert '"token_budget": 1000' in export(plan)
+    plan.usage = None
+    assert '"usage"' not in export(plan)
+
+
+def test_exports_follow_request_changes():
+    plan = mixed_plan()
+    export(plan)
+    plan.request = "Renamed request"
+    assert '"request": "Renamed request"' in export(plan)
@@ -0,0 +1,64 @@
+import json
+import pytest
+from app.planning.export import iter_ndjson, iter_node_records, load_ndjson
+from tests.plans import flat_nodes
+
+ROOT = '{"id": "r", "parent_id": null, "description": "", "weight": 0}'
+
+
+def record(node_id, parent_id="r", **fields):
+    return json.dumps(
+        {
+            "id": node_id,
+            "parent_id": parent_id,
+            "description": "",
+            "weight": 1,
+            **fields,
+        }
+    )
+
+
+def test_records_may_come_in_any_parent_first_order(plan):
+    records = list(iter_node_records(plan))
+    # Breadth-first order still lists parents before children
+    by_id = {record["id"]: record for record in records}
+    lines = [json.dumps(by_id[node.id]) + "\n" for node in plan.bfs()]
+    assert flat_nodes(load_ndjson(lines)) == flat_nodes(plan)
+
+
+def test_siblings_keep_the_order_they_are_read_in():
+    lines = [ROOT, record("b"), record("a"), record("b0", "b"), record("c")]
+    assert [node.id for node in load_ndjson(lines).dfs()] == ["r", "b", "b0", "a", "c"]
+
+
+def test_rejects_children_before_their_parent(mixed):
+    lines = list(iter_ndjson(mixed))
+    with pytest.raises(ValueError, match="line 1: unknown or missing 'launch'"):
+        load_ndjson(lines[1:2] + lines[:1] + lines[2:])
+    with pytest.raises(ValueError, match="line 1"):
+        load_ndjson(reversed(lines))
+
+
+@pytest.mark.parametrize(
+    "line, message",
+    [
+        ("{", "Invalid JSON on line 2"),
+        ("[1, 2]", "line 2: not an object"),
+        ("null", "line 2: not an object"),
+        ('{"id": "a", "parent_id": "r", "weight": 1}', "missing 'description'"),
+        (record("a", weight="heavy"), "line 2"),
+        (record("a", weight=None), "line 2"),
+        (record(5), "line 2"),
+        (record("r"), "line 2: Duplicate node id"),
+        (record("s", None), "line 2: .*root"),
+    ],
+)
+def test_rejects_malformed_lines(line, message):
+    with pytest.raises(ValueError, match=message):
+        load_ndjson([ROOT, line])
+
+
+def test_skips_blank_lines_but_not_empty_input():
+    assert len(load_ndjson(["\n", ROOT, "  \n", record("a")]).tree) == 2
+    with pytest.raises(ValueError, match="No plan records"):
+        load_ndjson(["", "\n"])
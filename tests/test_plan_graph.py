@@ -0,0 +1,136 @@
+import json
+import os
+import random
+import shutil
+import subprocess
+import pytest
+from app.visualization.lod import PlanLevelOfDetail
+from app.visualization.planner_viz import PlanVisualizer
+from benchmarks.trees import balanced_plan
+
+pytest.importorskip("streamlit")
+from app.visualization.plan_graph import graph_update  # noqa: E402
+
+COMPONENT_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "app", "visualization", "static", "plan_graph"
+)
+HARNESS = os.path.join(os.path.dirname(__file__), "js", "plan_graph_harness.js")
+
+
+class Browser:
+    """The component's script running under Node, fed one render at a time"""
+
+    def __init__(self):
+        self.process = subprocess.Popen(
+            ["node", HARNESS, COMPONENT_DIR],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+
+    def send(self, args):
+        self.process.stdin.write(json.dumps(args) + "\n")
+        self.process.stdin.flush()
+        return json.loads(self.process.stdout.readline())
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+@pytest.fixture
+def browser():
+    if shutil.which("node") is None:
+        pytest.skip("needs Node.js")
+    browser = Browser()
+    yield browser
+    browser.close()
+
+
+def visible_ids(lod):
+    payload = PlanVisualizer().graph_payload(lod)
+    return (
+        sorted(node["id"] for node in payload["nodes"]),
+        sorted(edge["id"] for edge in payload["edges"]),
+    )
+
+
+def test_expanding_sends_only_deltas(browser):
+    plan = balanced_plan(3000, branching=5)
+    rng = random.Random(0)
+    sent, shown, expanded = None, None, set()
+    kinds = []
+    for _ in range(30):
+        lod = PlanLevelOfDetail(plan, levels=2, expanded=expanded)
+        # One run sends an update, the browser's report triggers a second
+        for _ in range(2):
+            args, sent = graph_update(lod, 700, sent, shown)
+            kinds.append(
+                "full" if "full" in args else "delta" if "delta" in args else ""
+            )
+            result = browser.send(args)
+            shown = result["value"]
+        assert (result["nodes"], result["edges"]) == visible_ids(lod)
+
+        collapsed = [summary.node_id for summary in lod.collapsed_nodes()]
+        if lod.expanded and rng.random() < 0.4:
+            expanded = lod.expanded - {rng.choice(sorted(lod.expanded))}
+        else:
+            expanded = lod.expanded | {rng.choice(collapsed)}
+
+    assert kinds.count("full") == 1 and kinds[0] == "full"
+    assert kinds.count("delta") == 29
+
+
+def test_delta_payload_is_small():
+    plan = balanced_plan(20000, branching=5)
+    before = PlanLevelOfDetail(plan, levels=2)
+    node_id = before.collapsed_nodes()[0].node_id
+    after = PlanLevelOfDetail(plan, levels=2, expanded={node_id})
+    delta = PlanVisualizer().delta_payload(plan, after.delta(before))
+    # The five new children and their placeholders replace one placeholder
+    assert len(delta["nodes"]) == 10
+    assert delta["removed_nodes"] == [f"{node_id}::collapsed"]
+
+
+def test_unacknowledged_updates_are_resent(browser):
+    plan = balanced_plan(500, branching=5)
+    lod = PlanLevelOfDetail(plan, levels=2)
+    first, sent = graph_update(lod, 700, None, None)
+    # A rerun before the browser reported anything sends the same snapshot
+    again, sent = graph_update(lod, 700, sent, None)
+    assert again is first
+
+    shown = browser.send(again)["value"]
+    quiet, sent = graph_update(lod, 700, sent, shown)
+    assert "full" not in quiet and "delta" not in quiet
+
+
+def test_reloaded_frame_gets_a_snapshot(browser):
+    plan = balanced_plan(500, branching=5)
+    lod = PlanLevelOfDetail(plan, levels=2)
+    args, sent = graph_update(lod, 700, None, None)
+    shown = browser.send(args)["value"]
+
+    # The new frame holds nothing and says so
+    browser.send("reload")
+    args, sent = graph_update(lod, 700, sent, shown)
+    result = browser.send(args)
+    assert result["value"] == {"graph": None, "revision": None}
+
+    args, sent = graph_update(lod, 700, sent, result["value"])
+    assert "full" in args
+    result = browser.send(args)
+    assert (result["nodes"], result["edges"]) == visible_ids(lod)
+
+
+def test_new_plan_gets_a_snapshot(browser):
+    first = PlanLevelOfDetail(balanced_plan(500, branching=5), levels=2)
+    args, sent = graph_update(first, 700, None, None)
+    shown = browser.send(args)["value"]
+
+    second = PlanLevelOfDetail(balanced_plan(500, branching=5, seed=1), levels=2)
+    args, sent = graph_update(second, 700, sent, shown)
+    assert "full" in args
+    result = browser.send(args)
+    assert (result["nodes"], result["edges"]) == visible_ids(second)
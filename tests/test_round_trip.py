@@ -0,0 +1,14 @@
+from benchmarks.trees import deep_plan
+from tests.plans import flat_nodes
+
+
+def test_round_trip(plan, round_trip):
+    loaded = round_trip(plan)
+    assert loaded.request == plan.request
+    assert loaded.metadata == plan.export_metadata()
+    assert flat_nodes(loaded) == flat_nodes(plan)
+
+
+def test_round_trip_past_the_recursion_limit(round_trip):
+    plan = deep_plan(3000)
+    assert flat_nodes(round_trip(plan)) == flat_nodes(plan)
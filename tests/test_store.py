@@ -0,0 +1,101 @@
+import pytest
+from app.core.store import PlanStore
+from app.llm.fake_client import FakeLLMClient
+from app.planning.htn import HTNPlanningStrategy
+from app.planning.system import PlanningSystem
+from benchmarks.trees import balanced_plan
+from tests.plans import flat_nodes, mixed_plan
+
+
+@pytest.fixture
+def store():
+    with PlanStore() as store:
+        yield store
+
+
+def test_file_round_trip(tmp_path):
+    path = str(tmp_path / "plans.db")
+    plan = mixed_plan()
+    with PlanStore(path) as store:
+        plan_id = store.save(plan, settings={"preset": "small"})
+    with PlanStore(path) as store:
+        assert flat_nodes(store.load(plan_id)) == flat_nodes(plan)
+        assert store.latest(plan.request, {"preset": "small"}) is not None
+        assert store.latest(plan.request) is None
+
+
+def test_queries(store):
+    first, second = store.save_many([mixed_plan(), balanced_plan(50)])
+    assert store.count() == 2
+    assert store.find_plans(request_like="%ünïcode") == [first]
+
+    heavy = store.query_nodes(min_weight=99, depth=1, plan_id=first)
+    assert [node.node_id for node in heavy] == ["step_7"]
+    children = store.children(first, 0)
+    assert [node.node_id for node in children] == ["step_0", "step_7"]
+    assert [node.node_id for node in store.children(first, children[0].index)] == [
+        "step_0_sub_0",
+        "custom",
+    ]
+
+
+def test_queries_after_saving_the_same_request_again(store):
+    first = store.save(mixed_plan(), settings={"preset": "small"})
+    edited = mixed_plan()
+    edited.get_node("step_7").weight = 50
+    second = store.save(edited, settings={"preset": "small"})
+    other = store.save(mixed_plan(), settings={"preset": "large"})
+
+    request = edited.request
+    assert store.count() == 3
+    assert store.find_plans(request=request) == [other, second, first]
+    assert store.find_plans(request=request, settings={"preset": "small"}) == [
+        second,
+        first,
+    ]
+    assert store.latest(request, {"preset": "small"}).get_node("step_7").weight == 50
+    assert store.load(first).get_node("step_7").weight == 100
+
+    # Node queries see every saved copy, each under its own plan id
+    heavy = store.query_nodes(min_weight=99, depth=1, request_like="Launch%")
+    assert [(node.plan_id, node.node_id) for node in heavy] == [
+        (first, "step_7"),
+        (other, "step_7"),
+    ]
+    for plan_id in (first, second, other):
+        assert [node.plan_id for node in store.children(plan_id, 0)] == [plan_id] * 2
+
+    store.delete(second)
+    assert store.latest(request, {"preset": "small"}).get_node("step_7").weight == 100
+    assert store.query_nodes(plan_id=second) == []
+    assert len(store.query_nodes(request_like="Launch%")) == 2 * len(edited)
+
+
+def test_delete(store):
+    plan_id = store.save(mixed_plan())
+    store.delete(plan_id)
+    assert store.count() == 0
+    assert store.query_nodes(plan_id=plan_id) == []
+    with pytest.raises(KeyError):
+        store.load(plan_id)
+
+
+def test_stored_plans_are_reused_only_for_the_same_generator(store):
+    def system(**client_options):
+        client = FakeLLMClient(
+            steps_range=(2, 2), sub_steps_range=(2, 2), **client_options
+        )
+        strategy = HTNPlanningStrategy(
+            llm_client=client, weight_threshold=0, max_depth=1
+        )
+        return PlanningSystem(planning_strategy=strategy, plan_store=store)
+
+    first = system().process_request("Plan a trip")
+    assert store.count() == 1
+    assert flat_nodes(system().process_request("Plan a trip")) == flat_nodes(first)
+    assert store.count() == 1
+
+    system(model="other-model").process_request("Plan a trip")
+    assert store.count() == 2
+    system().process_request("Plan a trip", max_depth=2)
+    assert store.count() == 3
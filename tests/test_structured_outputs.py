@@ -0,0 +1,137 @@
+import json
+import pytest
+from app.llm.base import DEFAULT_WEIGHT, ChatLLMClient, Completion, validate_schema
+from app.prompts.planning import WEIGHT_ASSIGNMENT_FORMAT
+
+STEPS = ["Define scope", "Build prototype", "Run pilot"]
+
+
+class ScriptedLLMClient(ChatLLMClient):
+    """Answers calls with queued responses and records what was asked"""
+
+    model = "scripted"
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def _complete(self, operation, messages, inputs, **params):
+        self.calls.append((operation, inputs, params))
+        response = self.responses.pop(0)
+        if not isinstance(response, str):
+            response = json.dumps(response)
+        return Completion(content=response, model=self.model)
+
+
+def weights(*pairs):
+    return {"weights": [{"index": index, "weight": weight} for index, weight in pairs]}
+
+
+def decompositions(*pairs):
+    return {
+        "decompositions": [
+            {"index": index, "sub_steps": sub_steps} for index, sub_steps in pairs
+        ]
+    }
+
+
+def test_results_follow_indexes_not_response_order():
+    client = ScriptedLLMClient(weights((3, 70), (1, 10), (2, 40)))
+    assert client.assign_weights(STEPS) == [
+        ("Define scope", 10.0),
+        ("Build prototype", 40.0),
+        ("Run pilot", 70.0),
+    ]
+    assert len(client.calls) == 1
+
+
+def test_missing_index_is_re_requested_alone():
+    client = ScriptedLLMClient(weights((1, 10), (3, 70)), weights((1, 40)))
+    assert client.assign_weights(STEPS)[1] == ("Build prototype", 40.0)
+    assert client.calls[1][1] == {"steps": ["Build prototype"], "attempt": 1}
+
+
+def test_extra_duplicate_and_invalid_items_are_ignored():
+    client = ScriptedLLMClient(
+        # Out of range, a duplicate (the first answer wins) and an invalid weight
+        weights((1, 10), (4, 90), (1, 99), (0, 5), (2, 40), (3, 150)),
+        weights((1, 70)),
+    )
+    assert client.assign_weights(STEPS) == [
+        ("Define scope", 10.0),
+        ("Build prototype", 40.0),
+        ("Run pilot", 70.0),
+    ]
+    assert client.calls[1][1] == {"steps": ["Run pilot"], "attempt": 1}
+
+
+def test_retry_after_invalid_json():
+    client = ScriptedLLMClient(
+        "Sure! Here are the weights:", weights((1, 10), (2, 40), (3, 70))
+    )
+    assert [weight for _, weight in client.assign_weights(STEPS)] == [10.0, 40.0, 70.0]
+    assert [inputs for _, inputs, _ in client.calls] == [
+        {"steps": STEPS, "attempt": 0},
+        {"steps": STEPS, "attempt": 1},
+    ]
+
+
+def test_wrong_shape_is_retried():
+    client = ScriptedLLMClient(
+        {"weight": [1, 2, 3]}, weights((1, 10), (2, 40), (3, 70))
+    )
+    assert len(client.assign_weights(STEPS)) == 3
+    assert len(client.calls) == 2
+
+
+def test_default_weight_once_retries_run_out():
+    client = ScriptedLLMClient(weights((1, 10)), "{not json")
+    assert client.assign_weights(STEPS) == [
+        ("Define scope", 10.0),
+        ("Build prototype", DEFAULT_WEIGHT),
+        ("Run pilot", DEFAULT_WEIGHT),
+    ]
+    assert not client.responses
+
+
+def test_completion_budget_grows_with_the_batch():
+    client = ScriptedLLMClient(weights(*[(i, 50) for i in range(1, 31)]))
+    client.assign_weights([f"step {i}" for i in range(30)])
+    assert client.calls[0][2]["max_tokens"] == 600
+
+
+def test_missing_decomposition_falls_back_to_a_single_step_call():
+    client = ScriptedLLMClient(
+        decompositions((2, ["b1", "b2"]), (1, [" ", ""])),
+        decompositions((1, [])),
+        {"sub_steps": ["a1"]},
+    )
+    assert client.decompose_multiple_steps(["a", "b"]) == {
+        "a": ["a1"],
+        "b": ["b1", "b2"],
+    }
+    assert [operation for operation, _, _ in client.calls] == [
+        "decompose_multiple_steps",
+        "decompose_multiple_steps",
+        "decompose_step",
+    ]
+
+
+def test_initial_plan_is_retried_then_fails():
+    client = ScriptedLLMClient('```json\n{"steps": ["a", "b"]}\n```')
+    assert client.generate_initial_plan("request") == ["a", "b"]
+
+    client = ScriptedLLMClient("oops", {"steps": []})
+    with pytest.raises(ValueError):
+        client.generate_initial_plan("request")
+    assert len(client.calls) == 2
+
+
+def test_validate_schema():
+    schema = WEIGHT_ASSIGNMENT_FORMAT["json_schema"]["schema"]
+    assert validate_schema(weights((1, 1), (2, 100)), schema)
+    assert not validate_schema(weights((1, 0)), schema)
+    assert not validate_schema(weights((1, 50.5)), schema)
+    assert not validate_schema(weights((True, 50)), schema)
+    assert not validate_schema({"weights": [{"index": 1}]}, schema)
+    assert not validate_schema({"weights": [], "extra": 1}, schema)
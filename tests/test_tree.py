@@ -0,0 +1,48 @@
+import pytest
+from app.core.models import PlanNode
+from app.core.tree import PlanTree
+from tests.plans import mixed_plan
+
+
+def test_lookup_by_id(plan):
+    for node in plan.dfs():
+        assert plan.get_node(node.id) == node
+    assert plan.get_node("step_0_sub_999") is None
+
+
+def test_lookups_see_nodes_added_later():
+    plan = mixed_plan()
+    assert plan.get_node("custom") is not None
+    added = plan.root_node.add_child(PlanNode(id="step_2", description="Added"))
+    added.add_child(PlanNode(id="step_2_sub_0", description="Added below"))
+    assert plan.get_node("step_2") == added
+    assert plan.get_node("step_2_sub_0").parent_id == "step_2"
+
+
+@pytest.mark.parametrize("lookup_first", [False, True])
+def test_duplicate_ids_are_rejected(lookup_first):
+    tree = PlanTree()
+    root = tree.add_node("root", "Root")
+    step = tree.add_node("step_0", "Derived", parent=root)
+    tree.add_node("custom", "Explicit", parent=root)
+    if lookup_first:
+        tree.index_of("custom")
+    for id, parent in [("step_0", root), ("custom", step), ("root", step)]:
+        with pytest.raises(ValueError, match="Duplicate"):
+            tree.add_node(id, "Clash", parent=parent)
+    # An explicit id that spells out another node's derived id
+    with pytest.raises(ValueError, match="Duplicate"):
+        tree.add_node("step_0", "Clash", parent=step)
+
+
+def test_iter_ids_of_a_subtree():
+    plan = mixed_plan()
+    tree = plan.tree
+    start = tree.index_of("step_0")
+    assert [
+        (id, parent_id) for _, id, parent_id in tree.iter_ids(tree.iter_dfs(start))
+    ] == [
+        ("step_0", "launch"),
+        ("step_0_sub_0", "step_0"),
+        ("custom", "step_0"),
+    ]